@@ -1,5 +1,6 @@
 """Application configuration."""
-from pydantic_settings import BaseSettings
+from pydantic import AliasChoices, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
@@ -13,19 +14,35 @@ class Settings(BaseSettings):
     api_port: int = 8000
     log_level: str = "info"
 
+    # Server (uvicorn); in production set WEB_CONCURRENCY to 2 * cores + 1
+    api_workers: int = Field(
+        1, validation_alias=AliasChoices("api_workers", "web_concurrency")
+    )
+    loop: str = "uvloop"
+    http: str = "httptools"
+    reload: bool = False
+
     # FHIR Server
     fhir_base_url: str = "http://hapi-fhir:8080/fhir"
     fhir_timeout: int = 30
+    fhir_cache_ttl: int = 30  # seconds; 0 disables the resource read cache
 
     # CORS
     cors_origins: list[str] = ["*"]
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True,
+    )
 
 
 @lru_cache()
 def get_settings() -> Settings:
-    """Get cached settings instance."""
+    """
+    Get cached settings instance.
+
+    Parsed on first call rather than at import; modules should call this
+    where settings are needed instead of binding a module-level copy.
+    """
     return Settings()
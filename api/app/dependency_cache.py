@@ -0,0 +1,39 @@
+"""Cache FastAPI's per-request dependency introspection.
+
+FastAPI 0.109 calls is_coroutine_callable / is_gen_callable /
+is_async_gen_callable for every dependency on every request, and each of
+those runs `inspect` on the callable. The answer never changes for a given
+callable, so memoize it.
+"""
+from functools import lru_cache
+from fastapi.dependencies import utils as dependency_utils
+
+_PATCHED_FUNCTIONS = (
+    "is_coroutine_callable",
+    "is_gen_callable",
+    "is_async_gen_callable",
+)
+
+
+def _cached(func):
+    """Wrap an introspection helper with an LRU cache keyed by the callable."""
+    cached_func = lru_cache(maxsize=2048)(func)
+
+    def wrapper(call):
+        try:
+            return cached_func(call)
+        except TypeError:
+            # Unhashable callable (e.g. an instance with __call__ and __eq__)
+            return func(call)
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def install():
+    """Patch FastAPI's dependency helpers in place (idempotent)."""
+    for name in _PATCHED_FUNCTIONS:
+        func = getattr(dependency_utils, name, None)
+        if func is None or hasattr(func, "__wrapped__"):
+            continue
+        setattr(dependency_utils, name, _cached(func))
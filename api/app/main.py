@@ -1,8 +1,18 @@
 """FastAPI application for SDC Form Manager."""
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from brotli_asgi import BrotliMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from app.config import get_settings
+from app import dependency_cache
+from app.services import (
+    close_http_client,
+    get_fhir_client,
+    get_http_client,
+    get_package_service,
+)
+from app.services.localization_service import shutdown_process_pool
 import logging
 
 settings = get_settings()
@@ -14,10 +24,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Memoize FastAPI's per-request dependency introspection
+dependency_cache.install()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared upstream connections on startup, close them on shutdown."""
+    fhir_client = get_fhir_client()
+    await fhir_client.startup()
+    get_http_client()
+    # One PackageService (canonical cache, fetch semaphore) for all requests
+    app.state.package_service = get_package_service()
+    try:
+        yield
+    finally:
+        await fhir_client.shutdown()
+        await close_http_client()
+        shutdown_process_pool()
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="FHIR SDC Form Manager API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -30,13 +62,33 @@ app.add_middleware(
 )
 
 
-# IP logging middleware (5 lines!)
-@app.middleware("http")
-async def log_ip_access(request: Request, call_next):
-    ip = request.client.host
-    logger.info(f"IP: {ip} | {request.method} {request.url.path}")
-    response = await call_next(request)
-    return response
+# IP logging middleware (raw ASGI: no BaseHTTPMiddleware task/buffering overhead)
+class IPLogMiddleware:
+    """Log client IP, method and path for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            client = scope.get("client")
+            logger.info(
+                "IP: %s | %s %s",
+                client[0] if client else "-", scope["method"], scope["path"]
+            )
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(IPLogMiddleware)
+
+# Response compression: Brotli when the client accepts br, gzip otherwise.
+# FHIR Bundles are repetitive JSON and shrink 5-10x.
+app.add_middleware(
+    BrotliMiddleware,
+    quality=4,
+    minimum_size=1024,
+    gzip_fallback=True,
+)
 
 
 # Health check endpoint
@@ -75,5 +127,8 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=True
+        workers=settings.api_workers,
+        loop=settings.loop,
+        http=settings.http,
+        reload=settings.reload
     )
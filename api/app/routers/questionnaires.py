@@ -1,18 +1,21 @@
 """Questionnaire API endpoints."""
 from fastapi import APIRouter, HTTPException, Query, Depends, Body, Path
+from fastapi.responses import Response, StreamingResponse
 from typing import Optional, List
 from app.services import (
     get_fhir_client,
     FHIRClientService,
     PackageService,
+    get_package_service,
     ScoringExtractService,
+    VersionConflictError,
+    LocalizationService,
+    get_localization_service,
 )
-from app.services.localization_service import LocalizationService
 from app.config import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 router = APIRouter(
     prefix="/api/questionnaires",
@@ -20,35 +23,17 @@ router = APIRouter(
 )
 
 # Service singletons
-_package_service = None
-_localization_service = None
 _scoring_extract_service = None
 
 
-def get_package_service() -> PackageService:
-    """Get singleton package service instance."""
-    global _package_service
-    if _package_service is None:
-        _package_service = PackageService(settings.fhir_base_url)
-    return _package_service
-
-
 def get_scoring_extract_service() -> ScoringExtractService:
     """Get singleton scoring-extract service instance."""
     global _scoring_extract_service
     if _scoring_extract_service is None:
-        _scoring_extract_service = ScoringExtractService(settings.fhir_base_url)
+        _scoring_extract_service = ScoringExtractService(get_settings().fhir_base_url)
     return _scoring_extract_service
 
 
-def get_localization_service() -> LocalizationService:
-    """Get singleton localization service instance."""
-    global _localization_service
-    if _localization_service is None:
-        _localization_service = LocalizationService()
-    return _localization_service
-
-
 @router.get("/search")
 async def search_questionnaires(
     q: Optional[str] = Query(None, description="Search text for title/name"),
@@ -162,7 +147,7 @@ async def get_questionnaire(
 ):
     """Get a specific Questionnaire by ID."""
     try:
-        resource = await fhir_client.get_resource("Questionnaire", questionnaire_id)
+        resource = await fhir_client.get_resource_cached("Questionnaire", questionnaire_id)
 
         if not resource:
             raise HTTPException(
@@ -170,7 +155,7 @@ async def get_questionnaire(
                 detail=f"Questionnaire/{questionnaire_id} not found"
             )
 
-        return resource.serialize()
+        return resource
 
     except HTTPException:
         raise
@@ -182,7 +167,8 @@ async def get_questionnaire(
 @router.post("/")
 async def create_questionnaire(
     questionnaire: dict,
-    fhir_client: FHIRClientService = Depends(get_fhir_client)
+    fhir_client: FHIRClientService = Depends(get_fhir_client),
+    package_service: PackageService = Depends(get_package_service)
 ):
     """
     Create a new Questionnaire.
@@ -198,8 +184,10 @@ async def create_questionnaire(
             )
 
         resource = await fhir_client.create_resource("Questionnaire", questionnaire)
+        created = resource.serialize()
+        package_service.forget_missing(created)
 
-        return resource.serialize()
+        return created
 
     except HTTPException:
         raise
@@ -212,7 +200,8 @@ async def create_questionnaire(
 async def update_questionnaire(
     questionnaire_id: str,
     questionnaire: dict,
-    fhir_client: FHIRClientService = Depends(get_fhir_client)
+    fhir_client: FHIRClientService = Depends(get_fhir_client),
+    package_service: PackageService = Depends(get_package_service)
 ):
     """Update an existing Questionnaire."""
     try:
@@ -237,13 +226,17 @@ async def update_questionnaire(
             questionnaire_id,
             questionnaire
         )
+        updated = resource.serialize()
+        package_service.forget_missing(updated)
 
-        return resource.serialize()
+        return updated
 
     except HTTPException:
         raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except VersionConflictError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating questionnaire {questionnaire_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -279,6 +272,10 @@ async def package_questionnaire_resource(
         True,
         description="Include transitive dependencies"
     ),
+    stream: bool = Query(
+        True,
+        description="Stream the Bundle entry by entry (false builds it in memory)"
+    ),
     package_service: PackageService = Depends(get_package_service)
 ):
     """
@@ -303,17 +300,24 @@ async def package_questionnaire_resource(
     ```
     """
     try:
-        bundle = await package_service.package_resource(
+        if stream:
+            chunks = await package_service.package_resource(
+                questionnaire,
+                include_dependencies,
+                stream=True
+            )
+            logger.info("Streaming package for provided Questionnaire")
+            return StreamingResponse(chunks, media_type="application/fhir+json")
+
+        body = await package_service.package_resource(
             questionnaire,
-            include_dependencies
+            include_dependencies,
+            raw=True
         )
 
-        logger.info(
-            f"Packaged provided Questionnaire with "
-            f"{len(bundle.get('entry', []))} entries"
-        )
+        logger.info(f"Packaged provided Questionnaire ({len(body)} bytes)")
 
-        return bundle
+        return Response(content=body, media_type="application/fhir+json")
 
     except ValueError as e:
         if "must be of type 'Questionnaire'" in str(e):
@@ -335,6 +339,10 @@ async def package_questionnaire_by_url(
         True,
         description="Include transitive dependencies"
     ),
+    stream: bool = Query(
+        True,
+        description="Stream the Bundle entry by entry (false builds it in memory)"
+    ),
     package_service: PackageService = Depends(get_package_service)
 ):
     """
@@ -349,18 +357,32 @@ async def package_questionnaire_by_url(
     ```
     """
     try:
-        bundle = await package_service.package_by_url(
+        if stream:
+            chunks = await package_service.package_by_url(
+                url,
+                version,
+                include_dependencies,
+                stream=True
+            )
+            logger.info(
+                f"Streaming package for Questionnaire URL '{url}' "
+                f"(version: {version or 'latest'})"
+            )
+            return StreamingResponse(chunks, media_type="application/fhir+json")
+
+        body = await package_service.package_by_url(
             url,
             version,
-            include_dependencies
+            include_dependencies,
+            raw=True
         )
 
         logger.info(
             f"Packaged Questionnaire by URL '{url}' (version: {version or 'latest'}) "
-            f"with {len(bundle.get('entry', []))} entries"
+            f"({len(body)} bytes)"
         )
 
-        return bundle
+        return Response(content=body, media_type="application/fhir+json")
 
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -376,6 +398,10 @@ async def package_questionnaire_by_id(
         True,
         description="Include transitive dependencies (ValueSets, CodeSystems, Libraries)"
     ),
+    stream: bool = Query(
+        True,
+        description="Stream the Bundle entry by entry (false builds it in memory)"
+    ),
     package_service: PackageService = Depends(get_package_service)
 ):
     """
@@ -396,17 +422,24 @@ async def package_questionnaire_by_id(
     ```
     """
     try:
-        bundle = await package_service.package_by_id(
+        if stream:
+            chunks = await package_service.package_by_id(
+                questionnaire_id,
+                include_dependencies,
+                stream=True
+            )
+            logger.info(f"Streaming package for Questionnaire/{questionnaire_id}")
+            return StreamingResponse(chunks, media_type="application/fhir+json")
+
+        body = await package_service.package_by_id(
             questionnaire_id,
-            include_dependencies
+            include_dependencies,
+            raw=True
         )
 
-        logger.info(
-            f"Packaged Questionnaire/{questionnaire_id} with "
-            f"{len(bundle.get('entry', []))} entries"
-        )
+        logger.info(f"Packaged Questionnaire/{questionnaire_id} ({len(body)} bytes)")
 
-        return bundle
+        return Response(content=body, media_type="application/fhir+json")
 
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -451,7 +484,7 @@ async def localize_questionnaire_by_id(
             raise ValueError(f"Questionnaire with id '{questionnaire_id}' not found")
 
         # Localize to target language
-        localized = localization_service.localize(
+        localized = await localization_service.localize_async(
             questionnaire_response,
             language
         )
@@ -511,8 +544,12 @@ async def localize_questionnaire_resource(
         if questionnaire.get("resourceType") != "Questionnaire":
             raise ValueError("Resource must be of type 'Questionnaire'")
 
-        # Localize to target language
-        localized = localization_service.localize(questionnaire, language)
+        # Localize to target language; the parsed request body is ours to modify
+        localized = await localization_service.localize_async(
+            questionnaire,
+            language,
+            in_place=True
+        )
 
         logger.info(f"Localized provided Questionnaire to {language}")
 
@@ -566,7 +603,10 @@ async def localize_questionnaire_by_url(
         questionnaire = search_result["entry"][0]["resource"]
 
         # Localize to target language
-        localized = localization_service.localize(questionnaire, language)
+        localized = await localization_service.localize_async(
+            questionnaire,
+            language
+        )
 
         logger.info(
             f"Localized Questionnaire by URL '{url}' (version: {version or 'latest'}) "
@@ -1,11 +1,30 @@
 """Services module."""
-from app.services.fhir_client import FHIRClientService, get_fhir_client
-from app.services.package_service import PackageService
+from app.services.fhir_client import (
+    FHIRClientService,
+    VersionConflictError,
+    get_fhir_client,
+)
+from app.services.localization_service import (
+    LocalizationService,
+    get_localization_service,
+)
+from app.services.package_service import (
+    PackageService,
+    close_http_client,
+    get_http_client,
+    get_package_service,
+)
 from app.services.scoring_extract_service import ScoringExtractService
 
 __all__ = [
     "FHIRClientService",
     "get_fhir_client",
+    "VersionConflictError",
+    "LocalizationService",
+    "get_localization_service",
     "PackageService",
+    "get_package_service",
+    "get_http_client",
+    "close_http_client",
     "ScoringExtractService",
 ]
@@ -1,10 +1,102 @@
 """FHIR client service for connecting to HAPI FHIR server."""
+from collections import deque
+from typing import Dict, Optional, Set, Tuple
+from cachetools import LRUCache
 from fhirpy import AsyncFHIRClient
+from fhirpy.base.exceptions import (
+    MultipleResourcesFound,
+    OperationOutcome,
+    ResourceNotFound,
+)
+from fhirpy.base.utils import AttrDict
 from app.config import get_settings
+import aiohttp
+import asyncio
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
+
+# Connection pool for the shared aiohttp session
+POOL_LIMIT = 100
+DNS_CACHE_TTL_SECONDS = 300
+KEEPALIVE_TIMEOUT_SECONDS = 75
+
+# Reads issued within this window are coalesced into one batch Bundle
+BATCH_WINDOW_SECONDS = 0.015
+MAX_BATCH_ENTRIES = 50
+
+# Resource read cache
+CACHE_MAX_ENTRIES = 1024
+
+
+class VersionConflictError(Exception):
+    """Raised when an If-Match update hits a newer server version."""
+
+
+class PooledAsyncFHIRClient(AsyncFHIRClient):
+    """
+    AsyncFHIRClient that sends requests through a shared aiohttp session.
+
+    fhirpy opens a new ClientSession per request, which means a fresh TCP
+    connection to HAPI for every call. Once a session is attached, requests
+    reuse its keep-alive connection pool instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def _do_request(
+        self,
+        method,
+        path,
+        data=None,
+        params=None,
+        extra_headers=None,
+        *,
+        returning_status=False,
+    ):
+        # Same signature and response handling as fhirpy 2.1.0, minus the
+        # per-request ClientSession
+        if self.session is None or self.session.closed:
+            return await super()._do_request(
+                method, path, data=data, params=params,
+                extra_headers=extra_headers,
+                returning_status=returning_status,
+            )
+
+        headers = self._build_request_headers()
+        if extra_headers:
+            headers = {**headers, **extra_headers}
+        url = self._build_request_url(path, params)
+
+        async with self.session.request(
+            method, url, json=data, headers=headers, **self.aiohttp_config
+        ) as r:
+            if 200 <= r.status < 300:
+                body = await r.text()
+                r_data = json.loads(body, object_hook=AttrDict) if body else None
+                return (r_data, r.status) if returning_status else r_data
+
+            if r.status == 304:
+                return (None, r.status) if returning_status else None
+
+            if r.status in (404, 410):
+                raise ResourceNotFound(await r.text())
+
+            if r.status == 412:
+                raise MultipleResourcesFound(await r.text())
+
+            body = await r.text()
+            try:
+                parsed = json.loads(body)
+                if parsed["resourceType"] == "OperationOutcome":
+                    raise OperationOutcome(resource=parsed)
+                raise OperationOutcome(reason=body)
+            except (KeyError, ValueError):
+                raise OperationOutcome(reason=body)
 
 
 class FHIRClientService:
@@ -12,11 +104,62 @@ class FHIRClientService:
 
     def __init__(self):
         """Initialize FHIR client."""
-        self.client = AsyncFHIRClient(
-            url=settings.fhir_base_url,
+        self.settings = get_settings()
+        self.client = PooledAsyncFHIRClient(
+            url=self.settings.fhir_base_url,
             authorization=None,  # No auth for now
         )
-        logger.info(f"FHIR client initialized with base URL: {settings.fhir_base_url}")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._batch_queue: deque = deque()
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        # In-flight batch tasks; the loop only holds weak references to tasks
+        self._batch_tasks: Set[asyncio.Task] = set()
+        # (resource_type, resource_id) -> (fetched_at, resource)
+        self._cache: LRUCache = LRUCache(maxsize=CACHE_MAX_ENTRIES)
+        # (resource_type, resource_id) -> [lock, callers holding or awaiting it];
+        # an entry lives only while a read for that key is in progress
+        self._cache_locks: Dict[Tuple[str, str], list] = {}
+        logger.info(f"FHIR client initialized with base URL: {self.settings.fhir_base_url}")
+
+    async def startup(self):
+        """Open the shared HTTP session (called from the app lifespan)."""
+        if self._session is not None and not self._session.closed:
+            return
+
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=POOL_LIMIT,
+                ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+                keepalive_timeout=KEEPALIVE_TIMEOUT_SECONDS,
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.settings.fhir_timeout),
+        )
+        self.client.session = self._session
+        logger.info("FHIR client session opened")
+
+    async def shutdown(self):
+        """Close the shared HTTP session (called from the app lifespan)."""
+        if self._session is None:
+            return
+
+        self.client.session = None
+        await self._session.close()
+        self._session = None
+        logger.info("FHIR client session closed")
+
+    def _build_search(self, resource_type: str, search_params: dict):
+        """Build a fhirpy search set with all parameters applied in one call."""
+        # Extract _count for use with .limit() (fhirpy's proper API)
+        count_limit = search_params.pop('_count', None)
+
+        filtered = {k: v for k, v in search_params.items() if v is not None}
+        resources = self.client.resources(resource_type).search(**filtered)
+
+        # Apply limit using fhirpy's .limit() method (not as search param)
+        if count_limit is not None:
+            resources = resources.limit(count_limit)
+
+        return resources
 
     async def search_resources(
         self,
@@ -34,19 +177,7 @@ class FHIRClientService:
             List of matching resources
         """
         try:
-            resources = self.client.resources(resource_type)
-
-            # Extract _count for use with .limit() (fhirpy's proper API)
-            count_limit = search_params.pop('_count', None)
-
-            # Apply search parameters
-            for key, value in search_params.items():
-                if value is not None:
-                    resources = resources.search(**{key: value})
-
-            # Apply limit using fhirpy's .limit() method (not as search param)
-            if count_limit is not None:
-                resources = resources.limit(count_limit)
+            resources = self._build_search(resource_type, search_params)
 
             # Fetch one page of results
             result = await resources.fetch()
@@ -57,6 +188,30 @@ class FHIRClientService:
             logger.error(f"Error searching {resource_type}: {e}")
             raise
 
+    async def iter_resources(
+        self,
+        resource_type: str,
+        **search_params
+    ):
+        """
+        Lazily iterate over FHIR search results, page by page.
+
+        Unlike search_resources, which returns a single page, this follows
+        the Bundle's next links only as far as the caller consumes results.
+        `_count` sets the page size.
+
+        Args:
+            resource_type: Type of FHIR resource (e.g., "Questionnaire")
+            **search_params: Search parameters (e.g., status="active")
+
+        Yields:
+            Matching resources
+        """
+        resources = self._build_search(resource_type, search_params)
+
+        async for resource in resources:
+            yield resource
+
     async def get_resource(self, resource_type: str, resource_id: str):
         """
         Get a specific FHIR resource by ID.
@@ -81,6 +236,178 @@ class FHIRClientService:
             logger.error(f"Error getting {resource_type}/{resource_id}: {e}")
             raise
 
+    async def get_resource_cached(
+        self,
+        resource_type: str,
+        resource_id: str
+    ) -> Optional[dict]:
+        """
+        Read a FHIR resource by ID through the in-process cache.
+
+        Entries younger than `fhir_cache_ttl` are served without contacting
+        HAPI. Older entries are revalidated with a conditional read
+        (If-None-Match on meta.versionId), so an unchanged resource costs
+        only a 304. Concurrent misses for the same key share one fetch.
+
+        Args:
+            resource_type: Type of FHIR resource
+            resource_id: Resource ID
+
+        Returns:
+            Resource dict or None if not found
+        """
+        if self.settings.fhir_cache_ttl <= 0:
+            return await self.auto_batch_get(resource_type, resource_id)
+
+        key = (resource_type, resource_id)
+        entry = self._cache_locks.get(key)
+        if entry is None:
+            entry = self._cache_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+
+        try:
+            async with entry[0]:
+                return await self._read_through(key)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._cache_locks[key]
+
+    async def _read_through(self, key: Tuple[str, str]) -> Optional[dict]:
+        """Serve `key` from the cache, revalidating or refetching as needed."""
+        resource_type, resource_id = key
+        cached = self._cache.get(key)
+
+        if cached is not None:
+            fetched_at, resource = cached
+            if time.monotonic() - fetched_at < self.settings.fhir_cache_ttl:
+                return resource
+
+            version_id = (resource.get("meta") or {}).get("versionId")
+            if version_id and self._session is not None:
+                status, fresh = await self._conditional_read(
+                    resource_type, resource_id, version_id
+                )
+                if status == 304:
+                    self._cache[key] = (time.monotonic(), resource)
+                    return resource
+                if status == 200:
+                    self._cache[key] = (time.monotonic(), fresh)
+                    return fresh
+
+                self._cache.pop(key, None)
+                if status in (404, 410):
+                    return None
+
+        resource = await self.auto_batch_get(resource_type, resource_id)
+        if resource is not None:
+            self._cache[key] = (time.monotonic(), resource)
+        return resource
+
+    async def _conditional_read(
+        self,
+        resource_type: str,
+        resource_id: str,
+        version_id: str
+    ) -> Tuple[int, Optional[dict]]:
+        """Read a resource with If-None-Match; returns (status, resource)."""
+        url = f"{self.settings.fhir_base_url.rstrip('/')}/{resource_type}/{resource_id}"
+        headers = {
+            "Accept": "application/fhir+json",
+            "If-None-Match": f'W/"{version_id}"',
+        }
+
+        async with self._session.get(url, headers=headers) as r:
+            if r.status == 200:
+                return r.status, await r.json(content_type=None)
+            return r.status, None
+
+    def invalidate_cached(self, resource_type: str, resource_id: str):
+        """Drop a resource from the read cache."""
+        self._cache.pop((resource_type, resource_id), None)
+
+    def auto_batch_get(self, resource_type: str, resource_id: str) -> asyncio.Future:
+        """
+        Read a FHIR resource by ID, coalescing concurrent reads.
+
+        Reads issued within BATCH_WINDOW_SECONDS of each other are sent to
+        HAPI as a single batch Bundle and the results are demultiplexed back
+        to the awaiting callers.
+
+        Args:
+            resource_type: Type of FHIR resource
+            resource_id: Resource ID
+
+        Returns:
+            Future resolving to the resource dict, or None if not found
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch_queue.append((resource_type, resource_id, future))
+
+        if len(self._batch_queue) >= MAX_BATCH_ENTRIES:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = loop.call_later(BATCH_WINDOW_SECONDS, self._flush_batch)
+
+        return future
+
+    def _flush_batch(self):
+        """Send all queued reads as one batch request."""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+
+        pending = list(self._batch_queue)
+        self._batch_queue.clear()
+        if pending:
+            task = asyncio.ensure_future(self._execute_batch(pending))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _execute_batch(self, pending: list):
+        """Execute a batch Bundle of reads and resolve each caller's future."""
+        bundle = {
+            "resourceType": "Bundle",
+            "type": "batch",
+            "entry": [
+                {"request": {"method": "GET", "url": f"{resource_type}/{resource_id}"}}
+                for resource_type, resource_id, _ in pending
+            ],
+        }
+
+        try:
+            result = await self.client.execute("", method="post", data=bundle)
+        except Exception as e:
+            logger.error(f"Error executing batch of {len(pending)} reads: {e}")
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        entries = (result or {}).get("entry", [])
+        for i, (resource_type, resource_id, future) in enumerate(pending):
+            if future.done():
+                continue
+
+            entry = entries[i] if i < len(entries) else {}
+            status = entry.get("response", {}).get("status", "")
+
+            if status.startswith("2"):
+                future.set_result(entry.get("resource"))
+            elif status.startswith(("404", "410")):
+                logger.warning(f"{resource_type}/{resource_id} not found")
+                future.set_result(None)
+            else:
+                future.set_exception(
+                    OperationOutcome(
+                        reason=f"Batch read of {resource_type}/{resource_id} "
+                               f"failed with status '{status or 'missing'}'"
+                    )
+                )
+
+        logger.info(f"Executed batch of {len(pending)} reads")
+
     async def create_resource(self, resource_type: str, resource_data: dict):
         """
         Create a new FHIR resource.
@@ -107,30 +434,63 @@ class FHIRClientService:
         self,
         resource_type: str,
         resource_id: str,
-        resource_data: dict
+        resource_data: dict,
+        partial: bool = False
     ):
         """
         Update an existing FHIR resource.
 
+        By default the body replaces the stored resource. HAPI creates on PUT
+        to an unknown id, so the target must exist:
+
+        - With meta.versionId, a single PUT is sent with If-Match. HAPI
+          rejects it if the resource was changed or deleted, so no read is
+          needed and there is no check-then-write race.
+        - Without a version, a direct (uncached, unbatched) read checks
+          existence before the PUT. A delete landing between the two can
+          still re-create the resource; send meta.versionId to rule that out.
+
         Args:
             resource_type: Type of FHIR resource
             resource_id: Resource ID
             resource_data: Updated resource data
+            partial: Merge the given fields into the stored resource
+                (GET-then-PUT) instead of replacing it
 
         Returns:
             Updated resource
+
+        Raises:
+            ValueError: Resource does not exist
+            VersionConflictError: meta.versionId does not match the server
         """
         try:
-            # Get existing resource
-            resource = await self.get_resource(resource_type, resource_id)
-            if not resource:
-                raise ValueError(f"{resource_type}/{resource_id} not found")
+            if partial:
+                # Get existing resource
+                resource = await self.get_resource(resource_type, resource_id)
+                if not resource:
+                    raise ValueError(f"{resource_type}/{resource_id} not found")
 
-            # Update fields
-            for key, value in resource_data.items():
-                setattr(resource, key, value)
+                # Update fields
+                for key, value in resource_data.items():
+                    setattr(resource, key, value)
 
-            await resource.save()
+                await resource.save()
+            else:
+                version_id = (resource_data.get("meta") or {}).get("versionId")
+                if not (version_id and self._session is not None):
+                    # No If-Match to lean on: HAPI would create on PUT to an
+                    # unknown id, so read first (directly, not via the cache)
+                    try:
+                        await self.client.reference(resource_type, resource_id).to_resource()
+                    except ResourceNotFound:
+                        raise ValueError(f"{resource_type}/{resource_id} not found")
+
+                body = {**resource_data, "resourceType": resource_type, "id": resource_id}
+                saved = await self._put(resource_type, resource_id, body, version_id)
+                resource = self.client.resource(resource_type, **saved)
+
+            self.invalidate_cached(resource_type, resource_id)
             logger.info(f"Updated {resource_type}/{resource_id}")
             return resource
 
@@ -138,6 +498,53 @@ class FHIRClientService:
             logger.error(f"Error updating {resource_type}/{resource_id}: {e}")
             raise
 
+    async def _put(
+        self,
+        resource_type: str,
+        resource_id: str,
+        body: dict,
+        version_id: Optional[str] = None
+    ) -> dict:
+        """
+        PUT a full resource body, with If-Match when a version is given.
+
+        Raises:
+            ValueError: The resource does not exist (404/410)
+            VersionConflictError: The stored version differs (409/412)
+        """
+        if self._session is None:
+            if version_id:
+                logger.warning(
+                    f"No shared session; updating {resource_type}/{resource_id} "
+                    f"without If-Match"
+                )
+            resource = self.client.resource(resource_type, **body)
+            await resource.save()
+            return resource.serialize()
+
+        url = f"{self.settings.fhir_base_url.rstrip('/')}/{resource_type}/{resource_id}"
+        headers = {
+            "Accept": "application/fhir+json",
+            "Content-Type": "application/fhir+json",
+        }
+        if version_id:
+            headers["If-Match"] = f'W/"{version_id}"'
+
+        async with self._session.put(url, json=body, headers=headers) as r:
+            text = await r.text()
+
+            if r.status in (404, 410):
+                raise ValueError(f"{resource_type}/{resource_id} not found")
+            if r.status in (409, 412):
+                raise VersionConflictError(
+                    f"{resource_type}/{resource_id} was modified on the server "
+                    f"(expected version {version_id})"
+                )
+            if not 200 <= r.status < 300:
+                raise OperationOutcome(reason=text)
+
+            return json.loads(text) if text else body
+
     async def delete_resource(self, resource_type: str, resource_id: str):
         """
         Delete a FHIR resource.
@@ -152,6 +559,7 @@ class FHIRClientService:
                 raise ValueError(f"{resource_type}/{resource_id} not found")
 
             await resource.delete()
+            self.invalidate_cached(resource_type, resource_id)
             logger.info(f"Deleted {resource_type}/{resource_id}")
 
         except Exception as e:
@@ -1,18 +1,78 @@
 """Service for localizing Questionnaires to specific languages."""
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
 import logging
-import copy
+import multiprocessing
+import orjson
+import os
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Fields that can have translations
+TRANSLATABLE_FIELDS = frozenset({
+    "title", "text", "display", "prefix", "definition",
+    "name", "description", "copyright", "publisher"
+})
+
+# Questionnaires larger than this are localized in a worker process rather
+# than a thread, so the GIL-bound pass doesn't starve the event loop
+PROCESS_POOL_THRESHOLD_BYTES = 1024 * 1024  # 1 MB
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared localization process pool, creating it on first use.
+
+    By then the process runs the event loop and to_thread workers, so
+    children are started via forkserver: forking a multithreaded process
+    can deadlock the child on a lock another thread held (e.g. logging).
+    The cores are split across the uvicorn workers, each of which has its
+    own pool.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 1) // get_settings().api_workers),
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _process_pool
+
+
+def shutdown_process_pool():
+    """Shut down the localization process pool if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def _localize_serialized(payload: bytes, language: str) -> bytes:
+    """Process-pool entry point: localize an orjson-encoded Questionnaire."""
+    localized = get_localization_service().localize(
+        orjson.loads(payload),
+        language,
+        in_place=True
+    )
+    return orjson.dumps(localized)
+
 
 class LocalizationService:
-    """Service for extracting language-specific versions of Questionnaires."""
+    """
+    Service for extracting language-specific versions of Questionnaires.
+
+    Stateless: one shared instance is safe across concurrent requests
+    (see get_localization_service).
+    """
 
     def localize(
         self,
         questionnaire: Dict[str, Any],
-        language: str
+        language: str,
+        in_place: bool = False
     ) -> Dict[str, Any]:
         """
         Localize a multilingual Questionnaire to a specific language.
@@ -20,12 +80,18 @@ class LocalizationService:
         Args:
             questionnaire: Full Questionnaire resource with translations
             language: Target language code (e.g., 'de', 'es', 'fr')
+            in_place: Modify the given Questionnaire instead of a copy
+                (for callers that own the dict, e.g. a parsed request body)
 
         Returns:
             Questionnaire with only the specified language (no translation extensions)
         """
-        # Create a deep copy to avoid modifying original
-        localized = copy.deepcopy(questionnaire)
+        if in_place:
+            localized = questionnaire
+        else:
+            # FHIR resources are plain JSON trees, so a JSON round-trip is an
+            # exact (and much cheaper) deep copy
+            localized = orjson.loads(orjson.dumps(questionnaire))
 
         # Process top-level fields
         localized = self._process_element(localized, language)
@@ -52,6 +118,67 @@ class LocalizationService:
         logger.info(f"Localized Questionnaire to {language}")
         return localized
 
+    async def localize_async(
+        self,
+        questionnaire: Dict[str, Any],
+        language: str,
+        in_place: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Localize a Questionnaire off the event loop.
+
+        Serialization, the size check and small resources are handled in a
+        thread; resources above PROCESS_POOL_THRESHOLD_BYTES go to a worker
+        process.
+
+        Args:
+            questionnaire: Full Questionnaire resource with translations
+            language: Target language code (e.g., 'de', 'es', 'fr')
+            in_place: Modify the given Questionnaire instead of a copy
+                (for callers that own the dict, e.g. a parsed request body)
+
+        Returns:
+            Questionnaire with only the specified language (no translation extensions)
+        """
+        localized, payload = await asyncio.to_thread(
+            self._localize_small,
+            questionnaire,
+            language,
+            in_place
+        )
+        if localized is not None:
+            return localized
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            _get_process_pool(),
+            _localize_serialized,
+            payload,
+            language
+        )
+        return orjson.loads(result)
+
+    def _localize_small(
+        self,
+        questionnaire: Dict[str, Any],
+        language: str,
+        in_place: bool
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        """
+        Thread-side half of localize_async.
+
+        Returns:
+            (localized, None) if the Questionnaire was small enough to localize
+            here, else (None, payload) for the process pool
+        """
+        payload = orjson.dumps(questionnaire)
+        if len(payload) > PROCESS_POOL_THRESHOLD_BYTES:
+            return None, payload
+
+        # Without ownership, the decoded payload serves as the private copy
+        target = questionnaire if in_place else orjson.loads(payload)
+        return self.localize(target, language, in_place=True), None
+
     def _process_items(
         self,
         items: List[Dict[str, Any]],
@@ -91,29 +218,25 @@ class LocalizationService:
 
         Handles fields like: title, text, display, prefix, etc.
         """
-        # Fields that can have translations
-        translatable_fields = [
-            "title", "text", "display", "prefix", "definition",
-            "name", "description", "copyright", "publisher"
-        ]
-
-        for field in translatable_fields:
-            if field in element:
-                # Check for translation extension (format: _fieldName)
-                extension_field = f"_{field}"
-                if extension_field in element:
-                    localized_value = self._extract_localization(
-                        element[field],
-                        element[extension_field],
-                        language
-                    )
-
-                    if localized_value:
-                        # Replace with localized version
-                        element[field] = localized_value
-
-                    # Remove extension (no longer needed in localized version)
-                    del element[extension_field]
+        for field in TRANSLATABLE_FIELDS.intersection(element):
+            # Check for translation extension (format: _fieldName)
+            extension_field = "_" + field
+            extension_element = element.get(extension_field)
+            if extension_element is None:
+                continue
+
+            localized_value = self._extract_localization(
+                element[field],
+                extension_element,
+                language
+            )
+
+            if localized_value:
+                # Replace with localized version
+                element[field] = localized_value
+
+            # Remove extension (no longer needed in localized version)
+            del element[extension_field]
 
         return element
 
@@ -186,33 +309,38 @@ class LocalizationService:
 
         return sorted(list(languages))
 
-    def _scan_translations(self, element: Any) -> set:
-        """Recursively scan for all language codes in translation extensions."""
-        languages = set()
+    def _scan_translations(self, root: Any) -> set:
+        """Scan for all language codes in translation extensions."""
+        return set(self._iter_translation_languages(root))
+
+    def _has_language(self, root: Any, target: str) -> bool:
+        """Check for a translation into `target`, stopping at the first match."""
+        return any(lang == target for lang in self._iter_translation_languages(root))
 
-        if isinstance(element, dict):
-            # Check for translation extensions
-            for key, value in element.items():
-                if key.startswith("_") and isinstance(value, dict):
-                    if "extension" in value:
+    def _iter_translation_languages(self, root: Any):
+        """Yield language codes from translation extensions (iterative, no recursion)."""
+        stack = [root]
+
+        while stack:
+            node = stack.pop()
+
+            if type(node) is dict:
+                for key, value in node.items():
+                    # Check for translation extensions (format: _fieldName)
+                    if key[:1] == "_" and type(value) is dict and "extension" in value:
                         for ext in value["extension"]:
-                            url = ext.get("url", "")
-                            if "translation" in url.lower():
+                            if "translation" in ext.get("url", "").lower():
                                 # Extract language from sub-extensions
-                                for sub_ext in ext.get("extension", []):
+                                for sub_ext in ext.get("extension", ()):
                                     if sub_ext.get("url") == "lang":
                                         lang = sub_ext.get("valueCode") or sub_ext.get("valueString")
                                         if lang:
-                                            languages.add(lang)
-
-                # Recurse into all values
-                languages.update(self._scan_translations(value))
+                                            yield lang
 
-        elif isinstance(element, list):
-            for item in element:
-                languages.update(self._scan_translations(item))
+                    stack.append(value)
 
-        return languages
+            elif type(node) is list:
+                stack.extend(node)
 
     def validate_language_support(
         self,
@@ -229,5 +357,20 @@ class LocalizationService:
         Returns:
             True if language is available, False otherwise
         """
-        available = self.get_available_languages(questionnaire)
-        return language in available
+        # Base language (defaults to 'en', as in get_available_languages)
+        if language == questionnaire.get("language", "en"):
+            return True
+
+        return self._has_language(questionnaire, language)
+
+
+# Singleton instance
+_localization_service = None
+
+
+def get_localization_service() -> LocalizationService:
+    """Get singleton localization service instance."""
+    global _localization_service
+    if _localization_service is None:
+        _localization_service = LocalizationService()
+    return _localization_service
@@ -1,90 +1,393 @@
 """Service for packaging Questionnaires with dependencies (SDC $package operation)."""
-from typing import Optional, List, Dict, Set
-from datetime import datetime
-import json
+from collections import deque
+from typing import AsyncIterator, Deque, Iterator, Optional, List, Dict, Set, Tuple, Union
+from datetime import datetime, timezone
+import asyncio
 import logging
 import httpx
+import orjson
+from cachetools import TTLCache
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 # Constants
 MAX_BUNDLE_SIZE_BYTES = 20 * 1024 * 1024  # 20 MB
 MAX_BUNDLE_ENTRIES = 100
+MAX_CONCURRENT_FETCHES = 16  # in-flight canonical lookups against HAPI
+CANONICAL_BATCH_SIZE = 20  # canonical URLs per url=a,b,c search
+CANONICAL_BATCH_COUNT = 200  # page size for batched canonical searches
+LIBRARY_EXTENSION_URLS = frozenset({
+    "http://hl7.org/fhir/StructureDefinition/cqf-library",
+    "http://hl7.org/fhir/uv/sdc/StructureDefinition/sdc-questionnaire-library",
+})
+STRUCTUREMAP_EXTENSION_URL = (
+    "http://hl7.org/fhir/uv/sdc/StructureDefinition/sdc-questionnaire-targetStructureMap"
+)
+CANONICAL_CACHE_MAX_ENTRIES = 512
+CANONICAL_CACHE_TTL_SECONDS = 300
+NEGATIVE_CACHE_MAX_ENTRIES = 1024
+NEGATIVE_CACHE_TTL_SECONDS = 30
+HTTP_TIMEOUT_SECONDS = 30.0
+HTTP_POOL_LIMITS = httpx.Limits(
+    max_keepalive_connections=32,
+    max_connections=64,
+    keepalive_expiry=30
+)
+
+# Shared HAPI client, created once per event loop (see main.lifespan)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client used for HAPI lookups."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # HTTP/2 multiplexes the concurrent canonical fetches on one connection
+        _http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT_SECONDS,
+            limits=HTTP_POOL_LIMITS,
+            http2=True
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client on application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def bundle_size_error(size: int, limit: int = MAX_BUNDLE_SIZE_BYTES) -> ValueError:
+    """Error for a Bundle over the size limit."""
+    return ValueError(
+        f"Bundle size ({size} bytes) exceeds maximum "
+        f"({limit} bytes). Consider using "
+        "include-dependencies=false or modular questionnaire design."
+    )
+
+
+def entry_count_error(count: int) -> ValueError:
+    """Error for a Bundle over MAX_BUNDLE_ENTRIES."""
+    return ValueError(
+        f"Bundle entry count ({count}) exceeds maximum "
+        f"({MAX_BUNDLE_ENTRIES})"
+    )
+
+
+def normalize_canonical(url: str) -> str:
+    """Normalize a canonical URL for deduplication (scheme case, trailing '/')."""
+    scheme, sep, rest = url.partition("://")
+    if sep:
+        url = scheme.lower() + sep + rest
+    base, bar, version = url.partition("|")
+    return base.rstrip("/") + bar + version
 
 
 class DependencyResolver:
     """Resolves transitive dependencies for Questionnaire resources."""
 
-    def __init__(self, package_service):
-        """Initialize dependency resolver."""
+    def __init__(self, package_service, max_size_bytes: Optional[int] = None):
+        """
+        Initialize dependency resolver.
+
+        Args:
+            package_service: PackageService used for fetching
+            max_size_bytes: Abort once the estimated serialized size of the
+                            resolved resources exceeds this (None: no limit)
+        """
         self.service = package_service
-        self.processed_urls: Set[str] = set()
+        self.max_size_bytes = max_size_bytes
+        self.estimated_size = 0
+        self.processed_urls: Set[str] = set()  # normalized canonicals
+        self.library_graph: Dict[str, List[str]] = {}  # Library -> nested Libraries
         self.warnings: List[Dict] = []
 
-    def extract_valueset_refs(self, questionnaire: dict) -> List[str]:
+    def extract_valueset_refs(self, questionnaire: dict) -> Iterator[str]:
         """
-        Extract answerValueSet URLs from Questionnaire items.
-        Recursively processes nested items.
+        Yield answerValueSet URLs from Questionnaire items.
+        Walks nested items with an explicit stack, in document order;
+        duplicates are yielded as found.
         """
-        urls = []
+        stack = list(reversed(questionnaire.get("item", ())))
+        pop = stack.pop
+        extend = stack.extend
+
+        while stack:
+            item = pop()
+            answer_valueset = item.get("answerValueSet")
+            if answer_valueset:
+                yield answer_valueset
+
+            children = item.get("item")
+            if children:
+                extend(reversed(children))
+
+    def extract_codesystem_refs(self, valueset: dict) -> Iterator[str]:
+        """Yield CodeSystem URLs from ValueSet compose.include."""
+        for include in valueset.get("compose", {}).get("include", ()):
+            if "system" in include:
+                yield include["system"]
+
+    def extract_library_refs(self, resource: dict) -> Iterator[str]:
+        """Yield Library URLs from extensions."""
+        for ext in resource.get("extension", ()):
+            if ext.get("url") in LIBRARY_EXTENSION_URLS:
+                if "valueCanonical" in ext:
+                    yield ext["valueCanonical"]
+                elif "valueReference" in ext:
+                    yield ext["valueReference"].get("reference", "")
+
+    def extract_structuremap_refs(self, questionnaire: dict) -> Iterator[str]:
+        """Yield StructureMap URLs from extensions."""
+        for ext in questionnaire.get("extension", ()):
+            if ext.get("url") == STRUCTUREMAP_EXTENSION_URL:
+                if "valueCanonical" in ext:
+                    yield ext["valueCanonical"]
+
+    async def fetch_canonical(
+        self,
+        canonical_url: str,
+        resource_type: str
+    ) -> Optional[dict]:
+        """Fetch resource by canonical URL (see PackageService.fetch_canonical)."""
+        return await self.service.fetch_canonical(canonical_url, resource_type)
 
-        def traverse(items):
-            for item in items:
-                if "answerValueSet" in item:
-                    urls.append(item["answerValueSet"])
+    async def fetch_layer(
+        self,
+        urls: List[str],
+        resource_type: str
+    ) -> List[Tuple[str, Optional[dict]]]:
+        """
+        Fetch one layer of canonical URLs with batched searches.
 
-                if "item" in item:
-                    traverse(item["item"])
+        Skips URLs already fetched by this resolver (found or not) and
+        duplicates within the layer, comparing normalized canonicals.
 
-        if "item" in questionnaire:
-            traverse(questionnaire["item"])
+        Returns:
+            List of (url, resource or None) in the order URLs were given
+        """
+        pending = []
+        for url in urls:
+            key = normalize_canonical(url)
+            if key not in self.processed_urls:
+                self.processed_urls.add(key)
+                pending.append(url)
+        if not pending:
+            return []
+
+        found = await self.service.fetch_canonicals_batch(resource_type, pending)
+        return [(url, found.get(url)) for url in pending]
+
+    def transitive_refs(
+        self,
+        resource_type: str,
+        url: str,
+        resource: dict
+    ) -> List[Tuple[str, str, Optional[str]]]:
+        """
+        Extract references a fetched dependency brings in.
 
-        return urls
+        Library -> Library edges are also recorded in library_graph for
+        find_library_cycles.
 
-    def extract_codesystem_refs(self, valueset: dict) -> List[str]:
-        """Extract CodeSystem URLs from ValueSet compose.include."""
-        urls = []
+        Returns:
+            List of (url, resource_type, severity if missing) work items;
+            severity None means a missing reference is not reported
+        """
+        if resource_type == "ValueSet":
+            return [
+                (cs_url, "CodeSystem", "information")
+                for cs_url in dict.fromkeys(self.extract_codesystem_refs(resource))
+            ]
+        if resource_type == "Library":
+            nested_urls = list(dict.fromkeys(self.extract_library_refs(resource)))
+            self.library_graph[normalize_canonical(url)] = [
+                normalize_canonical(nested_url) for nested_url in nested_urls
+            ]
+            # Nested libraries are optional, don't warn when missing
+            return [(nested_url, "Library", None) for nested_url in nested_urls]
+        return []
 
-        if "compose" in valueset:
-            for include in valueset.get("compose", {}).get("include", []):
-                if "system" in include:
-                    urls.append(include["system"])
+    def find_library_cycles(self) -> List[List[str]]:
+        """
+        Find circular Library dependencies with an iterative DFS.
 
-        return urls
+        Nodes are colored white (unvisited), gray (on the current path) or
+        black (done); an edge to a gray node closes a cycle. O(V+E).
 
-    def extract_library_refs(self, resource: dict) -> List[str]:
-        """Extract Library URLs from extensions."""
-        urls = []
+        Returns:
+            One path per cycle found, starting and ending with the same URL
+        """
+        gray: Set[str] = set()
+        black: Set[str] = set()
+        cycles = []
 
-        if "extension" not in resource:
-            return urls
+        for root in self.library_graph:
+            if root in black:
+                continue
 
-        for ext in resource.get("extension", []):
-            if ext.get("url") in [
-                "http://hl7.org/fhir/StructureDefinition/cqf-library",
-                "http://hl7.org/fhir/uv/sdc/StructureDefinition/sdc-questionnaire-library"
-            ]:
-                if "valueCanonical" in ext:
-                    urls.append(ext["valueCanonical"])
-                elif "valueReference" in ext:
-                    ref = ext["valueReference"].get("reference", "")
-                    urls.append(ref)
+            path = [root]
+            gray.add(root)
+            stack = [iter(self.library_graph.get(root, ()))]
+            while stack:
+                node = next(stack[-1], None)
+                if node is None:
+                    stack.pop()
+                    done = path.pop()
+                    gray.discard(done)
+                    black.add(done)
+                elif node in gray:
+                    cycles.append(path[path.index(node):] + [node])
+                elif node not in black:
+                    path.append(node)
+                    gray.add(node)
+                    stack.append(iter(self.library_graph.get(node, ())))
+
+        return cycles
+
+    def warn_missing(self, url: str, resource_type: str, severity: Optional[str]):
+        """Record a not-found issue for a missing dependency."""
+        if severity is None:
+            return
+
+        # Don't warn about missing external CodeSystems (LOINC, SNOMED)
+        if resource_type == "CodeSystem" and any(
+            ext in url for ext in ["loinc.org", "snomed.info"]
+        ):
+            return
+
+        self.warnings.append({
+            "severity": severity,
+            "code": "not-found",
+            "diagnostics": f"Referenced {resource_type} not found: {url}"
+        })
+
+    def check_limits(self, all_resources: List[dict], resource: dict):
+        """
+        Fail fast, before fetching more, once the Bundle cannot fit.
 
-        return urls
+        The size estimate sums the serialized resources, a lower bound of
+        the final Bundle size.
 
-    def extract_structuremap_refs(self, questionnaire: dict) -> List[str]:
-        """Extract StructureMap URLs from extensions."""
-        urls = []
+        Raises:
+            ValueError: If the entry count or estimated size is over the limit
+        """
+        # Questionnaire plus dependencies
+        if len(all_resources) + 1 > MAX_BUNDLE_ENTRIES:
+            raise entry_count_error(len(all_resources) + 1)
 
-        if "extension" not in questionnaire:
-            return urls
+        if self.max_size_bytes is not None:
+            self.estimated_size += len(orjson.dumps(resource))
+            if self.estimated_size > self.max_size_bytes:
+                raise bundle_size_error(self.estimated_size, self.max_size_bytes)
 
-        for ext in questionnaire.get("extension", []):
-            if ext.get("url") == "http://hl7.org/fhir/uv/sdc/StructureDefinition/sdc-questionnaire-targetStructureMap":
-                if "valueCanonical" in ext:
-                    urls.append(ext["valueCanonical"])
+    async def resolve_all_dependencies(
+        self,
+        questionnaire: dict
+    ) -> List[dict]:
+        """
+        Resolve all dependencies recursively.
+
+        Uses a single worklist of (url, resource_type) items: each round
+        fetches everything queued, all resource types concurrently, and
+        queues the references the fetched resources bring in (ValueSet ->
+        CodeSystems, Library -> nested Libraries) until nothing is left.
+
+        Returns list of dependency resources (ValueSets, CodeSystems, Libraries, etc.)
+        """
+        all_resources = []
+        queue: Deque[Tuple[str, str, Optional[str]]] = deque()
+        if self.max_size_bytes is not None:
+            self.estimated_size = len(orjson.dumps(questionnaire))
+
+        # Contained '#' ValueSet references are local
+        valueset_urls = dict.fromkeys(self.extract_valueset_refs(questionnaire))
+        logger.info("Found %d ValueSet references", len(valueset_urls))
+        queue.extend(
+            (url, "ValueSet", "warning")
+            for url in valueset_urls if not url.startswith("#")
+        )
+
+        library_urls = dict.fromkeys(self.extract_library_refs(questionnaire))
+        logger.info("Found %d Library references", len(library_urls))
+        queue.extend((url, "Library", "warning") for url in library_urls)
+
+        structuremap_urls = dict.fromkeys(self.extract_structuremap_refs(questionnaire))
+        logger.info("Found %d StructureMap references", len(structuremap_urls))
+        queue.extend((url, "StructureMap", "information") for url in structuremap_urls)
+
+        while queue:
+            # Drain the worklist into one bucket per resource type
+            buckets: Dict[str, Dict[str, Optional[str]]] = {}
+            while queue:
+                url, resource_type, severity = queue.popleft()
+                buckets.setdefault(resource_type, {}).setdefault(url, severity)
+
+            layers = await asyncio.gather(*(
+                self.fetch_layer(list(refs), resource_type)
+                for resource_type, refs in buckets.items()
+            ))
+
+            for (resource_type, refs), fetched in zip(buckets.items(), layers):
+                for url, resource in fetched:
+                    if resource:
+                        all_resources.append(resource)
+                        self.check_limits(all_resources, resource)
+                        queue.extend(self.transitive_refs(resource_type, url, resource))
+                    else:
+                        self.warn_missing(url, resource_type, refs[url])
+
+        # processed_urls already stops the worklist looping; report the cycles
+        for cycle in self.find_library_cycles():
+            self.warnings.append({
+                "severity": "warning",
+                "code": "business-rule",
+                "diagnostics": f"Circular Library dependency: {' -> '.join(cycle)}"
+            })
+
+        logger.info(
+            "Resolved %d dependencies with %d warnings",
+            len(all_resources), len(self.warnings)
+        )
+        return all_resources
+
+
+class PackageService:
+    """Service for packaging Questionnaires with dependencies."""
+
+    def __init__(
+        self,
+        hapi_base_url: str,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Initialize package service.
+
+        Args:
+            hapi_base_url: HAPI FHIR base URL
+            http_client: Client to reuse; defaults to the shared pooled client
+        """
+        self.hapi_base = hapi_base_url
+        self._http_client = http_client
+        # (resource_type, canonical_url) -> resource, shared across requests
+        self.canonical_cache: TTLCache = TTLCache(
+            maxsize=CANONICAL_CACHE_MAX_ENTRIES,
+            ttl=CANONICAL_CACHE_TTL_SECONDS
+        )
+        # Questionnaire lookups that recently failed -> error message
+        self.negative_cache: TTLCache = TTLCache(
+            maxsize=NEGATIVE_CACHE_MAX_ENTRIES,
+            ttl=NEGATIVE_CACHE_TTL_SECONDS
+        )
+        self.fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
 
-        return urls
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Injected client, or the shared pool for the running app."""
+        return self._http_client or get_http_client()
 
     async def fetch_canonical(
         self,
@@ -102,179 +405,176 @@ class DependencyResolver:
         Returns:
             Resource dict or None if not found
         """
+        key = (resource_type, canonical_url)
+        cached = self.canonical_cache.get(key)
+        if cached is not None:
+            return cached
+
         # Parse version from canonical URL
+        # Entries are all we read: _total=none spares HAPI the count query
         if "|" in canonical_url:
             url, version = canonical_url.split("|", 1)
-            params = {"url": url, "version": version}
+            params = {"url": url, "version": version, "_total": "none"}
         else:
             url = canonical_url
             params = {
                 "url": url,
                 "status": "active",
                 "_sort": "-_lastUpdated",
-                "_count": "1"
+                "_count": "1",
+                "_total": "none"
             }
 
         # Fetch from HAPI
-        result = await self.service.fetch_resource(f"/{resource_type}", params=params)
-
-        if not result or result.get("total", 0) == 0:
-            return None
+        async with self.fetch_semaphore:
+            result = await self.fetch_resource(f"/{resource_type}", params=params)
 
-        # HAPI may return Bundle with total > 0 but no entry field
-        entries = result.get("entry", [])
+        entries = (result or {}).get("entry", [])
         if not entries:
             return None
 
-        return entries[0]["resource"]
+        resource = entries[0]["resource"]
+        self.canonical_cache[key] = resource
+        return resource
 
-    async def resolve_all_dependencies(
+    async def fetch_canonicals_batch(
         self,
-        questionnaire: dict
-    ) -> List[dict]:
-        """
-        Resolve all dependencies recursively.
-
-        Returns list of dependency resources (ValueSets, CodeSystems, Libraries, etc.)
+        resource_type: str,
+        urls: List[str]
+    ) -> Dict[str, dict]:
         """
-        all_resources = []
-
-        # Extract ValueSet references
-        valueset_urls = self.extract_valueset_refs(questionnaire)
-        logger.info(f"Found {len(valueset_urls)} ValueSet references")
-
-        # Fetch ValueSets
-        for url in valueset_urls:
-            if url.startswith("#") or url in self.processed_urls:
-                continue
-
-            valueset = await self.fetch_canonical(url, "ValueSet")
-
-            if not valueset:
-                self.warnings.append({
-                    "severity": "warning",
-                    "code": "not-found",
-                    "diagnostics": f"Referenced ValueSet not found: {url}"
-                })
-                continue
-
-            self.processed_urls.add(url)
-            all_resources.append(valueset)
-
-            # Extract CodeSystems from ValueSet
-            codesystem_urls = self.extract_codesystem_refs(valueset)
-
-            for cs_url in codesystem_urls:
-                if cs_url in self.processed_urls:
-                    continue
-
-                codesystem = await self.fetch_canonical(cs_url, "CodeSystem")
+        Fetch many canonical URLs of one resource type.
 
-                if codesystem:
-                    self.processed_urls.add(cs_url)
-                    all_resources.append(codesystem)
-                else:
-                    # Don't warn about missing external CodeSystems (LOINC, SNOMED)
-                    if not any(ext in cs_url for ext in ["loinc.org", "snomed.info"]):
-                        self.warnings.append({
-                            "severity": "information",
-                            "code": "not-found",
-                            "diagnostics": f"Referenced CodeSystem not found: {cs_url}"
-                        })
+        Unversioned URLs are looked up CANONICAL_BATCH_SIZE at a time with a
+        single url=u1,u2,... search; versioned URLs ("url|version") fall back
+        to fetch_canonical. Found resources are cached for
+        CANONICAL_CACHE_TTL_SECONDS.
 
-        # Extract Library references
-        library_urls = self.extract_library_refs(questionnaire)
-        logger.info(f"Found {len(library_urls)} Library references")
-
-        for url in library_urls:
-            if url in self.processed_urls:
-                continue
+        Args:
+            resource_type: FHIR resource type
+            urls: Canonical URLs to resolve
 
-            library = await self.fetch_canonical(url, "Library")
+        Returns:
+            Dict mapping each found canonical URL to its resource
+        """
+        found: Dict[str, dict] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            cached = self.canonical_cache.get((resource_type, url))
+            if cached is not None:
+                found[url] = cached
+            else:
+                pending.append(url)
+
+        versioned = [url for url in pending if "|" in url]
+        unversioned = [url for url in pending if "|" not in url]
+        chunks = [
+            unversioned[i:i + CANONICAL_BATCH_SIZE]
+            for i in range(0, len(unversioned), CANONICAL_BATCH_SIZE)
+        ]
+
+        results = await asyncio.gather(
+            *(self._search_canonicals(resource_type, chunk) for chunk in chunks),
+            *(self.fetch_canonical(url, resource_type) for url in versioned)
+        )
 
-            if library:
-                self.processed_urls.add(url)
-                all_resources.append(library)
+        for chunk_result in results[:len(chunks)]:
+            found.update(chunk_result)
+            for url, resource in chunk_result.items():
+                self.canonical_cache[(resource_type, url)] = resource
+        for url, resource in zip(versioned, results[len(chunks):]):
+            if resource:
+                found[url] = resource
 
-                # Check for nested library references
-                nested_library_urls = self.extract_library_refs(library)
-                for nested_url in nested_library_urls:
-                    if nested_url not in self.processed_urls:
-                        nested_library = await self.fetch_canonical(nested_url, "Library")
-                        if nested_library:
-                            self.processed_urls.add(nested_url)
-                            all_resources.append(nested_library)
-            else:
-                self.warnings.append({
-                    "severity": "warning",
-                    "code": "not-found",
-                    "diagnostics": f"Referenced Library not found: {url}"
-                })
-
-        # Extract StructureMap references
-        structuremap_urls = self.extract_structuremap_refs(questionnaire)
-        logger.info(f"Found {len(structuremap_urls)} StructureMap references")
-
-        for url in structuremap_urls:
-            if url in self.processed_urls:
-                continue
+        return found
 
-            structuremap = await self.fetch_canonical(url, "StructureMap")
+    async def _search_canonicals(
+        self,
+        resource_type: str,
+        urls: List[str]
+    ) -> Dict[str, dict]:
+        """Resolve a chunk of unversioned canonical URLs with one search."""
+        params = {
+            # Commas inside a value must be escaped in FHIR search
+            "url": ",".join(url.replace(",", "\\,") for url in urls),
+            "status": "active",
+            "_sort": "-_lastUpdated",
+            "_count": str(CANONICAL_BATCH_COUNT),
+            "_total": "none"
+        }
 
-            if structuremap:
-                self.processed_urls.add(url)
-                all_resources.append(structuremap)
-            else:
-                self.warnings.append({
-                    "severity": "information",
-                    "code": "not-found",
-                    "diagnostics": f"Referenced StructureMap not found: {url}"
-                })
+        async with self.fetch_semaphore:
+            result = await self.fetch_resource(f"/{resource_type}", params=params)
 
-        logger.info(f"Resolved {len(all_resources)} dependencies with {len(self.warnings)} warnings")
-        return all_resources
+        found: Dict[str, dict] = {}
+        if not result:
+            return found
 
+        # Sorted newest first, so the first match per URL is the latest
+        wanted = set(urls)
+        for entry in result.get("entry", []):
+            resource = entry.get("resource", {})
+            url = resource.get("url")
+            if url in wanted and url not in found:
+                found[url] = resource
 
-class PackageService:
-    """Service for packaging Questionnaires with dependencies."""
+        # Page overflowed (many versions per URL): look up the rest singly
+        if any(link.get("relation") == "next" for link in result.get("link", [])):
+            missing = [url for url in urls if url not in found]
+            for url, resource in zip(missing, await asyncio.gather(
+                *(self.fetch_canonical(url, resource_type) for url in missing)
+            )):
+                if resource:
+                    found[url] = resource
 
-    def __init__(self, hapi_base_url: str):
-        """Initialize package service."""
-        self.hapi_base = hapi_base_url
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        return found
 
     async def package_by_id(
         self,
         questionnaire_id: str,
-        include_dependencies: bool = True
-    ) -> dict:
+        include_dependencies: bool = True,
+        stream: bool = False,
+        raw: bool = False
+    ) -> Union[dict, bytes, AsyncIterator[bytes]]:
         """
         Package questionnaire by ID.
 
         Args:
             questionnaire_id: Questionnaire ID
             include_dependencies: Include transitive dependencies
+            stream: Return the Bundle as an iterator of JSON chunks
+            raw: Return the Bundle as serialized JSON bytes
 
         Returns:
             FHIR Bundle with Questionnaire and dependencies
         """
-        # Fetch Questionnaire
-        questionnaire = await self.fetch_resource(
+        # Fetch Questionnaire, unless it was just found missing
+        negative_key = ("id", questionnaire_id)
+        self.raise_if_known_missing(negative_key)
+
+        status, questionnaire = await self.fetch_resource_with_status(
             f"/Questionnaire/{questionnaire_id}"
         )
 
         if not questionnaire:
-            raise ValueError(f"Questionnaire with id '{questionnaire_id}' not found")
+            message = f"Questionnaire with id '{questionnaire_id}' not found"
+            # Only a genuine 404 is remembered, never a timeout or 5xx
+            if status == 404:
+                raise self.remember_missing(negative_key, message)
+            raise ValueError(message)
 
-        # Build bundle
-        return await self.build_bundle(questionnaire, include_dependencies)
+        if stream:
+            return await self.stream_bundle(questionnaire, include_dependencies)
+        return await self.build_bundle(questionnaire, include_dependencies, raw=raw)
 
     async def package_by_url(
         self,
         url: str,
         version: Optional[str] = None,
-        include_dependencies: bool = True
-    ) -> dict:
+        include_dependencies: bool = True,
+        stream: bool = False,
+        raw: bool = False
+    ) -> Union[dict, bytes, AsyncIterator[bytes]]:
         """
         Package questionnaire by canonical URL.
 
@@ -282,12 +582,17 @@ class PackageService:
             url: Canonical URL of Questionnaire
             version: Specific version (optional)
             include_dependencies: Include transitive dependencies
+            stream: Return the Bundle as an iterator of JSON chunks
+            raw: Return the Bundle as serialized JSON bytes
 
         Returns:
             FHIR Bundle with Questionnaire and dependencies
         """
+        negative_key = ("url", url, version)
+        self.raise_if_known_missing(negative_key)
+
         # Search for Questionnaire
-        search_params = {"url": url}
+        search_params = {"url": url, "_total": "none"}
         if version:
             search_params["version"] = version
         else:
@@ -295,34 +600,65 @@ class PackageService:
             search_params["_sort"] = "-_lastUpdated"
             search_params["_count"] = "1"
 
-        search_result = await self.fetch_resource(
+        status, search_result = await self.fetch_resource_with_status(
             "/Questionnaire",
             params=search_params
         )
 
-        if not search_result or search_result.get("total", 0) == 0:
-            raise ValueError(f"Questionnaire with url '{url}' not found")
-
-        # HAPI may return Bundle with total > 0 but no entry field
-        entries = search_result.get("entry", [])
+        entries = (search_result or {}).get("entry", [])
         if not entries:
-            raise ValueError(f"Questionnaire with url '{url}' not found")
+            message = f"Questionnaire with url '{url}' not found"
+            # Only an empty search result is remembered, never a failed search
+            if status == 200:
+                raise self.remember_missing(negative_key, message)
+            raise ValueError(message)
 
         questionnaire = entries[0]["resource"]
 
-        return await self.build_bundle(questionnaire, include_dependencies)
+        if stream:
+            return await self.stream_bundle(questionnaire, include_dependencies)
+        return await self.build_bundle(questionnaire, include_dependencies, raw=raw)
+
+    def raise_if_known_missing(self, key: tuple):
+        """Raise the cached not-found error for a recently missing lookup."""
+        message = self.negative_cache.get(key)
+        if message is not None:
+            raise ValueError(message)
+
+    def remember_missing(self, key: tuple, message: str) -> ValueError:
+        """Cache a not-found lookup for NEGATIVE_CACHE_TTL_SECONDS."""
+        self.negative_cache[key] = message
+        return ValueError(message)
+
+    def forget_missing(self, questionnaire: dict):
+        """
+        Drop negative entries a created or updated Questionnaire answers.
+
+        Args:
+            questionnaire: The Questionnaire as stored on the server
+        """
+        self.negative_cache.pop(("id", questionnaire.get("id")), None)
+
+        url = questionnaire.get("url")
+        if url:
+            for key in [k for k in self.negative_cache if k[0] == "url" and k[1] == url]:
+                self.negative_cache.pop(key, None)
 
     async def package_resource(
         self,
         questionnaire: dict,
-        include_dependencies: bool = True
-    ) -> dict:
+        include_dependencies: bool = True,
+        stream: bool = False,
+        raw: bool = False
+    ) -> Union[dict, bytes, AsyncIterator[bytes]]:
         """
         Package provided Questionnaire resource.
 
         Args:
             questionnaire: Questionnaire resource dict
             include_dependencies: Include transitive dependencies
+            stream: Return the Bundle as an iterator of JSON chunks
+            raw: Return the Bundle as serialized JSON bytes
 
         Returns:
             FHIR Bundle with Questionnaire and dependencies
@@ -331,66 +667,146 @@ class PackageService:
         if questionnaire.get("resourceType") != "Questionnaire":
             raise ValueError("Resource must be of type 'Questionnaire'")
 
-        return await self.build_bundle(questionnaire, include_dependencies)
+        if stream:
+            return await self.stream_bundle(questionnaire, include_dependencies)
+        return await self.build_bundle(questionnaire, include_dependencies, raw=raw)
 
     async def build_bundle(
         self,
         questionnaire: dict,
-        include_dependencies: bool
-    ) -> dict:
+        include_dependencies: bool,
+        raw: bool = False
+    ) -> Union[dict, bytes]:
         """
         Build bundle with Questionnaire and dependencies.
 
         Args:
             questionnaire: Questionnaire resource dict
             include_dependencies: Whether to include dependencies
+            raw: Return the serialized bytes used for the size check instead
+                 of the dict, so the response needs no second serialization
 
         Returns:
-            FHIR Bundle resource
+            FHIR Bundle resource (dict, or JSON bytes if raw)
         """
-        # Initialize bundle entries with Questionnaire first
-        bundle_entries = [{"resource": questionnaire}]
+        bundle_entries = await self.collect_entries(
+            questionnaire,
+            include_dependencies,
+            max_size_bytes=MAX_BUNDLE_SIZE_BYTES
+        )
 
         if not include_dependencies:
             # Return minimal bundle
-            return self.create_bundle(bundle_entries)
+            bundle = self.create_bundle(bundle_entries)
+            return orjson.dumps(bundle) if raw else bundle
+
+        # Check limits, the cheap entry count before serializing
+        if len(bundle_entries) > MAX_BUNDLE_ENTRIES:
+            raise entry_count_error(len(bundle_entries))
+
+        bundle = self.create_bundle(bundle_entries)
+        body = orjson.dumps(bundle)
+        bundle_size = len(body)
+
+        if bundle_size > MAX_BUNDLE_SIZE_BYTES:
+            raise bundle_size_error(bundle_size)
+
+        logger.info(
+            "Created bundle with %d entries, size: %d bytes",
+            len(bundle_entries), bundle_size
+        )
+
+        return body if raw else bundle
+
+    async def collect_entries(
+        self,
+        questionnaire: dict,
+        include_dependencies: bool,
+        max_size_bytes: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Collect bundle entries: Questionnaire first, then dependencies and
+        an OperationOutcome for any missing ones.
+
+        Args:
+            questionnaire: Questionnaire resource dict
+            include_dependencies: Whether to include dependencies
+            max_size_bytes: Stop resolving once the estimated size exceeds this
+
+        Returns:
+            List of bundle entries
+        """
+        if not include_dependencies:
+            return [{"resource": questionnaire}]
 
         # Resolve dependencies
-        resolver = DependencyResolver(self)
+        resolver = DependencyResolver(self, max_size_bytes=max_size_bytes)
         dependencies = await resolver.resolve_all_dependencies(questionnaire)
 
-        # Add dependencies to bundle
-        bundle_entries.extend([{"resource": dep} for dep in dependencies])
+        # Allocate once: Questionnaire, dependencies, optional OperationOutcome
+        bundle_entries: List[Optional[dict]] = [None] * (
+            1 + len(dependencies) + (1 if resolver.warnings else 0)
+        )
+        bundle_entries[0] = {"resource": questionnaire}
+        for i, dep in enumerate(dependencies, 1):
+            bundle_entries[i] = {"resource": dep}
 
         # Add warnings if any dependencies missing
         if resolver.warnings:
-            bundle_entries.append({
+            bundle_entries[-1] = {
                 "resource": self.create_operation_outcome(resolver.warnings)
-            })
+            }
 
-        # Check size limits
-        bundle = self.create_bundle(bundle_entries)
-        bundle_size = len(json.dumps(bundle))
+        return bundle_entries
 
-        if bundle_size > MAX_BUNDLE_SIZE_BYTES:
-            raise ValueError(
-                f"Bundle size ({bundle_size} bytes) exceeds maximum "
-                f"({MAX_BUNDLE_SIZE_BYTES} bytes). Consider using "
-                "include-dependencies=false or modular questionnaire design."
-            )
+    async def stream_bundle(
+        self,
+        questionnaire: dict,
+        include_dependencies: bool
+    ) -> AsyncIterator[bytes]:
+        """
+        Build bundle as a stream of JSON chunks.
 
-        if len(bundle_entries) > MAX_BUNDLE_ENTRIES:
-            raise ValueError(
-                f"Bundle entry count ({len(bundle_entries)}) exceeds maximum "
-                f"({MAX_BUNDLE_ENTRIES})"
-            )
+        Dependencies are resolved and the entry and size limits are checked
+        up front, so errors still surface before the response starts. The
+        entries are held in memory while streaming, so MAX_BUNDLE_SIZE_BYTES
+        applies here as well; only the serialized Bundle is never built as a
+        whole.
 
-        logger.info(
-            f"Created bundle with {len(bundle_entries)} entries, "
-            f"size: {bundle_size} bytes"
+        Args:
+            questionnaire: Questionnaire resource dict
+            include_dependencies: Whether to include dependencies
+
+        Returns:
+            Async iterator of JSON byte chunks forming one FHIR Bundle
+        """
+        bundle_entries = await self.collect_entries(
+            questionnaire,
+            include_dependencies,
+            max_size_bytes=MAX_BUNDLE_SIZE_BYTES
         )
 
-        return bundle
+        if len(bundle_entries) > MAX_BUNDLE_ENTRIES:
+            raise entry_count_error(len(bundle_entries))
+
+        logger.info("Streaming bundle with %d entries", len(bundle_entries))
+        return self._iter_bundle_chunks(bundle_entries)
+
+    async def _iter_bundle_chunks(self, entries: List[dict]) -> AsyncIterator[bytes]:
+        """Yield a Bundle as JSON: header, then one entry at a time."""
+        header = self.create_bundle([])
+        del header["entry"]
+
+        # Re-open the header object and append the entry array
+        yield orjson.dumps(header)[:-1] + b',"entry":['
+
+        # Separator rides along with the entry: one chunk (and send) per entry
+        separator = b""
+        for entry in entries:
+            yield separator + orjson.dumps(entry)
+            separator = b","
+
+        yield b"]}"
 
     async def fetch_resource(
         self,
@@ -407,20 +823,45 @@ class PackageService:
         Returns:
             Resource dict or None if not found
         """
+        _, resource = await self.fetch_resource_with_status(path, params=params)
+        return resource
+
+    async def fetch_resource_with_status(
+        self,
+        path: str,
+        params: Optional[dict] = None
+    ) -> Tuple[Optional[int], Optional[dict]]:
+        """
+        Fetch resource from HAPI FHIR, keeping the HTTP status.
+
+        Lets callers tell a genuine 404 from a failed request, which
+        fetch_resource reports the same way (None).
+
+        Args:
+            path: Resource path (e.g., "/Questionnaire/123")
+            params: Query parameters
+
+        Returns:
+            (status code or None if HAPI could not be reached, resource dict
+            or None)
+        """
         url = f"{self.hapi_base}{path}"
 
         try:
             response = await self.http_client.get(url, params=params)
 
             if response.status_code == 404:
-                return None
+                return response.status_code, None
 
             response.raise_for_status()
-            return response.json()
+            return response.status_code, orjson.loads(response.content)
 
+        except httpx.HTTPStatusError as e:
+            logger.error("Error fetching %s: %s", url, e)
+            return e.response.status_code, None
         except httpx.HTTPError as e:
-            logger.error(f"Error fetching {url}: {e}")
-            return None
+            logger.error("Error fetching %s: %s", url, e)
+            return None, None
 
     def create_bundle(self, entries: list) -> dict:
         """
@@ -432,11 +873,13 @@ class PackageService:
         Returns:
             FHIR Bundle resource
         """
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        # One clock read for id, timestamp and meta.lastUpdated
+        now = datetime.now(timezone.utc)
+        timestamp = now.isoformat(timespec="seconds").replace("+00:00", "Z")
 
         return {
             "resourceType": "Bundle",
-            "id": f"package-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+            "id": now.strftime("package-%Y%m%d%H%M%S"),
             "type": "collection",
             "timestamp": timestamp,
             "meta": {
@@ -475,5 +918,18 @@ class PackageService:
         }
 
     async def close(self):
-        """Close HTTP client connection."""
-        await self.http_client.aclose()
+        """Close HTTP client connection (shared client is closed at app shutdown)."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+
+# Global package service instance, created by main.lifespan
+_package_service: Optional[PackageService] = None
+
+
+def get_package_service() -> PackageService:
+    """Get singleton package service instance."""
+    global _package_service
+    if _package_service is None:
+        _package_service = PackageService(get_settings().fhir_base_url)
+    return _package_service
@@ -17,7 +17,6 @@ from typing import Optional
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 # PRO-CTCAE CQL Library canonical URL and ID
 CQL_LIBRARY_ID = "PRO_CTCAE"
@@ -281,7 +280,7 @@ async def score_questionnaire_response(
         - One Observation per symptom (composite grade or dataAbsentReason)
         - One Observation for ACS (average composite score)
     """
-    base_url = hapi_base_url or settings.fhir_base_url
+    base_url = hapi_base_url or get_settings().fhir_base_url
     groups = _extract_symptom_groups(qr)
 
     if not groups:
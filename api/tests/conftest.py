@@ -1,12 +1,29 @@
 """Pytest configuration and shared fixtures."""
 import pytest
 import asyncio
+import hashlib
 import httpx
 import time
 import logging
+import orjson
 import os
+import re
+import sys
 import uuid
-from typing import Dict, Any
+from filelock import FileLock
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+from tests.fixtures.capability_helpers import find_resource
+from tests.fixtures.sample_resources import (
+    PHQ2_QUESTIONNAIRE, PHQ2_QUESTIONNAIRE_BYTES,
+    PHQ2_VALUESET, PHQ2_VALUESET_BYTES,
+    PHQ2_CODESYSTEM, PHQ2_CODESYSTEM_BYTES,
+    DIABETES_QUESTIONNAIRE, DIABETES_QUESTIONNAIRE_BYTES,
+    GLUCOSE_VALUESET, GLUCOSE_VALUESET_BYTES,
+    SIMPLE_TEXT_QUESTIONNAIRE,
+    to_json_bytes,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +43,59 @@ def make_unique_url(base_url: str) -> str:
     return f"{base_url}-{unique_id}"
 
 
+# Bodies are posted pre-serialized with orjson
+FHIR_JSON_HEADERS = {"Content-Type": "application/fhir+json"}
+# Creates only need the new id, which the Location header carries
+CREATE_HEADERS = {
+    "Content-Type": "application/fhir+json",
+    "Prefer": "return=minimal",
+}
+LOCATION_PATTERN = re.compile(r"(\w+)/([^/]+)/_history")
+
+
+def parse_location(location: str) -> Tuple[str, str]:
+    """Split "[base/]Questionnaire/123/_history/1" into (resource_type, id)."""
+    match = LOCATION_PATTERN.search(location)
+    if match is None:
+        raise ValueError(f"Unexpected resource location: {location}")
+    # Interned: the handful of resource types are shared by every tracked pair
+    return sys.intern(match.group(1)), match.group(2)
+
+
+class OrjsonResponse(httpx.Response):
+    """Response whose .json() decodes with orjson instead of stdlib json."""
+
+    def json(self, **kwargs: Any) -> Any:
+        if kwargs:
+            # orjson takes no decoder options; honour them via stdlib json
+            return super().json(**kwargs)
+        return orjson.loads(self.content)
+
+
+class OrjsonAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient that uses orjson for JSON in both directions.
+
+    json= bodies are encoded with orjson (the frozen sample resources are
+    accepted directly) and responses decode .json() with orjson. Scoped to
+    the test clients rather than patching httpx.Response, which the app's
+    own httpx clients also use under --api-transport=asgi.
+    """
+
+    def build_request(self, method, url, *, json: Any = None, **kwargs) -> httpx.Request:
+        if json is not None:
+            headers = httpx.Headers(kwargs.get("headers"))
+            headers.setdefault("Content-Type", "application/json")
+            kwargs["headers"] = headers
+            kwargs["content"] = to_json_bytes(json)
+        return super().build_request(method, url, **kwargs)
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        response = await super().send(request, **kwargs)
+        response.__class__ = OrjsonResponse
+        return response
+
+
 # ============================================================================
 # FHIR Server Configuration
 # ============================================================================
@@ -104,6 +174,14 @@ def pytest_addoption(parser):
         default=None,
         help="Override FHIR server base URL (e.g., http://custom-server:8080/fhir)"
     )
+    parser.addoption(
+        "--api-transport",
+        action="store",
+        choices=("http", "asgi"),
+        default="http",
+        help="How to reach the API: 'http' (running server at API_BASE_URL) or "
+             "'asgi' (in-process app, no socket). Default: http"
+    )
 
 
 @pytest.fixture(scope="session")
@@ -133,20 +211,44 @@ def fhir_server_config(request):
 # FHIR Server Client Fixtures
 # ============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def event_loop():
+    """
+    One event loop for the whole session.
+
+    Session-scoped async fixtures (fhir_server, api_client, clean_resource)
+    must run on the same loop as the tests using them (pytest-asyncio 0.21).
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
 async def fhir_server(fhir_server_config):
     """
     FHIR server client for testing.
 
     Works with any FHIR server (HAPI, Aidbox, Azure, Firely, etc.)
-    Waits for server to be ready before yielding client.
+    Waits for server to be ready once per session before yielding client.
     """
     base_url = fhir_server_config["base_url"]
     server_name = fhir_server_config["name"]
     timeout_seconds = fhir_server_config["startup_timeout"]
     metadata_path = fhir_server_config["metadata_path"]
 
-    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+    # HTTP/2 multiplexes concurrent fixture requests where the server
+    # negotiates h2 (ALPN); plain-http servers stay on pooled HTTP/1.1
+    async with OrjsonAsyncClient(
+        base_url=base_url,
+        timeout=30.0,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=100,
+            keepalive_expiry=60.0
+        )
+    ) as client:
         # Wait for FHIR server to be ready
         logger.info(f"Waiting for {server_name} to be ready at {base_url}...")
         attempts = timeout_seconds // 2
@@ -155,7 +257,7 @@ async def fhir_server(fhir_server_config):
             try:
                 response = await client.get(metadata_path)
                 if response.status_code == 200:
-                    capability = response.json()
+                    capability = orjson.loads(response.content)
                     fhir_version = capability.get("fhirVersion", "unknown")
 
                     # Get server version (different servers provide this differently)
@@ -184,11 +286,33 @@ async def fhir_server(fhir_server_config):
                 f"Is the server running at {base_url}?"
             )
 
+        await _warm_up_validator(client)
         yield client
 
 
+async def _warm_up_validator(client: httpx.AsyncClient) -> None:
+    """
+    Best-effort warmup of the FHIR server's request validator.
+
+    The validator is initialized lazily on the first call, which otherwise
+    stalls the first test; the readiness wait above has already built the
+    CapabilityStatement. Runs once per session (per xdist worker), and only
+    when a test actually needs the server.
+    """
+    try:
+        # $validate exercises the validator without writing anything
+        await client.post(
+            "/Questionnaire/$validate",
+            content=to_json_bytes(SIMPLE_TEXT_QUESTIONNAIRE),
+            headers=FHIR_JSON_HEADERS
+        )
+        logger.debug("Warmed up FHIR server validator")
+    except httpx.HTTPError as e:
+        logger.debug(f"FHIR server warmup skipped: {e}")
+
+
 # Backward compatibility alias
-@pytest.fixture
+@pytest.fixture(scope="session")
 async def hapi_client(fhir_server):
     """
     Backward compatibility alias for fhir_server.
@@ -228,13 +352,19 @@ async def cleanup_all_resources(fhir_server, request):
                     bundle = response.json()
                     entries = bundle.get('entry', [])
 
-                    for entry in entries:
-                        try:
-                            resource_id = entry['resource']['id']
-                            await fhir_server.delete(f"/{resource_type}/{resource_id}")
+                    resource_ids = [entry['resource']['id'] for entry in entries]
+                    results = await asyncio.gather(
+                        *(
+                            fhir_server.delete(f"/{resource_type}/{resource_id}")
+                            for resource_id in resource_ids
+                        ),
+                        return_exceptions=True
+                    )
+                    for resource_id, result in zip(resource_ids, results):
+                        if isinstance(result, Exception):
+                            logger.debug(f"Could not delete {resource_type}: {result}")
+                        else:
                             logger.debug(f"Cleaned up {resource_type}/{resource_id}")
-                        except Exception as e:
-                            logger.debug(f"Could not delete {resource_type}: {e}")
 
             except Exception as e:
                 logger.debug(f"Cleanup error for {resource_type}: {e}")
@@ -243,10 +373,40 @@ async def cleanup_all_resources(fhir_server, request):
     return _cleanup
 
 
-@pytest.fixture
-async def api_client():
-    """FastAPI test client."""
-    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=30.0) as client:
+@pytest.fixture(scope="session")
+async def api_client(request, fhir_server_config):
+    """
+    FastAPI test client.
+
+    Session-scoped: the readiness wait and the connection pool are set up
+    once and shared by every test. With --api-transport=asgi the app runs
+    in-process (lifespan included) against the selected FHIR server.
+    """
+    if request.config.getoption("--api-transport") == "asgi":
+        # Settings are read on first use, so this must precede the app import
+        os.environ["FHIR_BASE_URL"] = fhir_server_config["base_url"]
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            async with OrjsonAsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://test",
+                timeout=30.0
+            ) as client:
+                await _warm_up_api(client)
+                yield client
+        return
+
+    async with OrjsonAsyncClient(
+        base_url=API_BASE_URL,
+        timeout=30.0,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=40,
+            max_keepalive_connections=20,
+            keepalive_expiry=60.0
+        )
+    ) as client:
         # Wait for API to be ready
         logger.info("Waiting for FastAPI test server to be ready...")
         for attempt in range(30):
@@ -261,9 +421,115 @@ async def api_client():
         else:
             raise RuntimeError("FastAPI not ready after 30 seconds")
 
+        await _warm_up_api(client)
         yield client
 
 
+async def _warm_up_api(client: httpx.AsyncClient) -> None:
+    """
+    Route one search through the API so its FHIR connection is open.
+
+    The first API call that reaches the FHIR server opens the API's own
+    upstream session; without this that cost lands on the first test.
+    """
+    try:
+        await client.get("/api/questionnaires/search", params={"_count": 1})
+    except httpx.HTTPError as e:
+        logger.debug(f"API warmup skipped: {e}")
+
+
+@pytest.fixture
+def api_app(request, api_client):
+    """
+    The in-process FastAPI app behind api_client, for dependency overrides.
+
+    Skips the test unless --api-transport=asgi. Overrides are cleared after
+    each test.
+    """
+    if request.config.getoption("--api-transport") != "asgi":
+        pytest.skip("needs the in-process app (--api-transport=asgi)")
+
+    from app.main import app
+
+    yield app
+    app.dependency_overrides.clear()
+
+
+class OfflineFHIRClient:
+    """
+    Stand-in for FHIRClientService with an empty FHIR server behind it.
+
+    Reads find nothing; any other FHIR call is a test error, since tests
+    using it assert behaviour the proxy decides on its own.
+    """
+
+    async def get_resource(self, resource_type: str, resource_id: str):
+        return None
+
+    async def get_resource_cached(self, resource_type: str, resource_id: str):
+        return None
+
+    def __getattr__(self, name: str):
+        raise AssertionError(f"Unexpected FHIR server call: {name}")
+
+
+@pytest.fixture
+def offline_fhir(request, api_client):
+    """
+    Serve the API's FHIR dependency from OfflineFHIRClient, without HAPI.
+
+    Only takes effect with --api-transport=asgi; against a running API
+    server the test talks to the real FHIR server as before.
+    """
+    if request.config.getoption("--api-transport") != "asgi":
+        yield
+        return
+
+    from app.main import app
+    from app.services import get_fhir_client
+
+    app.dependency_overrides[get_fhir_client] = OfflineFHIRClient
+    yield
+    app.dependency_overrides.pop(get_fhir_client, None)
+
+
+MAX_CAPABILITY_STATEMENT_BYTES = 8 * 1024 * 1024
+
+
+@pytest.fixture(scope="session")
+async def capability_statement(fhir_server) -> Dict[str, Any]:
+    """
+    The FHIR server's CapabilityStatement, fetched once per session.
+
+    It does not change while the suite runs; tests must not modify it.
+    The body is streamed and aborted once it exceeds
+    MAX_CAPABILITY_STATEMENT_BYTES, so a runaway server cannot exhaust
+    worker memory.
+    """
+    async with fhir_server.stream("GET", "/metadata") as response:
+        response.raise_for_status()
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            assert len(body) <= MAX_CAPABILITY_STATEMENT_BYTES, \
+                f"CapabilityStatement unexpectedly large (> {MAX_CAPABILITY_STATEMENT_BYTES} bytes)"
+    return orjson.loads(body)
+
+
+@pytest.fixture(scope="session")
+def questionnaire_resource_def(capability_statement) -> Optional[Dict[str, Any]]:
+    """The Questionnaire entry of the CapabilityStatement's rest.resource, or None."""
+    return find_resource(capability_statement, "Questionnaire")
+
+
+@pytest.fixture(scope="session")
+def questionnaire_interaction_codes(questionnaire_resource_def) -> FrozenSet[str]:
+    """Interaction codes declared for Questionnaire (empty if undeclared)."""
+    if questionnaire_resource_def is None:
+        return frozenset()
+    return frozenset(i["code"] for i in questionnaire_resource_def.get("interaction", []))
+
+
 @pytest.fixture(scope="session")
 def server_profile(fhir_server_config):
     """
@@ -281,149 +547,260 @@ def server_profile(fhir_server_config):
 
 
 # ============================================================================
-# Resource Creation/Cleanup Fixtures
+# Common Test Fixtures (PHQ-2, Diabetes)
 # ============================================================================
 
-@pytest.fixture
-async def clean_questionnaire(fhir_server):
-    """
-    Create a Questionnaire and clean it up after test.
+# load_test_fixtures keys, in transaction entry order
+FIXTURE_NAMES = (
+    "phq2_questionnaire_id",
+    "phq2_valueset_id",
+    "phq2_codesystem_id",
+    "diabetes_questionnaire_id",
+    "glucose_valueset_id",
+)
+
 
-    Returns a function that creates and tracks Questionnaires.
+@lru_cache(maxsize=1)
+def fixture_transaction_bytes() -> bytes:
     """
-    created_ids = []
+    Transaction Bundle creating the common fixtures, serialized once.
 
-    async def _create(questionnaire: Dict[str, Any]) -> str:
-        """Create Questionnaire and track for cleanup."""
-        response = await fhir_server.post("/Questionnaire", json=questionnaire)
-        response.raise_for_status()
-        resource_id = response.json()["id"]
-        created_ids.append(resource_id)
-        return resource_id
+    Entries use conditional create (url + version), so copies already on
+    the server are reused. The resource bodies are spliced in from their
+    pre-serialized bytes.
+    """
+    entries = []
+    for resource, body in (
+        (PHQ2_QUESTIONNAIRE, PHQ2_QUESTIONNAIRE_BYTES),
+        (PHQ2_VALUESET, PHQ2_VALUESET_BYTES),
+        (PHQ2_CODESYSTEM, PHQ2_CODESYSTEM_BYTES),
+        (DIABETES_QUESTIONNAIRE, DIABETES_QUESTIONNAIRE_BYTES),
+        (GLUCOSE_VALUESET, GLUCOSE_VALUESET_BYTES),
+    ):
+        request = orjson.dumps({
+            "method": "POST",
+            "url": resource["resourceType"],
+            "ifNoneExist": f"url={resource['url']}&version={resource['version']}"
+        })
+        entries.append(b'{"resource":' + body + b',"request":' + request + b"}")
+
+    return (
+        b'{"resourceType":"Bundle","type":"transaction","entry":['
+        + b",".join(entries)
+        + b"]}"
+    )
 
-    yield _create
 
-    # Cleanup
-    for resource_id in created_ids:
-        try:
-            await fhir_server.delete(f"/Questionnaire/{resource_id}")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup Questionnaire/{resource_id}: {e}")
+# ============================================================================
+# Resource Creation/Cleanup Fixtures
+# ============================================================================
 
+@pytest.fixture(scope="session")
+async def created_resources(fhir_server):
+    """
+    (resource_type, id) created through clean_resource, pending cleanup.
 
-@pytest.fixture
-async def clean_valueset(fhir_server):
+    Everything is deleted at session teardown in one transaction.
     """
-    Create a ValueSet and clean it up after test.
+    created: List[Tuple[str, str]] = []
+    yield created
+
+    await _delete_resources(fhir_server, created)
+
+
+@pytest.fixture(scope="session")
+async def clean_resource(fhir_server, created_resources):
     """
-    created_ids = []
+    Create a FHIR resource and clean it up at the end of the session.
 
-    async def _create(valueset: Dict[str, Any]) -> str:
-        """Create ValueSet and track for cleanup."""
-        response = await fhir_server.post("/ValueSet", json=valueset)
+    Returns a function that creates and tracks resources of any type:
+
+        q_id = await clean_resource("Questionnaire", questionnaire)
+
+    Every call POSTs a new resource, so each test gets its own copy and may
+    modify or delete it. For read-only bodies shared across tests, use
+    shared_resource.
+    """
+    async def _create(resource_type: str, body: Mapping[str, Any]) -> str:
+        """Create resource and track for cleanup."""
+        response = await fhir_server.post(
+            f"/{resource_type}", content=to_json_bytes(body), headers=CREATE_HEADERS
+        )
         response.raise_for_status()
-        resource_id = response.json()["id"]
-        created_ids.append(resource_id)
+        _, resource_id = parse_location(response.headers["Location"])
+        created_resources.append((resource_type, resource_id))
         return resource_id
 
-    yield _create
+    return _create
 
-    # Cleanup
-    for resource_id in created_ids:
-        try:
-            await fhir_server.delete(f"/ValueSet/{resource_id}")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup ValueSet/{resource_id}: {e}")
 
+@pytest.fixture(scope="session")
+async def shared_resource(clean_resource):
+    """
+    Create a read-only FHIR resource once per session, memoized by content.
 
-@pytest.fixture
-async def clean_codesystem(fhir_server):
+    Like clean_resource, but posting an identical body again (in this or
+    another test) returns the id from the first POST instead of creating a
+    duplicate. Only for resources no test updates or deletes; anything a
+    test modifies must come from clean_resource.
+
+        q_id = await shared_resource("Questionnaire", QUESTIONNAIRE_WITH_LIBRARY)
     """
-    Create a CodeSystem and clean it up after test.
+    pending: Dict[Tuple[str, bytes], "asyncio.Task[str]"] = {}
+
+    async def _get(resource_type: str, body: Mapping[str, Any]) -> str:
+        """Create resource (once per unique body) and track for cleanup."""
+        key = (resource_type, hashlib.sha1(orjson.dumps(
+            body, default=dict, option=orjson.OPT_SORT_KEYS
+        )).digest())
+        # A task rather than the id, so concurrent identical creates share one POST
+        task = pending.get(key)
+        if task is None:
+            task = pending[key] = asyncio.ensure_future(clean_resource(resource_type, body))
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            pending.pop(key, None)
+            raise
+
+    return _get
+
+
+@pytest.fixture(scope="session")
+def questionnaire_factory(clean_resource):
     """
-    created_ids = []
+    Create a fresh SIMPLE_TEXT_QUESTIONNAIRE copy with a unique title.
 
-    async def _create(codesystem: Dict[str, Any]) -> str:
-        """Create CodeSystem and track for cleanup."""
-        response = await fhir_server.post("/CodeSystem", json=codesystem)
-        response.raise_for_status()
-        resource_id = response.json()["id"]
-        created_ids.append(resource_id)
-        return resource_id
+    Returns a function that creates one per call and returns its ID;
+    cleanup is the session-end transaction of clean_resource:
 
-    yield _create
+        q_id = await questionnaire_factory()
+    """
+    async def _create() -> str:
+        return await clean_resource("Questionnaire", {
+            **SIMPLE_TEXT_QUESTIONNAIRE,
+            "title": f"{SIMPLE_TEXT_QUESTIONNAIRE['title']} {generate_unique_id()}",
+        })
 
-    # Cleanup
-    for resource_id in created_ids:
-        try:
-            await fhir_server.delete(f"/CodeSystem/{resource_id}")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup CodeSystem/{resource_id}: {e}")
+    return _create
 
 
-@pytest.fixture
-async def load_test_fixtures(fhir_server):
+async def _load_common_fixtures(
+    fhir_server: httpx.AsyncClient
+) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
     """
-    Load common test fixtures into FHIR server for testing.
+    POST the common fixtures transaction.
 
-    Returns dict mapping fixture names to resource IDs.
+    Returns:
+        (fixture name -> resource id, (type, id) this call inserted (201))
     """
-    from tests.fixtures.sample_resources import (
-        PHQ2_QUESTIONNAIRE,
-        PHQ2_VALUESET,
-        PHQ2_CODESYSTEM,
-        DIABETES_QUESTIONNAIRE,
-        GLUCOSE_VALUESET
-    )
+    fixtures: Dict[str, str] = {}
+    created: List[Tuple[str, str]] = []
+    try:
+        response = await fhir_server.post(
+            "/",
+            content=fixture_transaction_bytes(),
+            headers=FHIR_JSON_HEADERS
+        )
+        response.raise_for_status()
 
-    fixtures = {}
+        # Entries come back in request order: "Questionnaire/123/_history/1"
+        for fixture_name, entry in zip(FIXTURE_NAMES, orjson.loads(response.content)["entry"]):
+            resource_type, resource_id = parse_location(entry["response"]["location"])
+            fixtures[fixture_name] = resource_id
+            if entry["response"]["status"].startswith("201"):
+                created.append((resource_type, resource_id))
 
-    # Load PHQ-2 resources
+        logger.info("Loaded PHQ-2 and Diabetes test fixtures")
+    except Exception as e:
+        logger.warning(f"Failed to load test fixtures: {e}")
+
+    return fixtures, created
+
+
+async def _delete_resources(
+    fhir_server: httpx.AsyncClient,
+    resources: List[Tuple[str, str]]
+) -> None:
+    """Delete (type, id) resources in one transaction, best effort."""
+    if not resources:
+        return
+
+    cleanup = {
+        "resourceType": "Bundle",
+        "type": "transaction",
+        "entry": [
+            {"request": {"method": "DELETE", "url": f"{resource_type}/{resource_id}"}}
+            for resource_type, resource_id in resources
+        ]
+    }
     try:
-        response = await fhir_server.post("/Questionnaire", json=PHQ2_QUESTIONNAIRE)
-        fixtures["phq2_questionnaire_id"] = response.json()["id"]
-
-        response = await fhir_server.post("/ValueSet", json=PHQ2_VALUESET)
-        fixtures["phq2_valueset_id"] = response.json()["id"]
+        response = await fhir_server.post(
+            "/", content=orjson.dumps(cleanup), headers=FHIR_JSON_HEADERS
+        )
+        response.raise_for_status()
+        logger.debug(f"Cleaned up {len(resources)} test resources")
+    except Exception as e:
+        logger.warning(f"Failed to cleanup {resources}: {e}")
 
-        response = await fhir_server.post("/CodeSystem", json=PHQ2_CODESYSTEM)
-        fixtures["phq2_codesystem_id"] = response.json()["id"]
 
-        logger.info("Loaded PHQ-2 test fixtures")
-    except Exception as e:
-        logger.warning(f"Failed to load PHQ-2 fixtures: {e}")
+@pytest.fixture(scope="session")
+async def common_fixtures(fhir_server, tmp_path_factory, worker_id):
+    """
+    Load common test fixtures into FHIR server once per session.
 
-    # Load Diabetes resources
-    try:
-        response = await fhir_server.post("/Questionnaire", json=DIABETES_QUESTIONNAIRE)
-        fixtures["diabetes_questionnaire_id"] = response.json()["id"]
+    Returns dict mapping fixture names to resource IDs. The resources this
+    session inserted are deleted at session teardown.
 
-        response = await fhir_server.post("/ValueSet", json=GLUCOSE_VALUESET)
-        fixtures["glucose_valueset_id"] = response.json()["id"]
+    Under pytest-xdist the workers would otherwise race the conditional
+    creates and leave duplicates (every later run then gets 412). The
+    first worker creates the fixtures behind a FileLock in the run's
+    shared temp dir and records them; the others reuse that record, and
+    the last worker to finish deletes what was created.
+    """
+    if worker_id == "master":
+        fixtures, created = await _load_common_fixtures(fhir_server)
+        yield fixtures
+        await _delete_resources(fhir_server, created)
+        return
+
+    shared_dir = tmp_path_factory.getbasetemp().parent
+    lock = FileLock(str(shared_dir / "common_fixtures.lock"))
+    state_file = shared_dir / "common_fixtures.json"
+
+    with lock:
+        if state_file.is_file():
+            state = orjson.loads(state_file.read_bytes())
+        else:
+            fixtures, created = await _load_common_fixtures(fhir_server)
+            state = {"fixtures": fixtures, "created": created, "users": 0}
+        state["users"] += 1
+        state_file.write_bytes(orjson.dumps(state))
+
+    yield state["fixtures"]
+
+    with lock:
+        state = orjson.loads(state_file.read_bytes())
+        state["users"] -= 1
+        if state["users"] > 0:
+            state_file.write_bytes(orjson.dumps(state))
+            return
+        # Last user out; a worker starting later simply creates them again
+        state_file.unlink()
+        await _delete_resources(
+            fhir_server, [tuple(resource) for resource in state["created"]]
+        )
 
-        logger.info("Loaded Diabetes test fixtures")
-    except Exception as e:
-        logger.warning(f"Failed to load Diabetes fixtures: {e}")
 
-    yield fixtures
+@pytest.fixture(scope="session")
+def load_test_fixtures(common_fixtures):
+    """
+    Common test fixture IDs, shared by every test in the session.
 
-    # Cleanup all created resources
-    for fixture_name, resource_id in fixtures.items():
-        try:
-            # Extract resource type from fixture name
-            if "questionnaire" in fixture_name:
-                resource_type = "Questionnaire"
-            elif "valueset" in fixture_name:
-                resource_type = "ValueSet"
-            elif "codesystem" in fixture_name:
-                resource_type = "CodeSystem"
-            else:
-                continue
-
-            await fhir_server.delete(f"/{resource_type}/{resource_id}")
-            logger.debug(f"Cleaned up {resource_type}/{resource_id}")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup {fixture_name} ({resource_id}): {e}")
+    Returns a read-only view of the session-loaded dict, so no test can
+    change the IDs the tests after it see.
+    """
+    return MappingProxyType(common_fixtures)
 
 
 # ============================================================================
@@ -460,8 +837,8 @@ PRO_LIBRARY_CANONICALS = {
 }
 
 
-@pytest.fixture
-async def pro_questionnaires(fhir_server_config):
+@pytest.fixture(scope="session")
+async def pro_questionnaires(fhir_server):
     """
     Resolve MII PRO Questionnaires that the container ships pre-loaded.
 
@@ -470,36 +847,71 @@ async def pro_questionnaires(fhir_server_config):
     PRO Questionnaire is missing — that means the container's IG bundling
     is broken, not the test.
     """
-    base_url = fhir_server_config["base_url"]
     resolved: Dict[str, Dict[str, Any]] = {}
 
-    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
-        for short_name, canonical in PRO_QUESTIONNAIRE_CANONICALS.items():
-            response = await client.get(
-                "/Questionnaire", params={"url": canonical, "_summary": "true"}
-            )
-            response.raise_for_status()
-            bundle = response.json()
-            if bundle.get("total", 0) == 0 or not bundle.get("entry"):
-                pytest.fail(
-                    f"MII PRO Questionnaire not found in container: {canonical}. "
-                    f"The Form Manager image is supposed to bake this in — check "
-                    f"Dockerfile.form-manager and the IG install step."
-                )
-            entry = bundle["entry"][0]["resource"]
-            resolved[short_name] = {
-                "id": entry["id"],
-                "url": entry["url"],
-                "version": entry.get("version"),
-            }
-            logger.info(
-                f"Resolved PRO Questionnaire {short_name!r} → "
-                f"id={entry['id']} version={entry.get('version')}"
+    for short_name, canonical in PRO_QUESTIONNAIRE_CANONICALS.items():
+        response = await fhir_server.get(
+            "/Questionnaire", params={"url": canonical, "_summary": "true"}
+        )
+        response.raise_for_status()
+        bundle = orjson.loads(response.content)
+        if bundle.get("total", 0) == 0 or not bundle.get("entry"):
+            pytest.fail(
+                f"MII PRO Questionnaire not found in container: {canonical}. "
+                f"The Form Manager image is supposed to bake this in — check "
+                f"Dockerfile.form-manager and the IG install step."
             )
+        entry = bundle["entry"][0]["resource"]
+        resolved[short_name] = {
+            "id": entry["id"],
+            "url": entry["url"],
+            "version": entry.get("version"),
+        }
+        logger.info(
+            f"Resolved PRO Questionnaire {short_name!r} → "
+            f"id={entry['id']} version={entry.get('version')}"
+        )
 
     return resolved
 
 
+@pytest.fixture(scope="session")
+def package_bundle(api_client):
+    """
+    Read-through cache of API $package responses for read-only content.
+
+    Returns a function that GETs $package once per distinct request and
+    hands back (status_code, bundle) on every later call:
+
+        status_code, bundle = await package_bundle(q_id)
+        status_code, bundle = await package_bundle(url=canonical, version="1.0")
+
+    $package is deterministic for the pre-loaded MII PRO content, so this
+    is only for that content; resources created by a test get fresh ids
+    and bypass it naturally. Bundles are shared: do not modify them.
+    """
+    cache: Dict[Tuple[Optional[str], Tuple[Tuple[str, Any], ...]], "asyncio.Task"] = {}
+
+    async def _fetch(q_id: Optional[str], params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        path = f"/api/questionnaires/{q_id}/$package" if q_id else "/api/questionnaires/$package"
+        response = await api_client.get(path, params=params)
+        return response.status_code, orjson.loads(response.content)
+
+    async def _get(q_id: Optional[str] = None, **params: Any) -> Tuple[int, Dict[str, Any]]:
+        """Instance-level $package for q_id, or type-level by canonical params."""
+        key = (q_id, tuple(sorted(params.items())))
+        task = cache.get(key)
+        if task is None:
+            task = cache[key] = asyncio.ensure_future(_fetch(q_id, params))
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            cache.pop(key, None)
+            raise
+
+    return _get
+
+
 # Marker for skipping tests if HAPI is not available
 def pytest_configure(config):
     """Register custom markers."""
@@ -0,0 +1,70 @@
+"""Helpers for inspecting FHIR Bundles in tests."""
+import io
+from collections import defaultdict
+from operator import itemgetter
+from typing import Any, DefaultDict, Dict, List, Mapping, Optional
+
+import ijson
+
+_get_resource = itemgetter("resource")
+
+
+def resources_by_type(bundle: Mapping[str, Any]) -> DefaultDict[str, List[Dict[str, Any]]]:
+    """
+    Bucket a Bundle's entry resources by resourceType in a single pass.
+
+    Args:
+        bundle: Bundle resource (entry may be absent)
+
+    Returns:
+        resourceType -> resources in entry order; missing types yield []
+    """
+    buckets: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for resource in map(_get_resource, bundle.get("entry", [])):
+        buckets[resource["resourceType"]].append(resource)
+    return buckets
+
+
+def urls_by_type(bundle: Mapping[str, Any]) -> DefaultDict[str, List[Optional[str]]]:
+    """
+    Collect entry resource canonical URLs by resourceType in a single pass.
+
+    Args:
+        bundle: Bundle resource (entry may be absent)
+
+    Returns:
+        resourceType -> url of each resource in entry order (None if unset,
+        duplicates kept); missing types yield []
+    """
+    urls: DefaultDict[str, List[Optional[str]]] = defaultdict(list)
+    for resource in map(_get_resource, bundle.get("entry", [])):
+        urls[resource["resourceType"]].append(resource.get("url"))
+    return urls
+
+
+def slim_bundle(content: bytes) -> Dict[str, Any]:
+    """
+    Stream-parse a Bundle, keeping only what dependency tests inspect.
+
+    Walks the JSON events once without building the full tree, so memory
+    stays flat for bundles with hundreds of ValueSets/CodeSystems.
+
+    Args:
+        content: Raw Bundle JSON
+
+    Returns:
+        Bundle-shaped dict (usable with resources_by_type) whose entry
+        resources carry only resourceType and url
+    """
+    bundle: Dict[str, Any] = {"resourceType": None, "entry": []}
+    entries: List[Dict[str, Dict[str, Optional[str]]]] = bundle["entry"]
+    for prefix, event, value in ijson.parse(io.BytesIO(content)):
+        if prefix == "entry.item" and event == "start_map":
+            entries.append({"resource": {"resourceType": None, "url": None}})
+        elif prefix == "entry.item.resource.resourceType":
+            entries[-1]["resource"]["resourceType"] = value
+        elif prefix == "entry.item.resource.url":
+            entries[-1]["resource"]["url"] = value
+        elif prefix == "resourceType":
+            bundle["resourceType"] = value
+    return bundle
@@ -0,0 +1,39 @@
+"""Helpers for inspecting a FHIR CapabilityStatement in tests."""
+from typing import Any, Iterable, Mapping, Optional
+
+
+def find_resource(capability: Mapping[str, Any], type_: str) -> Optional[Mapping[str, Any]]:
+    """
+    Return the first rest.resource entry declaring the given type.
+
+    Args:
+        capability: CapabilityStatement resource
+        type_: FHIR resource type, e.g. "Questionnaire"
+
+    Returns:
+        The matching resource entry, or None if no rest block declares it
+    """
+    return next(
+        (
+            resource
+            for rest in capability.get("rest", [])
+            for resource in rest.get("resource", [])
+            if resource["type"] == type_
+        ),
+        None,
+    )
+
+
+def has_sdc_operation(resource: Optional[Mapping[str, Any]]) -> bool:
+    """True if a rest.resource entry declares the SDC $package operation."""
+    if resource is None:
+        return False
+    return any("$package" in op.get("name", "") for op in resource.get("operation", []))
+
+
+def any_canonical_contains(canonicals: Iterable[str], *fragments: str) -> bool:
+    """True if some canonical URL contains every fragment (case-insensitive)."""
+    return any(
+        all(fragment in canonical.lower() for fragment in fragments)
+        for canonical in canonicals
+    )
@@ -1,15 +1,48 @@
 """Sample FHIR resources for testing."""
+from types import MappingProxyType
+from typing import Any, Tuple
+import orjson
+
+
+def _freeze(obj: Any) -> Any:
+    """Recursively make a resource read-only (dict -> MappingProxyType, list -> tuple)."""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+
+def to_json_bytes(obj: Any) -> bytes:
+    """Serialize a (possibly frozen) resource to JSON bytes."""
+    return orjson.dumps(obj, default=dict)
+
+
+_QUESTIONNAIRE_BASE = {"resourceType": "Questionnaire", "status": "active"}
+
+
+def make_questionnaire(item: Any = (), **overrides: Any) -> Any:
+    """
+    Build a frozen Questionnaire from the shared template.
+
+    Args:
+        item: The Questionnaire items
+        **overrides: Top-level elements to set or replace (id, url, status, ...)
+
+    Returns:
+        Read-only Questionnaire resource
+    """
+    return _freeze({**_QUESTIONNAIRE_BASE, **overrides, "item": list(item)})
+
 
 # PHQ-2 Depression Screening (2 questions)
-PHQ2_QUESTIONNAIRE = {
-    "resourceType": "Questionnaire",
-    "id": "phq-2",
-    "url": "http://example.org/Questionnaire/phq-2",
-    "version": "1.0.0",
-    "status": "active",
-    "title": "PHQ-2 Depression Screening",
-    "description": "Patient Health Questionnaire-2 for depression screening",
-    "item": [
+PHQ2_QUESTIONNAIRE = make_questionnaire(
+    id="phq-2",
+    url="http://example.org/Questionnaire/phq-2",
+    version="1.0.0",
+    title="PHQ-2 Depression Screening",
+    description="Patient Health Questionnaire-2 for depression screening",
+    item=[
         {
             "linkId": "1",
             "text": "Little interest or pleasure in doing things?",
@@ -24,10 +57,10 @@ PHQ2_QUESTIONNAIRE = {
             "required": True,
             "answerValueSet": "http://example.org/ValueSet/phq2-frequency"
         }
-    ]
-}
+    ],
+)
 
-PHQ2_VALUESET = {
+PHQ2_VALUESET = _freeze({
     "resourceType": "ValueSet",
     "id": "phq2-frequency",
     "url": "http://example.org/ValueSet/phq2-frequency",
@@ -49,9 +82,9 @@ PHQ2_VALUESET = {
             }
         ]
     }
-}
+})
 
-PHQ2_CODESYSTEM = {
+PHQ2_CODESYSTEM = _freeze({
     "resourceType": "CodeSystem",
     "id": "phq-frequency",
     "url": "http://example.org/CodeSystem/phq-frequency",
@@ -66,18 +99,16 @@ PHQ2_CODESYSTEM = {
         {"code": "more-than-half", "display": "More than half the days"},
         {"code": "nearly-every-day", "display": "Nearly every day"}
     ]
-}
+})
 
 # Diabetes Screening Questionnaire
-DIABETES_QUESTIONNAIRE = {
-    "resourceType": "Questionnaire",
-    "id": "diabetes-screening",
-    "url": "http://example.org/Questionnaire/diabetes-screening",
-    "version": "2.0.0",
-    "status": "active",
-    "title": "Diabetes Risk Assessment",
-    "description": "Questionnaire for assessing diabetes risk factors",
-    "item": [
+DIABETES_QUESTIONNAIRE = make_questionnaire(
+    id="diabetes-screening",
+    url="http://example.org/Questionnaire/diabetes-screening",
+    version="2.0.0",
+    title="Diabetes Risk Assessment",
+    description="Questionnaire for assessing diabetes risk factors",
+    item=[
         {
             "linkId": "1",
             "text": "What is your age?",
@@ -114,10 +145,10 @@ DIABETES_QUESTIONNAIRE = {
                 }
             ]
         }
-    ]
-}
+    ],
+)
 
-GLUCOSE_VALUESET = {
+GLUCOSE_VALUESET = _freeze({
     "resourceType": "ValueSet",
     "id": "glucose-levels",
     "url": "http://example.org/ValueSet/glucose-levels",
@@ -136,29 +167,26 @@ GLUCOSE_VALUESET = {
             }
         ]
     }
-}
+})
 
 # Questionnaire with missing dependencies (for error testing)
-QUESTIONNAIRE_WITH_MISSING_VALUESET = {
-    "resourceType": "Questionnaire",
-    "status": "draft",
-    "title": "Test Questionnaire with Missing Dependencies",
-    "item": [
+QUESTIONNAIRE_WITH_MISSING_VALUESET = make_questionnaire(
+    status="draft",
+    title="Test Questionnaire with Missing Dependencies",
+    item=[
         {
             "linkId": "1",
             "text": "Question with missing ValueSet",
             "type": "choice",
             "answerValueSet": "http://example.org/ValueSet/DOES_NOT_EXIST"
         }
-    ]
-}
+    ],
+)
 
 # Questionnaire with nested items (complex structure)
-COMPLEX_NESTED_QUESTIONNAIRE = {
-    "resourceType": "Questionnaire",
-    "status": "active",
-    "title": "Complex Nested Questionnaire",
-    "item": [
+COMPLEX_NESTED_QUESTIONNAIRE = make_questionnaire(
+    title="Complex Nested Questionnaire",
+    item=[
         {
             "linkId": "1",
             "text": "Patient Demographics",
@@ -195,15 +223,13 @@ COMPLEX_NESTED_QUESTIONNAIRE = {
                 }
             ]
         }
-    ]
-}
+    ],
+)
 
 # Simple questionnaire with no dependencies
-SIMPLE_TEXT_QUESTIONNAIRE = {
-    "resourceType": "Questionnaire",
-    "status": "active",
-    "title": "Simple Text-Only Questionnaire",
-    "item": [
+SIMPLE_TEXT_QUESTIONNAIRE = make_questionnaire(
+    title="Simple Text-Only Questionnaire",
+    item=[
         {
             "linkId": "1",
             "text": "What is your name?",
@@ -219,21 +245,19 @@ SIMPLE_TEXT_QUESTIONNAIRE = {
             "text": "Additional comments",
             "type": "text"
         }
-    ]
-}
+    ],
+)
 
 # Questionnaire with Library reference (for CQL/FHIRPath)
-QUESTIONNAIRE_WITH_LIBRARY = {
-    "resourceType": "Questionnaire",
-    "status": "active",
-    "title": "BMI Calculator Questionnaire",
-    "extension": [
+QUESTIONNAIRE_WITH_LIBRARY = make_questionnaire(
+    title="BMI Calculator Questionnaire",
+    extension=[
         {
             "url": "http://hl7.org/fhir/StructureDefinition/cqf-library",
             "valueCanonical": "http://example.org/Library/bmi-calculator|1.0"
         }
     ],
-    "item": [
+    item=[
         {
             "linkId": "1",
             "text": "Height (cm)",
@@ -250,10 +274,37 @@ QUESTIONNAIRE_WITH_LIBRARY = {
             "type": "decimal",
             "readOnly": True
         }
-    ]
-}
+    ],
+)
+
+
+def make_large_questionnaire(item_count: int) -> Any:
+    """
+    Build a Questionnaire with item_count flat string items.
+
+    Args:
+        item_count: Number of items
+
+    Returns:
+        Read-only Questionnaire resource
+    """
+    return make_questionnaire(
+        status="draft",
+        item=[
+            {
+                "linkId": f"item-{i}",
+                "text": f"Question {i}",
+                "type": "string"
+            }
+            for i in range(item_count)
+        ],
+    )
 
-SAMPLE_LIBRARY = {
+
+# Payload sizes for the large-payload tests; the largest runs as `slow`
+LARGE_QUESTIONNAIRE_SIZES = (10, 100, 1000)
+
+SAMPLE_LIBRARY = _freeze({
     "resourceType": "Library",
     "id": "bmi-calculator",
     "url": "http://example.org/Library/bmi-calculator",
@@ -273,4 +324,120 @@ SAMPLE_LIBRARY = {
             "data": "bGlicmFyeSBCTUlDYWxjdWxhdG9yIHZlcnNpb24gJzEuMCc="
         }
     ]
+})
+
+
+def make_circular_resources(vs1_url: str, vs2_url: str) -> Tuple[Any, Any, Any]:
+    """
+    Build two ValueSets that include each other, plus a Questionnaire bound to the first.
+
+    Canonicals are passed in so callers can make them unique per run.
+
+    Args:
+        vs1_url: Canonical URL of the first ValueSet (bound by the Questionnaire)
+        vs2_url: Canonical URL of the second ValueSet
+
+    Returns:
+        Read-only (valueset1, valueset2, questionnaire)
+    """
+    valueset1 = _freeze({
+        "resourceType": "ValueSet",
+        "url": vs1_url,
+        "version": "1.0.0",
+        "status": "active",
+        "name": "CircularValueSet1",
+        "title": "Circular ValueSet 1",
+        "compose": {
+            "include": [
+                {
+                    "system": "http://loinc.org",
+                    "concept": [{"code": "1234-5", "display": "Test Code"}],
+                },
+                {"valueSet": [vs2_url]},
+            ]
+        },
+    })
+    valueset2 = _freeze({
+        "resourceType": "ValueSet",
+        "url": vs2_url,
+        "version": "1.0.0",
+        "status": "active",
+        "name": "CircularValueSet2",
+        "title": "Circular ValueSet 2",
+        "compose": {
+            "include": [
+                {
+                    "system": "http://snomed.info/sct",
+                    "concept": [{"code": "9876-5", "display": "Another Code"}],
+                },
+                {"valueSet": [vs1_url]},
+            ]
+        },
+    })
+    questionnaire = make_questionnaire(
+        title="Questionnaire with Circular Dependencies",
+        item=[
+            {
+                "linkId": "1",
+                "text": "Question with circular ValueSet",
+                "type": "choice",
+                "answerValueSet": vs1_url,
+            }
+        ],
+    )
+    return valueset1, valueset2, questionnaire
+
+
+def make_deep_nested_resources(cs_url: str, vs_url: str) -> Tuple[Any, Any, Any]:
+    """
+    Build a Questionnaire -> ValueSet -> CodeSystem chain.
+
+    Args:
+        cs_url: Canonical URL of the CodeSystem
+        vs_url: Canonical URL of the ValueSet including that CodeSystem
+
+    Returns:
+        Read-only (codesystem, valueset, questionnaire)
+    """
+    codesystem = _freeze({
+        "resourceType": "CodeSystem",
+        "url": cs_url,
+        "version": "1.0.0",
+        "status": "active",
+        "content": "complete",
+        "concept": [
+            {"code": "code1", "display": "Code 1"},
+            {"code": "code2", "display": "Code 2"},
+        ],
+    })
+    valueset = _freeze({
+        "resourceType": "ValueSet",
+        "url": vs_url,
+        "version": "1.0.0",
+        "status": "active",
+        "compose": {"include": [{"system": cs_url}]},
+    })
+    questionnaire = make_questionnaire(
+        title="Deep Nested Dependencies",
+        item=[
+            {
+                "linkId": "1",
+                "text": "Question",
+                "type": "choice",
+                "answerValueSet": vs_url,
+            }
+        ],
+    )
+    return codesystem, valueset, questionnaire
+
+
+# Pre-serialized request bodies (common_fixtures uploads, large payloads); the
+# resources above are frozen, so these never go stale
+PHQ2_QUESTIONNAIRE_BYTES = to_json_bytes(PHQ2_QUESTIONNAIRE)
+PHQ2_VALUESET_BYTES = to_json_bytes(PHQ2_VALUESET)
+PHQ2_CODESYSTEM_BYTES = to_json_bytes(PHQ2_CODESYSTEM)
+DIABETES_QUESTIONNAIRE_BYTES = to_json_bytes(DIABETES_QUESTIONNAIRE)
+GLUCOSE_VALUESET_BYTES = to_json_bytes(GLUCOSE_VALUESET)
+LARGE_QUESTIONNAIRE_BYTES = {
+    size: to_json_bytes(make_large_questionnaire(size)) for size in LARGE_QUESTIONNAIRE_SIZES
 }
@@ -0,0 +1,220 @@
+"""
+Integration tests for FHIR search semantics, run directly against HAPI.
+
+These only need the FHIR server client, so they don't depend on the
+FastAPI app (or its lifespan under --api-transport=asgi).
+"""
+import asyncio
+import datetime
+import uuid
+import pytest
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+class TestHAPIDirectSearch:
+    """Tests for Questionnaire searches against HAPI directly."""
+
+    async def test_search_by_canonical_url(
+        self,
+        hapi_client,
+        clean_resource
+    ):
+        """
+        SDC Requirement: SHALL support search by canonical URL
+
+        Test ID: TEST-SEARCH-CANONICAL-URL
+        Requirement: SDC-FM-Q-021-SHALL
+
+        Given: Questionnaire with canonical URL
+        When: GET /Questionnaire?url=[canonical] (HAPI search)
+        Then: Returns matching Questionnaire
+
+        Reference: FHIR R4 Canonical URLs, SDC IG Form Manager
+        """
+        # Unique per run, so parallel workers and reruns don't collide
+        canonical_url = (
+            f"http://example.org/Questionnaire/test-search-canonical-new-{uuid.uuid4().hex}"
+        )
+
+        # Create questionnaire with canonical URL
+        questionnaire = {
+            "resourceType": "Questionnaire",
+            "url": canonical_url,
+            "version": "1.0.0",
+            "status": "active",
+            "title": "Test Search by Canonical URL",
+            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
+        }
+
+        await clean_resource("Questionnaire", questionnaire)
+
+        # Search by canonical URL using HAPI directly
+        response = await hapi_client.get(
+            "/Questionnaire",
+            params={"url": canonical_url}
+        )
+
+        assert response.status_code == 200
+        bundle = response.json()
+
+        assert bundle["resourceType"] == "Bundle"
+        assert bundle["type"] == "searchset"
+        assert bundle["total"] >= 1
+
+        # Verify the correct questionnaire was found
+        found_urls = [
+            entry["resource"].get("url")
+            for entry in bundle.get("entry", [])
+            if "url" in entry["resource"]
+        ]
+        assert canonical_url in found_urls
+
+    async def test_search_by_url_and_version(
+        self,
+        hapi_client,
+        clean_resource
+    ):
+        """
+        SDC Requirement: SHALL support search by URL and version
+
+        Test ID: TEST-SEARCH-URL-VERSION
+        Requirement: SDC-FM-Q-022-SHALL
+
+        Given: Multiple versions of same Questionnaire
+        When: GET /Questionnaire?url=[canonical]&version=[version] (HAPI search)
+        Then: Returns only the specified version
+
+        Reference: FHIR R4 Versioned Canonical URLs
+        """
+        # Unique per run, so parallel workers and reruns don't collide
+        canonical_url = (
+            f"http://example.org/Questionnaire/test-version-search-new-{uuid.uuid4().hex}"
+        )
+
+        # Create two versions of the same questionnaire
+        questionnaire_v1 = {
+            "resourceType": "Questionnaire",
+            "url": canonical_url,
+            "version": "1.5.0",
+            "status": "active",
+            "title": "Version 1.5.0",
+            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
+        }
+
+        questionnaire_v2 = {
+            "resourceType": "Questionnaire",
+            "url": canonical_url,
+            "version": "2.5.0",
+            "status": "active",
+            "title": "Version 2.5.0",
+            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
+        }
+
+        await asyncio.gather(
+            clean_resource("Questionnaire", questionnaire_v1),
+            clean_resource("Questionnaire", questionnaire_v2),
+        )
+
+        # Search for specific version using HAPI directly
+        response = await hapi_client.get(
+            "/Questionnaire",
+            params={
+                "url": canonical_url,
+                "version": "1.5.0"
+            }
+        )
+
+        assert response.status_code == 200
+        bundle = response.json()
+
+        assert bundle["resourceType"] == "Bundle"
+        assert bundle["total"] >= 1
+
+        # Verify only version 1.5.0 is returned
+        found_version_1_5 = False
+        for entry in bundle.get("entry", []):
+            resource = entry["resource"]
+            if resource.get("url") == canonical_url:
+                assert resource.get("version") == "1.5.0", f"Expected version 1.5.0 but got {resource.get('version')}"
+                assert resource.get("title") == "Version 1.5.0"
+                found_version_1_5 = True
+
+        assert found_version_1_5, "Version 1.5.0 not found in search results"
+
+    async def test_search_by_last_updated(
+        self,
+        hapi_client,
+        clean_resource
+    ):
+        """
+        SDC Requirement: SHALL support search by _lastUpdated
+
+        Test ID: TEST-SEARCH-LASTUPDATED
+        Requirement: SDC-FM-SP-002-SHALL
+
+        Given: Questionnaires with different update times
+        When: GET /Questionnaire?_lastUpdated=gt[timestamp] (HAPI search)
+        Then: Returns only Questionnaires updated after timestamp
+
+        Reference: FHIR R4 _lastUpdated search parameter
+        """
+        def parse_instant(value: str) -> datetime.datetime:
+            return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+        # Create first questionnaire
+        q1 = {
+            "resourceType": "Questionnaire",
+            "status": "draft",
+            "title": "First Questionnaire Test LastUpdated",
+            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
+        }
+        q1_id = await clean_resource("Questionnaire", q1)
+
+        # Get the first questionnaire to check its lastUpdated timestamp
+        response = await hapi_client.get(f"/Questionnaire/{q1_id}")
+        q1_resource = response.json()
+        q1_last_updated = q1_resource["meta"]["lastUpdated"]
+
+        # Create second questionnaire
+        q2 = {
+            "resourceType": "Questionnaire",
+            "status": "draft",
+            "title": "Second Questionnaire Test LastUpdated",
+            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
+        }
+        q2_id = await clean_resource("Questionnaire", q2)
+
+        # Both may land in the same clock tick; re-save q2 until its
+        # lastUpdated is strictly later (bounded at ~500ms)
+        for _ in range(10):
+            response = await hapi_client.get(f"/Questionnaire/{q2_id}")
+            q2_resource = response.json()
+            q2_last_updated = q2_resource["meta"]["lastUpdated"]
+            if parse_instant(q2_last_updated) > parse_instant(q1_last_updated):
+                break
+            await asyncio.sleep(0.05)
+            await hapi_client.put(f"/Questionnaire/{q2_id}", json=q2_resource)
+
+        assert parse_instant(q2_last_updated) > parse_instant(q1_last_updated)
+
+        # Search for questionnaires updated after the first one using HAPI directly
+        response = await hapi_client.get(
+            "/Questionnaire",
+            params={"_lastUpdated": f"gt{q1_last_updated}"}
+        )
+
+        assert response.status_code == 200
+        bundle = response.json()
+
+        assert bundle["resourceType"] == "Bundle"
+
+        # The second questionnaire should be in results (updated after q1)
+        titles = [
+            entry["resource"].get("title", "")
+            for entry in bundle.get("entry", [])
+        ]
+
+        # Second Questionnaire should be found (created after timestamp)
+        assert "Second Questionnaire Test LastUpdated" in titles, \
+            f"Expected to find 'Second Questionnaire Test LastUpdated' but found: {titles}"
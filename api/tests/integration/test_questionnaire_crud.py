@@ -3,19 +3,23 @@ Integration tests for Questionnaire CRUD operations.
 
 Tests the FastAPI proxy layer to HAPI FHIR, including failure scenarios.
 """
+import asyncio
+import httpx
 import pytest
 from tests.fixtures.sample_resources import (
+    LARGE_QUESTIONNAIRE_BYTES,
     PHQ2_QUESTIONNAIRE,
-    SIMPLE_TEXT_QUESTIONNAIRE
 )
 
+NONEXISTENT_ID = "NONEXISTENT_ID_12345"
+
 
 @pytest.mark.integration
 @pytest.mark.asyncio
 class TestQuestionnaireCreate:
     """Tests for creating Questionnaires via FastAPI."""
 
-    async def test_create_questionnaire_success(self, api_client, hapi_client):
+    async def test_create_questionnaire_success(self, api_client, created_resources):
         """
         Test: Successfully create a Questionnaire
 
@@ -37,15 +41,15 @@ class TestQuestionnaireCreate:
 
         assert response.status_code == 200
         created = response.json()
+        assert "id" in created
+        # Deleted with the session's other test resources, even if an
+        # assertion below fails
+        created_resources.append(("Questionnaire", created["id"]))
 
         assert created["resourceType"] == "Questionnaire"
-        assert "id" in created
         assert created["title"] == "Test Questionnaire for Creation"
 
-        # Cleanup
-        await hapi_client.delete(f"/Questionnaire/{created['id']}")
-
-    async def test_create_questionnaire_invalid_type_returns_400(self, api_client):
+    async def test_create_questionnaire_invalid_type_returns_400(self, api_client, offline_fhir):
         """
         Test: Creating non-Questionnaire resource returns 400
 
@@ -117,7 +121,7 @@ class TestQuestionnaireRead:
         assert questionnaire["resourceType"] == "Questionnaire"
         assert questionnaire["id"] == phq2_id
 
-    async def test_get_questionnaire_not_found_returns_404(self, api_client):
+    async def test_get_questionnaire_not_found_returns_404(self, api_client, offline_fhir):
         """
         Test: Non-existent Questionnaire returns 404
 
@@ -132,7 +136,7 @@ class TestQuestionnaireRead:
         assert response.status_code == 404
 
     @pytest.mark.failure_scenarios
-    async def test_get_questionnaire_hapi_unreachable(self, api_client, monkeypatch):
+    async def test_get_questionnaire_hapi_unreachable(self, api_client, api_app):
         """
         Test: HAPI FHIR unreachable causes 500 error
 
@@ -140,17 +144,20 @@ class TestQuestionnaireRead:
         When: GET /api/questionnaires/{id}
         Then: Returns 500 Internal Server Error
 
-        Note: This test simulates failure by using invalid ID that causes timeout
+        Note: The FHIR client is overridden to fail the way a refused
+        connection does, so the test needs no real outage or timeout
         """
-        # This is a simulation - in real scenario, HAPI would be down
-        # For now, we just verify error handling exists
-        response = await api_client.get(
-            "/api/questionnaires/test-timeout",
-            timeout=1.0
-        )
+        from app.services import get_fhir_client
+
+        class UnreachableFHIRClient:
+            async def get_resource_cached(self, resource_type, resource_id):
+                raise httpx.ConnectError("simulated: HAPI unreachable")
+
+        api_app.dependency_overrides[get_fhir_client] = UnreachableFHIRClient
 
-        # Should handle gracefully
-        assert response.status_code in [404, 500]
+        response = await api_client.get("/api/questionnaires/test-unreachable")
+
+        assert response.status_code == 500
 
 
 @pytest.mark.integration
@@ -158,11 +165,20 @@ class TestQuestionnaireRead:
 class TestQuestionnaireUpdate:
     """Tests for updating Questionnaires via FastAPI."""
 
+    @pytest.fixture(scope="class")
+    async def existing_questionnaire_id(self, questionnaire_factory):
+        """
+        One Questionnaire shared by the update tests in this class.
+
+        Each test PUTs a complete resource (or is rejected), so none of
+        them depends on the state a previous test left behind.
+        """
+        return await questionnaire_factory()
+
     async def test_update_questionnaire_success(
         self,
         api_client,
-        hapi_client,
-        clean_questionnaire
+        existing_questionnaire_id
     ):
         """
         Test: Successfully update a Questionnaire
@@ -171,8 +187,7 @@ class TestQuestionnaireUpdate:
         When: PUT /api/questionnaires/{id} with updated data
         Then: Returns 200 with updated resource
         """
-        # Create initial questionnaire
-        q_id = await clean_questionnaire(SIMPLE_TEXT_QUESTIONNAIRE)
+        q_id = existing_questionnaire_id
 
         # Update it
         updated_questionnaire = {
@@ -194,12 +209,13 @@ class TestQuestionnaireUpdate:
         assert updated["title"] == "Updated Title"
         assert updated["status"] == "active"
 
-    async def test_update_questionnaire_not_found_returns_404(self, api_client):
+    @pytest.mark.parametrize("method", ["PUT", "DELETE"])
+    async def test_write_questionnaire_not_found_returns_404(self, api_client, method):
         """
-        Test: Updating non-existent Questionnaire returns 404
+        Test: Updating or deleting non-existent Questionnaire returns 404
 
         Given: Invalid Questionnaire ID
-        When: PUT /api/questionnaires/{invalid_id}
+        When: PUT or DELETE /api/questionnaires/{invalid_id}
         Then: Returns 404 Not Found
         """
         questionnaire = {
@@ -208,9 +224,10 @@ class TestQuestionnaireUpdate:
             "item": [{"linkId": "1", "text": "Question", "type": "string"}]
         }
 
-        response = await api_client.put(
-            "/api/questionnaires/NONEXISTENT_ID",
-            json=questionnaire
+        response = await api_client.request(
+            method,
+            f"/api/questionnaires/{NONEXISTENT_ID}",
+            json=questionnaire if method == "PUT" else None
         )
 
         assert response.status_code == 404
@@ -218,7 +235,7 @@ class TestQuestionnaireUpdate:
     async def test_update_questionnaire_id_mismatch_returns_400(
         self,
         api_client,
-        clean_questionnaire
+        existing_questionnaire_id
     ):
         """
         Test: ID mismatch between URL and body returns 400
@@ -227,7 +244,7 @@ class TestQuestionnaireUpdate:
         When: PUT /api/questionnaires/{id}
         Then: Returns 400 Bad Request
         """
-        q_id = await clean_questionnaire(SIMPLE_TEXT_QUESTIONNAIRE)
+        q_id = existing_questionnaire_id
 
         mismatched_questionnaire = {
             "resourceType": "Questionnaire",
@@ -252,7 +269,7 @@ class TestQuestionnaireDelete:
     async def test_delete_questionnaire_success(
         self,
         api_client,
-        hapi_client
+        questionnaire_factory
     ):
         """
         Test: Successfully delete a Questionnaire
@@ -262,11 +279,7 @@ class TestQuestionnaireDelete:
         Then: Returns 200 with success message
         """
         # Create questionnaire directly in HAPI
-        response = await hapi_client.post(
-            "/Questionnaire",
-            json=SIMPLE_TEXT_QUESTIONNAIRE
-        )
-        q_id = response.json()["id"]
+        q_id = await questionnaire_factory()
 
         # Delete via API
         response = await api_client.delete(f"/api/questionnaires/{q_id}")
@@ -275,20 +288,6 @@ class TestQuestionnaireDelete:
         result = response.json()
         assert "deleted successfully" in result["message"]
 
-    async def test_delete_questionnaire_not_found_returns_404(self, api_client):
-        """
-        Test: Deleting non-existent Questionnaire returns 404
-
-        Given: Invalid Questionnaire ID
-        When: DELETE /api/questionnaires/{invalid_id}
-        Then: Returns 404 Not Found
-        """
-        response = await api_client.delete(
-            "/api/questionnaires/NONEXISTENT_ID_12345"
-        )
-
-        assert response.status_code == 404
-
 
 @pytest.mark.integration
 @pytest.mark.asyncio
@@ -411,188 +410,6 @@ class TestQuestionnaireSearch:
         # Should handle gracefully - either ignore or return error
         assert response.status_code in [200, 400]
 
-    async def test_search_by_canonical_url(
-        self,
-        hapi_client,
-        clean_questionnaire
-    ):
-        """
-        SDC Requirement: SHALL support search by canonical URL
-
-        Test ID: TEST-SEARCH-CANONICAL-URL
-        Requirement: SDC-FM-Q-021-SHALL
-
-        Given: Questionnaire with canonical URL
-        When: GET /Questionnaire?url=[canonical] (HAPI search)
-        Then: Returns matching Questionnaire
-
-        Reference: FHIR R4 Canonical URLs, SDC IG Form Manager
-        """
-        # Create questionnaire with canonical URL
-        questionnaire = {
-            "resourceType": "Questionnaire",
-            "url": "http://example.org/Questionnaire/test-search-canonical-new",
-            "version": "1.0.0",
-            "status": "active",
-            "title": "Test Search by Canonical URL",
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
-
-        await clean_questionnaire(questionnaire)
-
-        # Search by canonical URL using HAPI directly
-        response = await hapi_client.get(
-            "/Questionnaire",
-            params={"url": "http://example.org/Questionnaire/test-search-canonical-new"}
-        )
-
-        assert response.status_code == 200
-        bundle = response.json()
-
-        assert bundle["resourceType"] == "Bundle"
-        assert bundle["type"] == "searchset"
-        assert bundle["total"] >= 1
-
-        # Verify the correct questionnaire was found
-        found_urls = [
-            entry["resource"].get("url")
-            for entry in bundle.get("entry", [])
-            if "url" in entry["resource"]
-        ]
-        assert "http://example.org/Questionnaire/test-search-canonical-new" in found_urls
-
-    async def test_search_by_url_and_version(
-        self,
-        hapi_client,
-        clean_questionnaire
-    ):
-        """
-        SDC Requirement: SHALL support search by URL and version
-
-        Test ID: TEST-SEARCH-URL-VERSION
-        Requirement: SDC-FM-Q-022-SHALL
-
-        Given: Multiple versions of same Questionnaire
-        When: GET /Questionnaire?url=[canonical]&version=[version] (HAPI search)
-        Then: Returns only the specified version
-
-        Reference: FHIR R4 Versioned Canonical URLs
-        """
-        # Create two versions of the same questionnaire
-        questionnaire_v1 = {
-            "resourceType": "Questionnaire",
-            "url": "http://example.org/Questionnaire/test-version-search-new",
-            "version": "1.5.0",
-            "status": "active",
-            "title": "Version 1.5.0",
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
-
-        questionnaire_v2 = {
-            "resourceType": "Questionnaire",
-            "url": "http://example.org/Questionnaire/test-version-search-new",
-            "version": "2.5.0",
-            "status": "active",
-            "title": "Version 2.5.0",
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
-
-        await clean_questionnaire(questionnaire_v1)
-        await clean_questionnaire(questionnaire_v2)
-
-        # Search for specific version using HAPI directly
-        response = await hapi_client.get(
-            "/Questionnaire",
-            params={
-                "url": "http://example.org/Questionnaire/test-version-search-new",
-                "version": "1.5.0"
-            }
-        )
-
-        assert response.status_code == 200
-        bundle = response.json()
-
-        assert bundle["resourceType"] == "Bundle"
-        assert bundle["total"] >= 1
-
-        # Verify only version 1.5.0 is returned
-        found_version_1_5 = False
-        for entry in bundle.get("entry", []):
-            resource = entry["resource"]
-            if resource.get("url") == "http://example.org/Questionnaire/test-version-search-new":
-                assert resource.get("version") == "1.5.0", f"Expected version 1.5.0 but got {resource.get('version')}"
-                assert resource.get("title") == "Version 1.5.0"
-                found_version_1_5 = True
-
-        assert found_version_1_5, "Version 1.5.0 not found in search results"
-
-    async def test_search_by_last_updated(
-        self,
-        hapi_client,
-        clean_questionnaire
-    ):
-        """
-        SDC Requirement: SHALL support search by _lastUpdated
-
-        Test ID: TEST-SEARCH-LASTUPDATED
-        Requirement: SDC-FM-SP-002-SHALL
-
-        Given: Questionnaires with different update times
-        When: GET /Questionnaire?_lastUpdated=gt[timestamp] (HAPI search)
-        Then: Returns only Questionnaires updated after timestamp
-
-        Reference: FHIR R4 _lastUpdated search parameter
-        """
-        import datetime
-
-        # Create first questionnaire
-        q1 = {
-            "resourceType": "Questionnaire",
-            "status": "draft",
-            "title": "First Questionnaire Test LastUpdated",
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
-        q1_id = await clean_questionnaire(q1)
-
-        # Get the first questionnaire to check its lastUpdated timestamp
-        response = await hapi_client.get(f"/Questionnaire/{q1_id}")
-        q1_resource = response.json()
-        q1_last_updated = q1_resource["meta"]["lastUpdated"]
-
-        # Wait a moment to ensure different timestamps
-        import asyncio
-        await asyncio.sleep(2)
-
-        # Create second questionnaire after waiting
-        q2 = {
-            "resourceType": "Questionnaire",
-            "status": "draft",
-            "title": "Second Questionnaire Test LastUpdated",
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
-        await clean_questionnaire(q2)
-
-        # Search for questionnaires updated after the first one using HAPI directly
-        response = await hapi_client.get(
-            "/Questionnaire",
-            params={"_lastUpdated": f"gt{q1_last_updated}"}
-        )
-
-        assert response.status_code == 200
-        bundle = response.json()
-
-        assert bundle["resourceType"] == "Bundle"
-
-        # The second questionnaire should be in results (updated after q1)
-        titles = [
-            entry["resource"].get("title", "")
-            for entry in bundle.get("entry", [])
-        ]
-
-        # Second Questionnaire should be found (created after timestamp)
-        assert "Second Questionnaire Test LastUpdated" in titles, \
-            f"Expected to find 'Second Questionnaire Test LastUpdated' but found: {titles}"
-
 
 @pytest.mark.integration
 @pytest.mark.failure_scenarios
@@ -604,7 +421,7 @@ class TestHAPIFailureScenarios:
     These tests verify the API handles HAPI errors gracefully.
     """
 
-    async def test_malformed_json_returns_400(self, api_client):
+    async def test_malformed_json_returns_400(self, api_client, offline_fhir):
         """
         Test: Malformed JSON in request body returns 400
 
@@ -621,7 +438,17 @@ class TestHAPIFailureScenarios:
 
         assert response.status_code == 422  # FastAPI validation error
 
-    async def test_large_payload_handling(self, api_client):
+    @pytest.mark.parametrize("item_count", [
+        10,
+        100,
+        pytest.param(1000, marks=pytest.mark.slow),
+    ])
+    async def test_large_payload_handling(
+        self,
+        api_client,
+        created_resources,
+        item_count
+    ):
         """
         Test: Very large Questionnaire is handled appropriately
 
@@ -629,31 +456,22 @@ class TestHAPIFailureScenarios:
         When: POST /api/questionnaires
         Then: Either succeeds or returns appropriate error
         """
-        large_questionnaire = {
-            "resourceType": "Questionnaire",
-            "status": "draft",
-            "item": [
-                {
-                    "linkId": f"item-{i}",
-                    "text": f"Question {i}",
-                    "type": "string"
-                }
-                for i in range(1000)  # 1000 items
-            ]
-        }
-
         response = await api_client.post(
             "/api/questionnaires/",
-            json=large_questionnaire
+            content=LARGE_QUESTIONNAIRE_BYTES[item_count],
+            headers={"Content-Type": "application/json"}
         )
 
+        if response.status_code == 200:
+            created_resources.append(("Questionnaire", response.json()["id"]))
+
         # Should either succeed or return error (not crash)
         assert response.status_code in [200, 400, 413, 500]
 
     async def test_concurrent_updates_handling(
         self,
         api_client,
-        clean_questionnaire
+        questionnaire_factory
     ):
         """
         Test: Concurrent updates are handled by HAPI versioning
@@ -662,7 +480,7 @@ class TestHAPIFailureScenarios:
         When: Multiple concurrent updates
         Then: HAPI handles versioning (may return conflict)
         """
-        q_id = await clean_questionnaire(SIMPLE_TEXT_QUESTIONNAIRE)
+        q_id = await questionnaire_factory()
 
         update1 = {
             "resourceType": "Questionnaire",
@@ -681,17 +499,16 @@ class TestHAPIFailureScenarios:
         }
 
         # Send concurrent updates
-        import asyncio
-        responses = await asyncio.gather(
-            api_client.put(f"/api/questionnaires/{q_id}", json=update1),
-            api_client.put(f"/api/questionnaires/{q_id}", json=update2),
-            return_exceptions=True
-        )
+        tasks = {
+            asyncio.create_task(api_client.put(f"/api/questionnaires/{q_id}", json=update))
+            for update in (update1, update2)
+        }
+        done, _ = await asyncio.wait(tasks)
 
         # At least one should succeed
         success_count = sum(
-            1 for r in responses
-            if not isinstance(r, Exception) and r.status_code == 200
+            1 for t in done
+            if t.exception() is None and t.result().status_code == 200
         )
 
         assert success_count >= 1
@@ -10,10 +10,14 @@ Reference: https://build.fhir.org/ig/HL7/sdc/CapabilityStatement-sdc-form-manage
 """
 import pytest
 
+from tests.fixtures.capability_helpers import any_canonical_contains, has_sdc_operation
+
+pytestmark = [pytest.mark.sdc_compliance, pytest.mark.integration, pytest.mark.asyncio]
+
+# FHIR versions: DSTU2 (1.0), STU3 (3.0), R4 (4.0), R4B (4.3), R5 (5.0)
+VALID_FHIR_PREFIXES = ("4.0", "4.3", "5.0")
+
 
-@pytest.mark.sdc_compliance
-@pytest.mark.integration
-@pytest.mark.asyncio
 class TestCapabilityStatement:
     """
     SDC Form Manager CapabilityStatement compliance tests.
@@ -21,7 +25,7 @@ class TestCapabilityStatement:
     Tests that the server properly advertises its capabilities.
     """
 
-    async def test_capability_statement_endpoint_exists(self, hapi_client):
+    async def test_capability_statement_endpoint_exists(self, capability_statement):
         """
         SDC Requirement: SHALL provide CapabilityStatement at /metadata endpoint
 
@@ -34,10 +38,8 @@ class TestCapabilityStatement:
 
         Reference: FHIR R4 Section 3.1.0.1 - Capability Statement
         """
-        response = await hapi_client.get("/metadata")
-
-        assert response.status_code == 200
-        capability = response.json()
+        # The session fixture has already asserted GET /metadata succeeded
+        capability = capability_statement
 
         # Verify it's a CapabilityStatement
         assert capability["resourceType"] == "CapabilityStatement"
@@ -45,7 +47,11 @@ class TestCapabilityStatement:
         assert "status" in capability
         assert capability["status"] in ["draft", "active", "retired"]
 
-    async def test_declares_sdc_form_manager_role(self, hapi_client):
+    async def test_declares_sdc_form_manager_role(
+        self,
+        capability_statement,
+        questionnaire_resource_def
+    ):
         """
         SDC Requirement: SHALL declare conformance to SDC Form Manager
 
@@ -58,52 +64,28 @@ class TestCapabilityStatement:
 
         Reference: SDC IG - Form Manager CapabilityStatement
         """
-        response = await hapi_client.get("/metadata")
-        capability = response.json()
-
-        # Check for SDC Form Manager declaration in instantiates
-        sdc_declared = False
-
-        # Option 1: Check instantiates field
-        if "instantiates" in capability:
-            for canonical in capability["instantiates"]:
-                if "sdc" in canonical.lower() and "form-manager" in canonical.lower():
-                    sdc_declared = True
-                    break
-
-        # Option 2: Check implementationGuide field
-        if not sdc_declared and "implementationGuide" in capability:
-            for ig_url in capability["implementationGuide"]:
-                if "sdc" in ig_url.lower():
-                    sdc_declared = True
-                    break
-
-        # Option 3: Check rest.resource for Questionnaire with $package operation
-        if not sdc_declared:
-            for rest in capability.get("rest", []):
-                for resource in rest.get("resource", []):
-                    if resource["type"] == "Questionnaire":
-                        # Check for $package operation support
-                        operations = resource.get("operation", [])
-                        for op in operations:
-                            if "$package" in op.get("name", ""):
-                                sdc_declared = True
-                                break
+        capability = capability_statement
+
+        # SDC Form Manager may be declared via instantiates, implementationGuide
+        # or a Questionnaire $package operation
+        sdc_declared = (
+            any_canonical_contains(capability.get("instantiates", []), "sdc", "form-manager")
+            or any_canonical_contains(capability.get("implementationGuide", []), "sdc")
+            or has_sdc_operation(questionnaire_resource_def)
+        )
 
         # Note: HAPI FHIR may not explicitly declare SDC conformance
         # But it should at least support Questionnaire resource
         assert "rest" in capability
-        questionnaire_supported = False
-        for rest in capability["rest"]:
-            for resource in rest.get("resource", []):
-                if resource["type"] == "Questionnaire":
-                    questionnaire_supported = True
-                    break
 
         # At minimum, should support Questionnaire resource
-        assert questionnaire_supported, "CapabilityStatement should declare Questionnaire support"
+        assert questionnaire_resource_def is not None, \
+            "CapabilityStatement should declare Questionnaire support"
+
+        if not sdc_declared:
+            pytest.xfail("Server does not explicitly declare SDC Form Manager conformance")
 
-    async def test_declares_fhir_version(self, hapi_client):
+    async def test_declares_fhir_version(self, capability_statement):
         """
         SDC Requirement: SHALL declare FHIR version in CapabilityStatement
 
@@ -116,23 +98,21 @@ class TestCapabilityStatement:
 
         Reference: FHIR R4 CapabilityStatement.fhirVersion
         """
-        response = await hapi_client.get("/metadata")
-        capability = response.json()
+        capability = capability_statement
 
         # Must have fhirVersion
         assert "fhirVersion" in capability
         fhir_version = capability["fhirVersion"]
 
         # Should be R4 or later
-        # FHIR versions: DSTU2 (1.0), STU3 (3.0), R4 (4.0), R4B (4.3), R5 (5.0)
-        valid_versions = ["4.0", "4.0.0", "4.0.1", "4.3", "4.3.0", "5.0", "5.0.0"]
-
-        # Check if version starts with any valid version
-        is_valid = any(fhir_version.startswith(v) for v in valid_versions)
+        is_valid = fhir_version.startswith(VALID_FHIR_PREFIXES)
 
         assert is_valid, f"FHIR version {fhir_version} should be R4 (4.0) or later"
 
-    async def test_capability_statement_lists_supported_operations(self, hapi_client):
+    async def test_capability_statement_lists_supported_operations(
+        self,
+        questionnaire_resource_def
+    ):
         """
         SDC Requirement: SHOULD list supported operations in CapabilityStatement
 
@@ -145,16 +125,7 @@ class TestCapabilityStatement:
 
         Reference: SDC IG - Form Manager Operations
         """
-        response = await hapi_client.get("/metadata")
-        capability = response.json()
-
-        # Find Questionnaire resource definition
-        questionnaire_resource = None
-        for rest in capability.get("rest", []):
-            for resource in rest.get("resource", []):
-                if resource["type"] == "Questionnaire":
-                    questionnaire_resource = resource
-                    break
+        questionnaire_resource = questionnaire_resource_def
 
         # Should have Questionnaire resource declared
         assert questionnaire_resource is not None, "Questionnaire should be in CapabilityStatement"
@@ -167,7 +138,10 @@ class TestCapabilityStatement:
         # This is more lenient since HAPI may not list custom operations
         assert isinstance(operations, list)
 
-    async def test_capability_statement_lists_search_parameters(self, hapi_client):
+    async def test_capability_statement_lists_search_parameters(
+        self,
+        questionnaire_resource_def
+    ):
         """
         SDC Requirement: SHOULD list supported search parameters
 
@@ -180,16 +154,7 @@ class TestCapabilityStatement:
 
         Reference: FHIR R4 CapabilityStatement.rest.resource.searchParam
         """
-        response = await hapi_client.get("/metadata")
-        capability = response.json()
-
-        # Find Questionnaire resource definition
-        questionnaire_resource = None
-        for rest in capability.get("rest", []):
-            for resource in rest.get("resource", []):
-                if resource["type"] == "Questionnaire":
-                    questionnaire_resource = resource
-                    break
+        questionnaire_resource = questionnaire_resource_def
 
         assert questionnaire_resource is not None
 
@@ -208,13 +173,10 @@ class TestCapabilityStatement:
                 assert "type" in param
 
 
-@pytest.mark.sdc_compliance
-@pytest.mark.integration
-@pytest.mark.asyncio
 class TestMetadataContent:
     """Tests for CapabilityStatement content and structure."""
 
-    async def test_capability_statement_has_required_fields(self, hapi_client):
+    async def test_capability_statement_has_required_fields(self, capability_statement):
         """
         Test: CapabilityStatement has all required FHIR fields
 
@@ -224,8 +186,7 @@ class TestMetadataContent:
 
         Reference: FHIR R4 CapabilityStatement resource definition
         """
-        response = await hapi_client.get("/metadata")
-        capability = response.json()
+        capability = capability_statement
 
         # Required fields per FHIR R4 spec
         assert "resourceType" in capability
@@ -240,7 +201,11 @@ class TestMetadataContent:
         formats = capability["format"]
         assert "json" in formats or "application/fhir+json" in formats
 
-    async def test_capability_statement_declares_questionnaire_interactions(self, hapi_client):
+    async def test_capability_statement_declares_questionnaire_interactions(
+        self,
+        questionnaire_resource_def,
+        questionnaire_interaction_codes
+    ):
         """
         Test: CapabilityStatement declares Questionnaire interactions
 
@@ -250,22 +215,10 @@ class TestMetadataContent:
 
         Reference: SDC Form Manager SHALL support read and search
         """
-        response = await hapi_client.get("/metadata")
-        capability = response.json()
-
-        # Find Questionnaire resource
-        questionnaire_resource = None
-        for rest in capability.get("rest", []):
-            for resource in rest.get("resource", []):
-                if resource["type"] == "Questionnaire":
-                    questionnaire_resource = resource
-                    break
-
-        assert questionnaire_resource is not None
+        assert questionnaire_resource_def is not None
 
         # Check interactions
-        interactions = questionnaire_resource.get("interaction", [])
-        interaction_codes = [i["code"] for i in interactions]
+        interaction_codes = questionnaire_interaction_codes
 
         # SDC Form Manager SHALL support read and search-type
         assert "read" in interaction_codes, "SHALL support read interaction"
@@ -7,12 +7,38 @@ with correct severity, code, and diagnostics.
 Reference: FHIR R4 OperationOutcome resource
 https://www.hl7.org/fhir/R4/operationoutcome.html
 """
+import orjson
 import pytest
+from typing import Any, Dict, Tuple
+
+pytestmark = [pytest.mark.sdc_compliance, pytest.mark.integration, pytest.mark.asyncio]
+
+
+@pytest.fixture(scope="module")
+async def invalid_status_outcome(hapi_client) -> Tuple[int, Dict[str, Any]]:
+    """
+    (status_code, body) of POSTing a Questionnaire with an invalid status.
+
+    HAPI is lenient, so missing 'status' might be accepted; an explicitly
+    invalid enum value is rejected. Shared by the tests that inspect
+    different facets of the returned OperationOutcome.
+    """
+    invalid_questionnaire = {
+        "resourceType": "Questionnaire",
+        "status": "this-is-not-a-valid-status",  # Invalid enum value
+        "item": [{"linkId": "1", "text": "Question", "type": "string"}]
+    }
+    response = await hapi_client.post("/Questionnaire", json=invalid_questionnaire)
+    return response.status_code, orjson.loads(response.content)
+
+
+@pytest.fixture(scope="module")
+async def not_found_outcome(hapi_client) -> Tuple[int, Dict[str, Any]]:
+    """(status_code, body) of reading a non-existent Questionnaire."""
+    response = await hapi_client.get("/Questionnaire/NONEXISTENT_TEST_ID")
+    return response.status_code, orjson.loads(response.content)
 
 
-@pytest.mark.sdc_compliance
-@pytest.mark.integration
-@pytest.mark.asyncio
 class TestOperationOutcomeStructure:
     """
     Tests for OperationOutcome resource structure and content.
@@ -22,8 +48,7 @@ class TestOperationOutcomeStructure:
 
     async def test_operation_outcome_has_required_severity(
         self,
-        api_client,
-        hapi_client
+        invalid_status_outcome
     ):
         """
         SDC Requirement: OperationOutcome SHALL have issue.severity
@@ -31,32 +56,18 @@ class TestOperationOutcomeStructure:
         Test ID: TEST-ERR-SEVERITY
         Requirement: SDC-FM-ERR-002-SHALL
 
-        Given: Invalid request that generates error
-        When: Error response is returned
-        Then: OperationOutcome.issue[].severity is present and valid
+        Given: Invalid resource (violates FHIR validation)
+        When: POST to create resource
+        Then: OperationOutcome.issue[].severity is present and valid,
+              with at least one severity='error' (or 'fatal')
 
         Reference: FHIR R4 OperationOutcome.issue.severity (required field)
         Valid values: fatal | error | warning | information
         """
-        # Create invalid questionnaire with truly invalid data
-        # Note: HAPI is lenient, so missing 'status' might be accepted
-        # Use an explicitly invalid status value instead
-        invalid_questionnaire = {
-            "resourceType": "Questionnaire",
-            "status": "this-is-not-a-valid-status",  # Invalid enum value
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
+        status_code, outcome = invalid_status_outcome
 
-        response = await hapi_client.post(
-            "/Questionnaire",
-            json=invalid_questionnaire
-        )
-
-        # Should return error (400, 422, or 500)
-        assert response.status_code in [400, 422, 500]
-
-        # Parse response - should be OperationOutcome
-        outcome = response.json()
+        # Validation errors should return 400 or 422
+        assert status_code in [400, 422]
 
         # Should be OperationOutcome
         assert outcome["resourceType"] == "OperationOutcome"
@@ -74,10 +85,13 @@ class TestOperationOutcomeStructure:
             assert issue["severity"] in valid_severities, \
                 f"severity must be one of {valid_severities}, got: {issue['severity']}"
 
+        # Should have at least one issue with severity=error
+        severities = {issue["severity"] for issue in outcome["issue"]}
+        assert "error" in severities or "fatal" in severities
+
     async def test_operation_outcome_has_required_code(
         self,
-        api_client,
-        hapi_client
+        not_found_outcome
     ):
         """
         SDC Requirement: OperationOutcome SHALL have issue.code
@@ -93,11 +107,9 @@ class TestOperationOutcomeStructure:
         Valid codes: https://www.hl7.org/fhir/R4/valueset-issue-type.html
         """
         # Attempt to get non-existent resource
-        response = await hapi_client.get("/Questionnaire/NONEXISTENT_ID_12345")
-
-        assert response.status_code == 404
+        status_code, outcome = not_found_outcome
 
-        outcome = response.json()
+        assert status_code == 404
 
         # Should be OperationOutcome
         assert outcome["resourceType"] == "OperationOutcome"
@@ -120,14 +132,13 @@ class TestOperationOutcomeStructure:
             assert len(issue["code"]) > 0
 
             # For 404, code should typically be "not-found"
-            if response.status_code == 404:
+            if status_code == 404:
                 assert issue["code"] in ["not-found", "processing"], \
                     f"404 should have code 'not-found', got: {issue['code']}"
 
     async def test_operation_outcome_should_have_diagnostics(
         self,
-        api_client,
-        hapi_client
+        not_found_outcome
     ):
         """
         SDC Requirement: OperationOutcome SHOULD include issue.diagnostics
@@ -142,11 +153,9 @@ class TestOperationOutcomeStructure:
         Reference: FHIR R4 OperationOutcome.issue.diagnostics
         """
         # Request non-existent resource
-        response = await hapi_client.get("/Questionnaire/DOES_NOT_EXIST_TEST")
-
-        assert response.status_code == 404
+        status_code, outcome = not_found_outcome
 
-        outcome = response.json()
+        assert status_code == 404
         assert outcome["resourceType"] == "OperationOutcome"
 
         # Check for diagnostics (SHOULD, not SHALL)
@@ -162,46 +171,9 @@ class TestOperationOutcomeStructure:
         # We'll just check that if it exists, it's properly formatted
         # Not asserting it must exist since it's SHOULD not SHALL
 
-    async def test_validation_error_returns_proper_operation_outcome(
-        self,
-        api_client,
-        hapi_client
-    ):
-        """
-        Test: Validation errors return OperationOutcome with severity='error'
-
-        Given: Invalid resource (violates FHIR validation)
-        When: POST to create resource
-        Then: Returns OperationOutcome with severity='error' and appropriate code
-
-        Reference: FHIR R4 Validation
-        """
-        # Invalid: resourceType is wrong
-        invalid_resource = {
-            "resourceType": "Questionnaire",
-            "status": "invalid-status-value",  # Invalid status
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
-
-        response = await hapi_client.post(
-            "/Questionnaire",
-            json=invalid_resource
-        )
-
-        # Should return 400 or 422
-        assert response.status_code in [400, 422]
-
-        outcome = response.json()
-        assert outcome["resourceType"] == "OperationOutcome"
-
-        # Should have at least one issue with severity=error
-        severities = [issue["severity"] for issue in outcome["issue"]]
-        assert "error" in severities or "fatal" in severities
-
     async def test_not_found_returns_operation_outcome_with_not_found_code(
         self,
-        api_client,
-        hapi_client
+        not_found_outcome
     ):
         """
         Test: 404 responses include OperationOutcome with code='not-found'
@@ -212,21 +184,20 @@ class TestOperationOutcomeStructure:
 
         Reference: FHIR R4 HTTP Status Codes
         """
-        response = await hapi_client.get("/Questionnaire/INVALID_NONEXISTENT_ID")
+        status_code, outcome = not_found_outcome
 
-        assert response.status_code == 404
+        assert status_code == 404
 
-        outcome = response.json()
         assert outcome["resourceType"] == "OperationOutcome"
 
         # Should have code='not-found'
-        codes = [issue["code"] for issue in outcome["issue"]]
+        codes = {issue["code"] for issue in outcome["issue"]}
         assert "not-found" in codes or "processing" in codes
 
     async def test_package_operation_missing_dependency_warning(
         self,
         api_client,
-        clean_questionnaire
+        shared_resource
     ):
         """
         Test: Missing dependency in $package returns OperationOutcome with severity='warning'
@@ -239,24 +210,26 @@ class TestOperationOutcomeStructure:
         """
         from tests.fixtures.sample_resources import QUESTIONNAIRE_WITH_MISSING_VALUESET
 
-        q_id = await clean_questionnaire(QUESTIONNAIRE_WITH_MISSING_VALUESET)
+        q_id = await shared_resource("Questionnaire", QUESTIONNAIRE_WITH_MISSING_VALUESET)
 
         response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
 
         assert response.status_code == 200
         bundle = response.json()
 
-        # Find OperationOutcome in bundle
-        outcomes = [
-            entry["resource"]
-            for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "OperationOutcome"
-        ]
+        # Find the first OperationOutcome in bundle
+        outcome = next(
+            (
+                entry["resource"]
+                for entry in bundle["entry"]
+                if entry["resource"]["resourceType"] == "OperationOutcome"
+            ),
+            None,
+        )
 
-        assert len(outcomes) >= 1, "Missing dependency should generate OperationOutcome"
+        assert outcome is not None, "Missing dependency should generate OperationOutcome"
 
         # Check the OperationOutcome structure
-        outcome = outcomes[0]
         assert "issue" in outcome
         assert len(outcome["issue"]) > 0
 
@@ -275,9 +248,6 @@ class TestOperationOutcomeStructure:
                    "missing" in issue["diagnostics"].lower()
 
 
-@pytest.mark.sdc_compliance
-@pytest.mark.integration
-@pytest.mark.asyncio
 class TestOperationOutcomeErrorScenarios:
     """Tests for various error scenarios and their OperationOutcome responses."""
 
@@ -326,8 +296,7 @@ class TestOperationOutcomeErrorScenarios:
 
     async def test_operation_outcome_issue_expression_optional(
         self,
-        api_client,
-        hapi_client
+        invalid_status_outcome
     ):
         """
         Test: OperationOutcome.issue.expression is optional (MAY)
@@ -341,18 +310,10 @@ class TestOperationOutcomeErrorScenarios:
 
         Reference: FHIR R4 OperationOutcome.issue.expression (optional)
         """
-        # Create invalid questionnaire
-        invalid = {
-            "resourceType": "Questionnaire",
-            "status": "invalid-value",
-            "item": [{"linkId": "1", "text": "Question", "type": "string"}]
-        }
-
-        response = await hapi_client.post("/Questionnaire", json=invalid)
+        status_code, outcome = invalid_status_outcome
 
-        assert response.status_code in [400, 422]
+        assert status_code in [400, 422]
 
-        outcome = response.json()
         assert outcome["resourceType"] == "OperationOutcome"
 
         # Check if expression is present (it's optional)
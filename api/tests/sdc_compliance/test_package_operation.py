@@ -14,7 +14,8 @@ ARCHITECTURE NOTE
 - These tests use `api_client` which targets the FastAPI sidecar (port 8001).
   The sidecar implements a custom $package via PackageService.
 - HAPI FHIR (port 8081) is storage only — its native $package is partial
-  (see TestDependencyResolution.test_hapi_native_package_is_partial).
+  (see TestDependencyResolution.test_hapi_native_package_is_partial). That
+  test only runs with VERIFY_HAPI_GAPS=1, which the nightly CI run sets.
 - We are testing our SDC-conformant implementation, not HAPI's capabilities.
 
 DATA STRATEGY
@@ -31,17 +32,25 @@ The chain we exercise for transitive-dep tests:
       → ValueSet mii-vs-pro-eortc-qlq-c30-scale-7pt
         → CodeSystem mii-cs-pro-eortc-qlq-c30 (shared by both VS)
 
-Synthetic fixtures (`clean_questionnaire`, `sample_resources`) are kept
+Synthetic fixtures (`clean_resource`, `sample_resources`) are kept
 only for scenarios MII PRO does not exercise: missing-dependency warnings,
 circular references, library-extension references, and deep-nested chains
 constructed solely for the test.
 """
+import asyncio
+import os
+from collections import Counter
 import pytest
+from typing import Any, Dict, List, Optional, Tuple
+from tests.conftest import make_unique_url
+from tests.fixtures.bundle_helpers import resources_by_type, slim_bundle, urls_by_type
 from tests.fixtures.sample_resources import (
     QUESTIONNAIRE_WITH_MISSING_VALUESET,
     SIMPLE_TEXT_QUESTIONNAIRE,
     QUESTIONNAIRE_WITH_LIBRARY,
     SAMPLE_LIBRARY,
+    make_circular_resources,
+    make_deep_nested_resources,
 )
 
 
@@ -51,6 +60,36 @@ QLQ_C30_VS_4PT = "https://www.medizininformatik-initiative.de/fhir/ext/modul-pro
 QLQ_C30_VS_7PT = "https://www.medizininformatik-initiative.de/fhir/ext/modul-pro/ValueSet/mii-vs-pro-eortc-qlq-c30-scale-7pt"
 QLQ_C30_CS     = "https://www.medizininformatik-initiative.de/fhir/ext/modul-pro/CodeSystem/mii-cs-pro-eortc-qlq-c30"
 
+# Every link of the Questionnaire -> ValueSet -> CodeSystem chain
+DEEP_NESTED_TYPES = frozenset({"Questionnaire", "ValueSet", "CodeSystem"})
+
+# Type-level $package body that is not a Questionnaire (expects 422)
+NON_QUESTIONNAIRE_RESOURCE = {"resourceType": "Patient", "name": [{"family": "Doe"}]}
+
+
+@pytest.fixture(scope="module")
+async def phq9_package(package_bundle, pro_questionnaires) -> Tuple[int, Dict[str, Any]]:
+    """
+    (status_code, bundle) of GET $package for PHQ-9.
+
+    $package is deterministic for the pre-loaded PRO content, so the tests
+    that only inspect the bundle share one round-trip.
+    """
+    return await package_bundle(pro_questionnaires["phq_9"]["id"])
+
+
+@pytest.fixture(scope="module")
+async def qlq_c30_package(package_bundle, pro_questionnaires) -> Tuple[int, Dict[str, Any]]:
+    """(status_code, bundle) of GET $package for qlq-c30-variant-a."""
+    return await package_bundle(pro_questionnaires["qlq_c30_variant_a"]["id"])
+
+
+@pytest.fixture(scope="module")
+def qlq_c30_urls(qlq_c30_package) -> Dict[str, List[Optional[str]]]:
+    """Canonical URLs in the qlq-c30-variant-a bundle by resourceType, collected once."""
+    _, bundle = qlq_c30_package
+    return urls_by_type(bundle)
+
 
 @pytest.mark.sdc_compliance
 @pytest.mark.integration
@@ -62,18 +101,18 @@ class TestSDCPackageOperationCompliance:
     Each test references specific SDC IG requirements.
     """
 
-    async def test_package_returns_collection_bundle(self, api_client, pro_questionnaires):
+    # Root check: if $package itself is broken, the bundle-content tests
+    # below skip instead of each failing on the same cause
+    @pytest.mark.dependency(name="pkg_root")
+    async def test_package_returns_collection_bundle(self, phq9_package):
         """
         SDC Requirement: $package SHALL return Bundle with type='collection'
 
         Reference: SDC IG Section 3.2.1, OperationDefinition-questionnaire-package
         """
-        phq9_id = pro_questionnaires["phq_9"]["id"]
+        status_code, bundle = phq9_package
 
-        response = await api_client.get(f"/api/questionnaires/{phq9_id}/$package")
-
-        assert response.status_code == 200
-        bundle = response.json()
+        assert status_code == 200
 
         assert bundle["resourceType"] == "Bundle"
         assert bundle["type"] == "collection"
@@ -81,23 +120,23 @@ class TestSDCPackageOperationCompliance:
         assert "entry" in bundle
         assert len(bundle["entry"]) >= 1
 
-    async def test_questionnaire_is_first_entry(self, api_client, pro_questionnaires):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_questionnaire_is_first_entry(self, phq9_package, pro_questionnaires):
         """
         SDC Requirement: Questionnaire SHOULD be first entry in bundle
 
         Reference: SDC IG Best Practices for Bundle ordering
         """
         phq9 = pro_questionnaires["phq_9"]
-
-        response = await api_client.get(f"/api/questionnaires/{phq9['id']}/$package")
-        bundle = response.json()
+        _, bundle = phq9_package
 
         first_entry = bundle["entry"][0]["resource"]
         assert first_entry["resourceType"] == "Questionnaire"
         assert first_entry["id"] == phq9["id"]
         assert first_entry["url"] == phq9["url"]
 
-    async def test_includes_referenced_valuesets(self, api_client, pro_questionnaires):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_includes_referenced_valuesets(self, qlq_c30_urls):
         """
         SDC Requirement: SHALL include all referenced ValueSets
 
@@ -106,26 +145,16 @@ class TestSDCPackageOperationCompliance:
 
         Reference: SDC IG Section 3.2.1
         """
-        q_id = pro_questionnaires["qlq_c30_variant_a"]["id"]
-
-        response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
-        bundle = response.json()
+        valueset_urls = qlq_c30_urls["ValueSet"]
 
-        valuesets = [
-            entry["resource"]
-            for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "ValueSet"
-        ]
-
-        assert len(valuesets) >= 2, (
-            f"Expected ≥2 ValueSets (scale-4pt + scale-7pt), got {len(valuesets)}"
+        assert len(valueset_urls) >= 2, (
+            f"Expected ≥2 ValueSets (scale-4pt + scale-7pt), got {len(valueset_urls)}"
         )
-
-        valueset_urls = {vs.get("url") for vs in valuesets}
         assert QLQ_C30_VS_4PT in valueset_urls
         assert QLQ_C30_VS_7PT in valueset_urls
 
-    async def test_includes_referenced_codesystems(self, api_client, pro_questionnaires):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_includes_referenced_codesystems(self, qlq_c30_urls):
         """
         SDC Requirement: SHALL include CodeSystems referenced by ValueSets
         (transitive dependency resolution)
@@ -136,30 +165,17 @@ class TestSDCPackageOperationCompliance:
 
         Reference: SDC IG Section 3.2.1 — Transitive dependencies
         """
-        q_id = pro_questionnaires["qlq_c30_variant_a"]["id"]
-
-        response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
-        bundle = response.json()
-
-        codesystems = [
-            entry["resource"]
-            for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "CodeSystem"
-        ]
-
-        assert len(codesystems) >= 1, (
-            f"Expected ≥1 CodeSystem (mii-cs-pro-eortc-qlq-c30), got {len(codesystems)}"
-        )
+        codesystem_urls = Counter(qlq_c30_urls["CodeSystem"])
 
-        codesystem_urls = [cs.get("url") for cs in codesystems]
+        assert codesystem_urls, "Expected ≥1 CodeSystem (mii-cs-pro-eortc-qlq-c30), got 0"
         assert QLQ_C30_CS in codesystem_urls
         # Same CS referenced by 4pt + 7pt VS — packager MUST de-duplicate.
-        assert codesystem_urls.count(QLQ_C30_CS) == 1, (
+        assert codesystem_urls[QLQ_C30_CS] == 1, (
             "CodeSystem appears more than once — transitive de-duplication broken"
         )
 
     async def test_missing_dependency_returns_operation_outcome(
-        self, api_client, clean_questionnaire
+        self, api_client, shared_resource
     ):
         """
         SDC Requirement: Missing dependencies SHALL generate OperationOutcome
@@ -170,17 +186,13 @@ class TestSDCPackageOperationCompliance:
         NOTE: kept synthetic — MII PRO ships internally consistent content,
         so a "missing dependency" cannot occur with real data.
         """
-        q_id = await clean_questionnaire(QUESTIONNAIRE_WITH_MISSING_VALUESET)
+        q_id = await shared_resource("Questionnaire", QUESTIONNAIRE_WITH_MISSING_VALUESET)
 
         response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
         assert response.status_code == 200
 
         bundle = response.json()
-        outcomes = [
-            entry["resource"]
-            for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "OperationOutcome"
-        ]
+        outcomes = resources_by_type(bundle)["OperationOutcome"]
 
         assert len(outcomes) >= 1
         issue = outcomes[0]["issue"][0]
@@ -197,24 +209,22 @@ class TestSDCPackageOperationCompliance:
         Reference: OperationDefinition-questionnaire-package parameter definition
         """
         q_id = pro_questionnaires["qlq_c30_variant_a"]["id"]
+        url = f"/api/questionnaires/{q_id}/$package"
 
-        response_with = await api_client.get(
-            f"/api/questionnaires/{q_id}/$package",
-            params={"include-dependencies": True},
+        # Independent requests; overlap them rather than paying two round-trips
+        response_with, response_without = await asyncio.gather(
+            api_client.get(url, params={"include-dependencies": True}),
+            api_client.get(url, params={"include-dependencies": False}),
         )
         bundle_with = response_with.json()
-
-        response_without = await api_client.get(
-            f"/api/questionnaires/{q_id}/$package",
-            params={"include-dependencies": False},
-        )
         bundle_without = response_without.json()
 
         assert len(bundle_without["entry"]) < len(bundle_with["entry"])
         assert len(bundle_without["entry"]) == 1
         assert bundle_without["entry"][0]["resource"]["resourceType"] == "Questionnaire"
 
-    async def test_instance_level_endpoint(self, api_client, pro_questionnaires):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_instance_level_endpoint(self, phq9_package):
         """
         SDC Requirement: SHALL support instance-level GET operation
 
@@ -222,12 +232,9 @@ class TestSDCPackageOperationCompliance:
 
         Reference: OperationDefinition-questionnaire-package
         """
-        phq9_id = pro_questionnaires["phq_9"]["id"]
-
-        response = await api_client.get(f"/api/questionnaires/{phq9_id}/$package")
+        status_code, bundle = phq9_package
 
-        assert response.status_code == 200
-        bundle = response.json()
+        assert status_code == 200
         assert bundle["resourceType"] == "Bundle"
         assert bundle["type"] == "collection"
 
@@ -254,7 +261,8 @@ class TestSDCPackageOperationCompliance:
         assert bundle["entry"][0]["resource"]["resourceType"] == "Questionnaire"
         assert bundle["entry"][0]["resource"]["title"] == "Simple Text-Only Questionnaire"
 
-    async def test_canonical_url_resolution(self, api_client, pro_questionnaires):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_canonical_url_resolution(self, package_bundle, pro_questionnaires):
         """
         SDC Requirement: SHALL support canonical URL resolution
 
@@ -266,18 +274,15 @@ class TestSDCPackageOperationCompliance:
         """
         phq9 = pro_questionnaires["phq_9"]
 
-        response = await api_client.get(
-            "/api/questionnaires/$package",
-            params={"url": phq9["url"]},
-        )
+        status_code, bundle = await package_bundle(url=phq9["url"])
 
-        assert response.status_code == 200
-        bundle = response.json()
+        assert status_code == 200
         q = bundle["entry"][0]["resource"]
         assert q["url"] == phq9["url"]
 
+    @pytest.mark.dependency(depends=["pkg_root"])
     async def test_version_specific_canonical_resolution(
-        self, api_client, pro_questionnaires
+        self, package_bundle, pro_questionnaires
     ):
         """
         SDC Requirement: SHALL support version-specific canonical URL resolution
@@ -286,17 +291,16 @@ class TestSDCPackageOperationCompliance:
         """
         phq9 = pro_questionnaires["phq_9"]
 
-        response = await api_client.get(
-            "/api/questionnaires/$package",
-            params={"url": phq9["url"], "version": phq9["version"]},
+        status_code, bundle = await package_bundle(
+            url=phq9["url"], version=phq9["version"]
         )
 
-        assert response.status_code == 200
-        bundle = response.json()
+        assert status_code == 200
         q = bundle["entry"][0]["resource"]
         assert q["version"] == phq9["version"]
 
-    async def test_nested_item_valueset_extraction(self, api_client, pro_questionnaires):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_nested_item_valueset_extraction(self, qlq_c30_urls):
         """
         SDC Requirement: SHALL extract ValueSets from nested items
 
@@ -307,17 +311,7 @@ class TestSDCPackageOperationCompliance:
 
         Reference: SDC IG Section 3.2.1 - Dependency Resolution
         """
-        q_id = pro_questionnaires["qlq_c30_variant_a"]["id"]
-
-        response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
-        bundle = response.json()
-
-        valuesets = [
-            entry["resource"]
-            for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "ValueSet"
-        ]
-        valueset_urls = {vs.get("url") for vs in valuesets}
+        valueset_urls = qlq_c30_urls["ValueSet"]
 
         assert QLQ_C30_VS_4PT in valueset_urls, (
             "scale-4pt VS missing — nested item walking likely broken"
@@ -326,9 +320,8 @@ class TestSDCPackageOperationCompliance:
             "scale-7pt VS missing — nested item walking likely broken"
         )
 
-    async def test_questionnaire_without_dependencies(
-        self, api_client, pro_questionnaires
-    ):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_questionnaire_without_dependencies(self, phq9_package):
         """
         Test: Questionnaire with no answerValueSet bindings produces a bundle
         with no ValueSets.
@@ -336,35 +329,25 @@ class TestSDCPackageOperationCompliance:
         Anchor: PHQ-9 uses inline `answerOption` only — there is nothing for
         $package to traverse to.
         """
-        phq9_id = pro_questionnaires["phq_9"]["id"]
+        _, bundle = phq9_package
 
-        response = await api_client.get(f"/api/questionnaires/{phq9_id}/$package")
-        bundle = response.json()
-
-        valuesets = [
-            entry for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "ValueSet"
-        ]
+        by_type = resources_by_type(bundle)
+        valuesets = by_type["ValueSet"]
         assert len(valuesets) == 0, (
             f"PHQ-9 has no answerValueSet bindings; got {len(valuesets)} VS in bundle"
         )
 
         # The Questionnaire itself must always be there.
-        assert any(
-            entry["resource"]["resourceType"] == "Questionnaire"
-            for entry in bundle["entry"]
-        )
+        assert by_type["Questionnaire"]
 
-    async def test_bundle_has_sdc_tags(self, api_client, pro_questionnaires):
+    @pytest.mark.dependency(depends=["pkg_root"])
+    async def test_bundle_has_sdc_tags(self, phq9_package):
         """
         SDC Requirement: Bundle SHOULD have appropriate SDC tags
 
         Reference: SDC IG Bundle metadata requirements
         """
-        phq9_id = pro_questionnaires["phq_9"]["id"]
-
-        response = await api_client.get(f"/api/questionnaires/{phq9_id}/$package")
-        bundle = response.json()
+        _, bundle = phq9_package
 
         assert "meta" in bundle
         assert "tag" in bundle["meta"]
@@ -391,14 +374,9 @@ class TestSDCPackageOperationCompliance:
         """
         Test: Non-Questionnaire resource returns 422
         """
-        invalid_resource = {
-            "resourceType": "Patient",
-            "name": [{"family": "Doe"}],
-        }
-
         response = await api_client.post(
             "/api/questionnaires/$package",
-            json=invalid_resource,
+            json=NON_QUESTIONNAIRE_RESOURCE,
         )
 
         assert response.status_code == 422
@@ -416,7 +394,7 @@ class TestLibraryInclusion:
     """
 
     async def test_includes_library_references(
-        self, api_client, hapi_client, clean_questionnaire
+        self, api_client, hapi_client, shared_resource
     ):
         """
         SDC Requirement: SHALL include Library resources referenced in extensions
@@ -426,16 +404,12 @@ class TestLibraryInclusion:
         response = await hapi_client.post("/Library", json=SAMPLE_LIBRARY)
         library_id = response.json()["id"]
 
-        q_id = await clean_questionnaire(QUESTIONNAIRE_WITH_LIBRARY)
+        q_id = await shared_resource("Questionnaire", QUESTIONNAIRE_WITH_LIBRARY)
 
         response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
         bundle = response.json()
 
-        libraries = [
-            entry["resource"]
-            for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "Library"
-        ]
+        libraries = resources_by_type(bundle)["Library"]
 
         assert len(libraries) >= 1
 
@@ -453,7 +427,7 @@ class TestDependencyResolution:
     """
 
     async def test_circular_dependency_handling(
-        self, api_client, hapi_client, clean_questionnaire, clean_valueset
+        self, api_client, hapi_client, clean_resource
     ):
         """
         SDC Requirement: SHOULD handle circular dependencies gracefully
@@ -468,80 +442,29 @@ class TestDependencyResolution:
 
         Reference: SDC IG Section 3.2.1 - Circular dependency handling
         """
-        valueset1 = {
-            "resourceType": "ValueSet",
-            "url": "http://example.org/ValueSet/circular-vs-1",
-            "version": "1.0.0",
-            "status": "active",
-            "name": "CircularValueSet1",
-            "title": "Circular ValueSet 1",
-            "compose": {
-                "include": [
-                    {
-                        "system": "http://loinc.org",
-                        "concept": [{"code": "1234-5", "display": "Test Code"}],
-                    },
-                    {"valueSet": ["http://example.org/ValueSet/circular-vs-2"]},
-                ]
-            },
-        }
-
-        valueset2 = {
-            "resourceType": "ValueSet",
-            "url": "http://example.org/ValueSet/circular-vs-2",
-            "version": "1.0.0",
-            "status": "active",
-            "name": "CircularValueSet2",
-            "title": "Circular ValueSet 2",
-            "compose": {
-                "include": [
-                    {
-                        "system": "http://snomed.info/sct",
-                        "concept": [{"code": "9876-5", "display": "Another Code"}],
-                    },
-                    {"valueSet": ["http://example.org/ValueSet/circular-vs-1"]},
-                ]
-            },
-        }
-
-        await clean_valueset(valueset1)
-        await clean_valueset(valueset2)
-
-        questionnaire = {
-            "resourceType": "Questionnaire",
-            "status": "active",
-            "title": "Questionnaire with Circular Dependencies",
-            "item": [
-                {
-                    "linkId": "1",
-                    "text": "Question with circular ValueSet",
-                    "type": "choice",
-                    "answerValueSet": "http://example.org/ValueSet/circular-vs-1",
-                }
-            ],
-        }
-
-        q_id = await clean_questionnaire(questionnaire)
+        # Unique canonicals so parallel workers and reruns cannot collide
+        vs1_url = make_unique_url("http://example.org/ValueSet/circular-vs-1")
+        vs2_url = make_unique_url("http://example.org/ValueSet/circular-vs-2")
+
+        valueset1, valueset2, questionnaire = make_circular_resources(vs1_url, vs2_url)
+
+        await asyncio.gather(
+            clean_resource("ValueSet", valueset1),
+            clean_resource("ValueSet", valueset2),
+        )
+
+        q_id = await clean_resource("Questionnaire", questionnaire)
 
         response = await api_client.get(
             f"/api/questionnaires/{q_id}/$package", timeout=10.0
         )
 
         assert response.status_code == 200
-        bundle = response.json()
+        bundle = slim_bundle(response.content)
         assert bundle["resourceType"] == "Bundle"
 
-        valuesets = [
-            entry["resource"]
-            for entry in bundle["entry"]
-            if entry["resource"]["resourceType"] == "ValueSet"
-        ]
-        valueset_urls = [vs.get("url") for vs in valuesets]
-
-        url_counts = {}
-        for url in valueset_urls:
-            url_counts[url] = url_counts.get(url, 0) + 1
-
+        valuesets = resources_by_type(bundle)["ValueSet"]
+        url_counts = Counter(vs.get("url") for vs in valuesets)
         for url, count in url_counts.items():
             assert count == 1, f"ValueSet {url} appears {count} times (should be 1)"
 
@@ -550,8 +473,7 @@ class TestDependencyResolution:
         )
 
     async def test_deep_nested_dependencies(
-        self, api_client, hapi_client, clean_questionnaire,
-        clean_valueset, clean_codesystem,
+        self, api_client, hapi_client, clean_resource,
     ):
         """
         Test: Deep nested dependencies are fully resolved
@@ -562,70 +484,32 @@ class TestDependencyResolution:
 
         Reference: SDC IG - Transitive dependency resolution
         """
-        codesystem = {
-            "resourceType": "CodeSystem",
-            "url": "http://example.org/CodeSystem/deep-nested",
-            "version": "1.0.0",
-            "status": "active",
-            "content": "complete",
-            "concept": [
-                {"code": "code1", "display": "Code 1"},
-                {"code": "code2", "display": "Code 2"},
-            ],
-        }
-        await clean_codesystem(codesystem)
-
-        valueset = {
-            "resourceType": "ValueSet",
-            "url": "http://example.org/ValueSet/deep-nested",
-            "version": "1.0.0",
-            "status": "active",
-            "compose": {
-                "include": [{"system": "http://example.org/CodeSystem/deep-nested"}]
-            },
-        }
-        await clean_valueset(valueset)
-
-        questionnaire = {
-            "resourceType": "Questionnaire",
-            "status": "active",
-            "title": "Deep Nested Dependencies",
-            "item": [
-                {
-                    "linkId": "1",
-                    "text": "Question",
-                    "type": "choice",
-                    "answerValueSet": "http://example.org/ValueSet/deep-nested",
-                }
-            ],
-        }
-        q_id = await clean_questionnaire(questionnaire)
+        cs_url = make_unique_url("http://example.org/CodeSystem/deep-nested")
+        vs_url = make_unique_url("http://example.org/ValueSet/deep-nested")
 
-        response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
-        bundle = response.json()
+        codesystem, valueset, questionnaire = make_deep_nested_resources(cs_url, vs_url)
 
-        resource_types = [
-            entry["resource"]["resourceType"] for entry in bundle["entry"]
-        ]
+        await asyncio.gather(
+            clean_resource("CodeSystem", codesystem),
+            clean_resource("ValueSet", valueset),
+        )
 
-        assert "Questionnaire" in resource_types
-        assert "ValueSet" in resource_types
-        assert "CodeSystem" in resource_types
+        q_id = await clean_resource("Questionnaire", questionnaire)
 
-        valuesets = [
-            e["resource"] for e in bundle["entry"]
-            if e["resource"]["resourceType"] == "ValueSet"
-        ]
-        vs_urls = [vs.get("url") for vs in valuesets]
-        assert "http://example.org/ValueSet/deep-nested" in vs_urls
+        response = await api_client.get(f"/api/questionnaires/{q_id}/$package")
+        by_type = resources_by_type(slim_bundle(response.content))
 
-        codesystems = [
-            e["resource"] for e in bundle["entry"]
-            if e["resource"]["resourceType"] == "CodeSystem"
-        ]
-        cs_urls = [cs.get("url") for cs in codesystems]
-        assert "http://example.org/CodeSystem/deep-nested" in cs_urls
+        assert DEEP_NESTED_TYPES <= by_type.keys(), (
+            f"Missing {set(DEEP_NESTED_TYPES - by_type.keys())} in bundle"
+        )
+
+        assert vs_url in {vs.get("url") for vs in by_type["ValueSet"]}
+        assert cs_url in {cs.get("url") for cs in by_type["CodeSystem"]}
 
+    @pytest.mark.skipif(
+        os.getenv("VERIFY_HAPI_GAPS") != "1",
+        reason="Run only with VERIFY_HAPI_GAPS=1; documents a HAPI limitation",
+    )
     async def test_hapi_native_package_is_partial(self, hapi_client, pro_questionnaires):
         """
         Test: HAPI FHIR's native $package returns a Bundle but is not SDC-conformant.
@@ -8,26 +8,42 @@ fully started, avoiding the Hibernate Search initialization issue.
 
 Installation order:
 1. Wait for HAPI to be ready
-2. Wait for Hibernate Search initialization (60s delay)
+2. Wait for Hibernate Search initialization (poll a search, up to 90s)
 3. Install dependencies (de.basisprofil.r4 1.5.4) using $install-package
-4. Download and extract ISiK 5.1.0 package
-5. Upload ISiK StructureDefinitions individually (skipping problematic profiles)
+4. Stream the ISiK 5.1.0 package and upload its StructureDefinitions in batch
+   Bundles straight from the archive (skipping problematic profiles; nothing
+   is extracted to disk). The .tgz is cached per version, so re-runs skip the
+   download.
 """
 
-import json
+import argparse
+import hashlib
+import logging
+import orjson
 import time
 import requests
 import sys
 import os
-from pathlib import Path
-import tempfile
 import tarfile
+from contextlib import contextmanager
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Upload workers log through one handler instead of contending on print()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
 
 HAPI_BASE_URL = os.getenv("HAPI_BASE_URL", "http://localhost:8080/fhir")
 ISIK_PACKAGE_NAME = "de.gematik.isik"
 ISIK_VERSION = "5.1.0"
 MAX_WAIT_SECONDS = 300
-CHECK_INTERVAL = 5
+SEARCH_READY_MAX_WAIT_SECONDS = 90
+
+# Readiness polling (HAPI, then Hibernate Search): start at 200 ms, doubling up to 5 s
+POLL_INITIAL_INTERVAL = 0.2
+POLL_MAX_INTERVAL = 5.0
 
 # Installation strategy:
 # Try installing ISiK directly with fetchDependencies=true first.
@@ -39,37 +55,97 @@ DEPENDENCIES = [
     {"name": "de.basisprofil.r4", "version": "1.5.4"},
 ]
 
+# List of known problematic profiles to skip
+# Matched exactly against StructureDefinition.name
+SKIP_PROFILES = frozenset({
+    "ISiKKoerperkerntemperatur",  # Known to cause Hibernate Search error
+})
+
+# StructureDefinitions per batch Bundle (one POST each), and how many batches
+# run at once; workers are kept within the session's pool_maxsize
+UPLOAD_BATCH_SIZE = int(os.getenv("ISIK_UPLOAD_BATCH_SIZE", "25"))
+UPLOAD_WORKERS = min(int(os.getenv("ISIK_UPLOAD_WORKERS", "8")), 16)
+
+# Per-version package .tgz cache (reused while its size matches the registry's
+# Content-Length) and upload-hash cache live here
+CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "isik-runtime"
+
+# Content hashes of StructureDefinitions from earlier runs (id -> sha256); an SD
+# whose hash matches and which still exists on the server is not PUT again
+UPLOAD_CACHE_FILE = Path(os.getenv("ISIK_UPLOAD_CACHE", CACHE_DIR / "uploads.json"))
+
+# Read/copy buffer for reading the package stream (tarfile defaults: 10 KiB / 16 KiB)
+TAR_BUFFER_SIZE = 2 * 1024 * 1024
+
+# One keep-alive session for every HAPI / package-registry call, so the
+# StructureDefinition uploads reuse connections instead of reconnecting per file.
+# Retries cover transient gateway errors; POST ($install-package) is not retried.
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/fhir+json"})
+_ADAPTER = HTTPAdapter(
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    ),
+)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+
+# Readiness probes poll on their own schedule, so they bypass SESSION's retries
+PROBE_SESSION = requests.Session()
+
 def wait_for_hapi():
-    """Wait for HAPI FHIR to be ready"""
-    print("Waiting for HAPI FHIR to be ready...")
-    elapsed = 0
+    """Wait for HAPI FHIR to be ready, polling with exponential backoff"""
+    logger.info("Waiting for HAPI FHIR to be ready...")
+    elapsed = 0.0
+    interval = POLL_INITIAL_INTERVAL
     while elapsed < MAX_WAIT_SECONDS:
         try:
-            response = requests.get(f"{HAPI_BASE_URL}/metadata", timeout=5)
+            response = PROBE_SESSION.get(f"{HAPI_BASE_URL}/metadata", timeout=2)
             if response.status_code == 200:
-                print("✓ HAPI FHIR is ready!")
+                logger.info("✓ HAPI FHIR is ready!")
                 return True
         except requests.exceptions.RequestException:
             pass
 
-        print(f"  Waiting... ({elapsed}s / {MAX_WAIT_SECONDS}s)")
-        time.sleep(CHECK_INTERVAL)
-        elapsed += CHECK_INTERVAL
+        logger.info(f"  Waiting... ({elapsed:.1f}s / {MAX_WAIT_SECONDS}s)")
+        time.sleep(interval)
+        elapsed += interval
+        interval = min(interval * 2, POLL_MAX_INTERVAL)
 
-    print(f"ERROR: HAPI FHIR did not become ready within {MAX_WAIT_SECONDS} seconds")
+    logger.error(f"ERROR: HAPI FHIR did not become ready within {MAX_WAIT_SECONDS} seconds")
     return False
 
-def wait_for_hibernate_search():
-    """Wait additional time for Hibernate Search to be fully initialized"""
-    print("\nWaiting for Hibernate Search initialization...")
-    wait_time = 60
-    print(f"  Sleeping for {wait_time} seconds to ensure Hibernate Search is ready...")
-    time.sleep(wait_time)
-    print("✓ Hibernate Search should be initialized now")
+def wait_for_search_ready():
+    """Poll a search until Hibernate Search answers, backing off exponentially"""
+    logger.info("Waiting for Hibernate Search initialization...")
+    interval = POLL_INITIAL_INTERVAL
+    deadline = time.monotonic() + SEARCH_READY_MAX_WAIT_SECONDS
+    while True:
+        try:
+            response = PROBE_SESSION.get(
+                f"{HAPI_BASE_URL}/StructureDefinition",
+                params={"_summary": "count"},
+                timeout=3
+            )
+            if response.status_code == 200:
+                logger.info("✓ Hibernate Search is ready")
+                return True
+        except requests.exceptions.RequestException:
+            pass
+
+        if time.monotonic() + interval > deadline:
+            logger.warning(f"⚠ Search not ready after {SEARCH_READY_MAX_WAIT_SECONDS}s; continuing anyway")
+            return False
+        time.sleep(interval)
+        interval = min(interval * 2, POLL_MAX_INTERVAL)
 
 def install_dependency_package(package_name, version):
     """Install a dependency package using HAPI's $install operation"""
-    print(f"\nInstalling dependency: {package_name}#{version}...")
+    logger.info(f"Installing dependency: {package_name}#{version}...")
 
     # Create Parameters resource for $install-package operation
     params = {
@@ -84,207 +160,386 @@ def install_dependency_package(package_name, version):
     }
 
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{HAPI_BASE_URL}/$install-package",
             json=params,
-            headers={"Content-Type": "application/fhir+json"},
             timeout=120  # Package installation can take time
         )
 
         if response.status_code in [200, 201]:
-            print(f"✓ Successfully installed {package_name}#{version}")
+            logger.info(f"✓ Successfully installed {package_name}#{version}")
             return True
         else:
-            print(f"✗ Failed to install {package_name}#{version}: HTTP {response.status_code}")
-            print(f"  Response: {response.text[:500]}")
+            logger.error(f"✗ Failed to install {package_name}#{version}: HTTP {response.status_code}")
+            logger.error(f"  Response: {response.text[:500]}")
             return False
 
     except Exception as e:
-        print(f"✗ Error installing {package_name}#{version}: {e}")
+        logger.error(f"✗ Error installing {package_name}#{version}: {e}")
         return False
 
-def download_isik_package():
-    """Download ISiK package from packages.fhir.org"""
-    print(f"\nDownloading ISiK package {ISIK_VERSION}...")
-
-    package_url = f"https://packages.fhir.org/{ISIK_PACKAGE_NAME}/{ISIK_VERSION}"
-
+def _is_structure_definition(member):
+    """True for package/StructureDefinition-*.json entries in the package tarball"""
+    directory, _, filename = member.name.rpartition("/")
+    return (
+        member.isfile()
+        and directory == "package"
+        and filename.startswith("StructureDefinition-")
+        and filename.endswith(".json")
+    )
+
+def _load_structure_definition(name, content):
+    """Parse one StructureDefinition; returns (resource, None) or (None, 'skipped'/'failed')"""
     try:
-        response = requests.get(package_url, timeout=30)
-        response.raise_for_status()
-
-        # Save to temp file
-        temp_dir = tempfile.mkdtemp()
-        package_path = Path(temp_dir) / f"{ISIK_PACKAGE_NAME}-{ISIK_VERSION}.tgz"
+        resource = orjson.loads(content)
+    except Exception as e:
+        logger.error(f"  ✗ Error processing {name}: {e}")
+        return None, "failed"
 
-        with open(package_path, 'wb') as f:
-            f.write(response.content)
+    resource_name = resource.get('name', 'unknown')
 
-        print(f"✓ Downloaded package to {package_path}")
-        return package_path
+    # Skip problematic profiles
+    if resource_name in SKIP_PROFILES:
+        logger.info(f"  ⊘ Skipping {resource_name} (known to cause errors)")
+        return None, "skipped"
 
-    except requests.exceptions.RequestException as e:
-        print(f"✗ Failed to download ISiK package: {e}")
-        return None
+    # Remove snapshot if present (to avoid triggering generation). A full orjson
+    # parse followed by a pop beats skipping the subtree with a streaming parser.
+    if resource.pop('snapshot', None) is not None:
+        logger.debug(f"  → Removed snapshot from {resource_name}")
 
-def extract_package(package_path):
-    """Extract package contents"""
-    print("\nExtracting package...")
+    return resource, None
 
-    extract_dir = package_path.parent / "extracted"
-    extract_dir.mkdir(exist_ok=True)
+def _load_upload_cache():
+    """Read the id -> content hash map of earlier uploads (empty if missing/corrupt)"""
+    try:
+        return orjson.loads(UPLOAD_CACHE_FILE.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
 
+def _save_upload_cache(cache):
+    """Persist the id -> content hash map; a failure only costs re-uploads next run"""
     try:
-        with tarfile.open(package_path, 'r:gz') as tar:
-            tar.extractall(extract_dir)
+        UPLOAD_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        UPLOAD_CACHE_FILE.write_bytes(orjson.dumps(cache, option=orjson.OPT_SORT_KEYS))
+    except OSError as e:
+        logger.warning(f"⚠ Could not write upload cache {UPLOAD_CACHE_FILE}: {e}")
 
-        print(f"✓ Extracted to {extract_dir}")
-        return extract_dir
+def _content_hash(resource):
+    """Stable sha256 of a resource's canonical JSON"""
+    return hashlib.sha256(orjson.dumps(resource, option=orjson.OPT_SORT_KEYS)).hexdigest()
 
-    except Exception as e:
-        print(f"✗ Failed to extract package: {e}")
-        return None
+def _existing_ids(ids):
+    """Which of the given StructureDefinition ids HAPI has, via one _id search"""
+    try:
+        response = SESSION.get(
+            f"{HAPI_BASE_URL}/StructureDefinition",
+            params={"_id": ",".join(ids), "_elements": "id", "_count": len(ids)},
+            timeout=30
+        )
+        if response.status_code != 200:
+            return set()
+        entries = orjson.loads(response.content).get("entry", [])
+    except Exception:
+        # Unknown state: upload everything rather than risk skipping
+        return set()
+    return {entry["resource"]["id"] for entry in entries}
+
+def _upload_batch(resources, cache):
+    """PUT changed StructureDefinitions via one batch Bundle; returns an outcome per resource
+
+    Resources whose content hash matches `cache` and which still exist on the
+    server count as "unchanged" and are left out of the Bundle; `cache` is
+    updated for every successful PUT.
+    """
+    hashes = {resource.get('id'): _content_hash(resource) for resource in resources}
+    candidates = [rid for rid, digest in hashes.items() if rid and cache.get(rid) == digest]
+    present = _existing_ids(candidates) if candidates else set()
+
+    outcomes = []
+    for resource in resources:
+        if resource.get('id') in present:
+            logger.debug(f"  = Unchanged {resource.get('name', 'unknown')}")
+            outcomes.append("unchanged")
+    resources = [resource for resource in resources if resource.get('id') not in present]
+    if not resources:
+        logger.info(f"  Batch of {len(outcomes)}: all unchanged")
+        return outcomes
+
+    bundle = {
+        "resourceType": "Bundle",
+        "type": "batch",
+        "entry": [
+            {
+                "resource": resource,
+                "request": {
+                    "method": "PUT",
+                    "url": f"StructureDefinition/{resource.get('id', 'unknown')}"
+                }
+            }
+            for resource in resources
+        ]
+    }
 
-def upload_structure_definitions(extract_dir):
-    """Upload StructureDefinitions one by one, skipping problematic ones"""
-    print("\nUploading StructureDefinitions...")
+    try:
+        response = SESSION.post(HAPI_BASE_URL, data=orjson.dumps(bundle), timeout=120)
+        if response.status_code != 200:
+            logger.error(f"  ✗ Batch of {len(resources)} failed: HTTP {response.status_code}")
+            logger.error(f"  Response: {response.text[:500]}")
+            return outcomes + ["failed"] * len(resources)
+        response_entries = orjson.loads(response.content).get("entry", [])
+    except Exception as e:
+        logger.error(f"  ✗ Error uploading batch of {len(resources)}: {e}")
+        return outcomes + ["failed"] * len(resources)
+
+    # Batch responses are positional: entry i answers request i
+    for i, resource in enumerate(resources):
+        resource_name = resource.get('name', 'unknown')
+        status = response_entries[i].get("response", {}).get("status", "") if i < len(response_entries) else ""
+        if status.startswith(("200", "201")):
+            logger.debug(f"  ✓ Uploaded {resource_name}")
+            outcomes.append("uploaded")
+            cache[resource.get('id')] = hashes[resource.get('id')]
+        else:
+            logger.error(f"  ✗ Failed to upload {resource_name}: {status or 'no response entry'}")
+            outcomes.append("failed")
+    logger.info(
+        f"  Batch of {len(outcomes)}: {outcomes.count('uploaded')} uploaded, "
+        f"{outcomes.count('unchanged')} unchanged, {outcomes.count('failed')} failed"
+    )
+    return outcomes
+
+class _TeeReader:
+    """File-like wrapper that copies everything read from `raw` into `sink`"""
+
+    def __init__(self, raw, sink):
+        self.raw = raw
+        self.sink = sink
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.sink.write(data)
+        return data
+
+    def drain(self):
+        """Read what tarfile left unread (end-of-archive padding, gzip trailer)"""
+        while self.read(TAR_BUFFER_SIZE):
+            pass
 
-    package_dir = extract_dir / "package"
-    if not package_dir.exists():
-        print(f"✗ Package directory not found: {package_dir}")
+def _is_cached_package_current(cache_path, package_url):
+    """True if the cached .tgz exists and its size matches the registry's Content-Length"""
+    if not cache_path.is_file():
         return False
+    try:
+        response = SESSION.head(package_url, allow_redirects=True, timeout=10)
+        expected = response.headers.get("Content-Length")
+    except requests.exceptions.RequestException:
+        # Published package versions are immutable; offline, trust the cache
+        return True
+    return expected is None or int(expected) == cache_path.stat().st_size
+
+@contextmanager
+def _open_package(package_url):
+    """Yield the package .tgz as a byte stream, from cache or downloaded into the cache"""
+    cache_path = CACHE_DIR / f"{ISIK_PACKAGE_NAME}-{ISIK_VERSION}.tgz"
+    if _is_cached_package_current(cache_path, package_url):
+        logger.info(f"Using cached package {cache_path}")
+        with open(cache_path, "rb") as cached:
+            yield cached
+        return
+
+    with SESSION.get(package_url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        partial_path = cache_path.parent / f"{cache_path.name}.part"
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            sink = open(partial_path, "wb")
+        except OSError as e:
+            logger.warning(f"⚠ Not caching package ({e})")
+            yield response.raw
+            return
+
+        with sink:
+            tee = _TeeReader(response.raw, sink)
+            try:
+                yield tee
+            except BaseException:
+                sink.close()
+                partial_path.unlink(missing_ok=True)
+                raise
+            # The upload already succeeded; a failure here only loses the cache
+            try:
+                tee.drain()
+            except Exception as e:
+                logger.warning(f"⚠ Not caching package ({e})")
+                sink.close()
+                partial_path.unlink(missing_ok=True)
+                return
+
+        expected = response.headers.get("Content-Length")
+        if expected is not None and int(expected) != partial_path.stat().st_size:
+            logger.warning(f"⚠ Not caching package (got {partial_path.stat().st_size} of {expected} bytes)")
+            partial_path.unlink(missing_ok=True)
+            return
+        partial_path.replace(cache_path)
+
+def stream_and_upload_structure_definitions():
+    """Stream the ISiK package and upload its StructureDefinitions as batch Bundles
+
+    Only package/StructureDefinition-*.json members are read from the tar
+    stream; everything else is skipped without touching disk. Full batches
+    are handed to the upload pool while the download is still running.
+    """
+    logger.info(f"Streaming ISiK package {ISIK_VERSION} and uploading StructureDefinitions...")
 
-    # Find all StructureDefinition files
-    sd_files = list(package_dir.glob("StructureDefinition-*.json"))
+    package_url = f"https://packages.fhir.org/{ISIK_PACKAGE_NAME}/{ISIK_VERSION}"
+    counts = {"uploaded": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+    cache = _load_upload_cache()
+    found = 0
+    futures = []
 
-    if not sd_files:
-        print("✗ No StructureDefinition files found")
-        return False
+    # Batches touch disjoint ids, so HAPI takes them concurrently
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        try:
+            # Stream HTTP (or cached .tgz) -> gunzip -> untar; nothing extracted to disk
+            with _open_package(package_url) as package:
+                with tarfile.open(
+                    fileobj=package,
+                    mode="r|gz",
+                    bufsize=TAR_BUFFER_SIZE,
+                    copybufsize=TAR_BUFFER_SIZE
+                ) as tar:
+                    batch = []
+                    for member in tar:
+                        if not _is_structure_definition(member):
+                            continue
+                        found += 1
+                        resource, outcome = _load_structure_definition(
+                            member.name, tar.extractfile(member).read()
+                        )
+                        if resource is None:
+                            counts[outcome] += 1
+                            continue
+                        batch.append(resource)
+                        if len(batch) == UPLOAD_BATCH_SIZE:
+                            futures.append(executor.submit(_upload_batch, batch, cache))
+                            batch = []
+                    if batch:
+                        futures.append(executor.submit(_upload_batch, batch, cache))
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"✗ Failed to download ISiK package: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"✗ Failed to read package: {e}")
+            return False
 
-    print(f"Found {len(sd_files)} StructureDefinition files")
+        if not found:
+            logger.error("✗ No StructureDefinition files found")
+            return False
 
-    uploaded = 0
-    skipped = 0
-    failed = 0
+        logger.info(f"Found {found} StructureDefinition files ({len(futures)} batch Bundle(s))")
 
-    # List of known problematic profiles to skip
-    SKIP_PROFILES = [
-        "ISiKKoerperkerntemperatur",  # Known to cause Hibernate Search error
-    ]
+        for future in futures:
+            for outcome in future.result():
+                counts[outcome] += 1
 
-    for sd_file in sd_files:
-        try:
-            with open(sd_file, 'r') as f:
-                resource = json.load(f)
-
-            resource_id = resource.get('id', 'unknown')
-            resource_name = resource.get('name', 'unknown')
-
-            # Skip problematic profiles
-            if any(skip in resource_name for skip in SKIP_PROFILES):
-                print(f"  ⊘ Skipping {resource_name} (known to cause errors)")
-                skipped += 1
-                continue
-
-            # Remove snapshot if present (to avoid triggering generation)
-            if 'snapshot' in resource:
-                del resource['snapshot']
-                print(f"  → Removed snapshot from {resource_name}")
-
-            # Upload to HAPI
-            response = requests.put(
-                f"{HAPI_BASE_URL}/StructureDefinition/{resource_id}",
-                json=resource,
-                headers={"Content-Type": "application/fhir+json"},
-                timeout=30
-            )
+    _save_upload_cache(cache)
 
-            if response.status_code in [200, 201]:
-                print(f"  ✓ Uploaded {resource_name}")
-                uploaded += 1
-            else:
-                print(f"  ✗ Failed to upload {resource_name}: HTTP {response.status_code}")
-                failed += 1
+    uploaded, unchanged = counts["uploaded"], counts["unchanged"]
+    skipped, failed = counts["skipped"], counts["failed"]
 
-        except Exception as e:
-            print(f"  ✗ Error processing {sd_file.name}: {e}")
-            failed += 1
+    logger.info("Upload Summary:")
+    logger.info(f"  ✓ Uploaded: {uploaded}")
+    logger.info(f"  = Unchanged: {unchanged}")
+    logger.info(f"  ⊘ Skipped: {skipped}")
+    logger.info(f"  ✗ Failed: {failed}")
 
-    print(f"\nUpload Summary:")
-    print(f"  ✓ Uploaded: {uploaded}")
-    print(f"  ⊘ Skipped: {skipped}")
-    print(f"  ✗ Failed: {failed}")
+    return uploaded + unchanged > 0
 
-    return uploaded > 0
+def parse_args(argv=None):
+    """Parse command-line overrides for the module-level defaults"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hapi-url", default=HAPI_BASE_URL,
+                        help=f"HAPI FHIR base URL (default: $HAPI_BASE_URL or {HAPI_BASE_URL})")
+    parser.add_argument("--isik-version", default=ISIK_VERSION,
+                        help=f"ISiK package version to install (default: {ISIK_VERSION})")
+    parser.add_argument("--no-direct-install", dest="direct_install", action="store_false",
+                        default=TRY_DIRECT_ISIK_INSTALL,
+                        help="Skip the direct $install-package attempt and go straight to "
+                             "manual dependency + profile upload")
+    return parser.parse_args(argv)
 
-def main():
+def main(argv=None):
     """Main installation process"""
-    print("=" * 50)
-    print("ISiK Runtime Installation Script")
-    print("=" * 50)
-    print(f"HAPI URL: {HAPI_BASE_URL}")
-    print(f"Package: {ISIK_PACKAGE_NAME}#{ISIK_VERSION}")
-    print(f"Strategy: {'Direct install with dependencies' if TRY_DIRECT_ISIK_INSTALL else 'Manual dependency + profile upload'}")
-    print()
+    global HAPI_BASE_URL, ISIK_VERSION, TRY_DIRECT_ISIK_INSTALL
+    args = parse_args(argv)
+    HAPI_BASE_URL = args.hapi_url
+    ISIK_VERSION = args.isik_version
+    TRY_DIRECT_ISIK_INSTALL = args.direct_install
+
+    logger.info("=" * 50)
+    logger.info("ISiK Runtime Installation Script")
+    logger.info("=" * 50)
+    logger.info(f"HAPI URL: {HAPI_BASE_URL}")
+    logger.info(f"Package: {ISIK_PACKAGE_NAME}#{ISIK_VERSION}")
+    logger.info(f"Strategy: {'Direct install with dependencies' if TRY_DIRECT_ISIK_INSTALL else 'Manual dependency + profile upload'}")
 
     # Step 1: Wait for HAPI
     if not wait_for_hapi():
         return 1
 
     # Step 2: Wait for Hibernate Search
-    wait_for_hibernate_search()
+    wait_for_search_ready()
 
     # Step 3: Try direct ISiK installation with fetchDependencies=true
     if TRY_DIRECT_ISIK_INSTALL:
-        print("\n" + "=" * 50)
-        print("Attempting Direct ISiK Installation")
-        print("(with fetchDependencies=true)")
-        print("=" * 50)
+        logger.info("=" * 50)
+        logger.info("Attempting Direct ISiK Installation")
+        logger.info("(with fetchDependencies=true)")
+        logger.info("=" * 50)
 
         success = install_dependency_package(ISIK_PACKAGE_NAME, ISIK_VERSION)
 
         if success:
-            print("\n" + "=" * 50)
-            print("✓ ISiK installed successfully via direct installation!")
-            print("=" * 50)
+            logger.info("=" * 50)
+            logger.info("✓ ISiK installed successfully via direct installation!")
+            logger.info("=" * 50)
             return 0
         else:
-            print("\n⚠ Direct installation failed. Falling back to manual installation...")
+            logger.warning("⚠ Direct installation failed. Falling back to manual installation...")
 
     # Fallback: Step 4 - Install dependencies manually
     if DEPENDENCIES:
-        print("\n" + "=" * 50)
-        print(f"Installing {len(DEPENDENCIES)} Dependencies Manually")
-        print("=" * 50)
-
-        for dep in DEPENDENCIES:
-            success = install_dependency_package(dep["name"], dep["version"])
+        logger.info("=" * 50)
+        logger.info(f"Installing {len(DEPENDENCIES)} Dependencies Manually")
+        logger.info("=" * 50)
+
+        # $install-package takes one package per call, so run the installs
+        # side by side; wall time is the slowest install, not the sum
+        with ThreadPoolExecutor(max_workers=min(len(DEPENDENCIES), UPLOAD_WORKERS)) as executor:
+            results = list(executor.map(
+                lambda dep: install_dependency_package(dep["name"], dep["version"]),
+                DEPENDENCIES
+            ))
+
+        for dep, success in zip(DEPENDENCIES, results):
             if not success:
-                print(f"\n⚠ Warning: Failed to install dependency {dep['name']}#{dep['version']}")
-                print("  Continuing with ISiK installation anyway...")
-
-        print("\n✓ Dependency installation phase complete")
+                logger.warning(f"⚠ Warning: Failed to install dependency {dep['name']}#{dep['version']}")
+                logger.warning("  Continuing with ISiK installation anyway...")
 
-    # Fallback: Step 5 - Download ISiK package
-    package_path = download_isik_package()
-    if not package_path:
-        return 1
-
-    # Fallback: Step 6 - Extract package
-    extract_dir = extract_package(package_path)
-    if not extract_dir:
-        return 1
+        logger.info("✓ Dependency installation phase complete")
 
-    # Fallback: Step 7 - Upload ISiK StructureDefinitions individually
-    print("\n" + "=" * 50)
-    print("Installing ISiK Profiles Individually")
-    print("=" * 50)
-    if not upload_structure_definitions(extract_dir):
+    # Fallback: Step 5 - Stream ISiK package and upload its StructureDefinitions
+    logger.info("=" * 50)
+    logger.info("Installing ISiK Profiles Individually")
+    logger.info("=" * 50)
+    if not stream_and_upload_structure_definitions():
         return 1
 
-    print("\n" + "=" * 50)
-    print("Installation complete!")
-    print("=" * 50)
+    logger.info("=" * 50)
+    logger.info("Installation complete!")
+    logger.info("=" * 50)
 
     return 0
 
@@ -28,91 +28,94 @@ MII_PACKAGES = {
 }
 
 
-async def install_package_from_url(package_url: str, package_name: str):
+async def install_package_from_url(client: httpx.AsyncClient, package_url: str, package_name: str):
     """
     Install a FHIR package from URL using $install operation.
 
     Args:
+        client: Shared HAPI client (base URL FHIR_BASE)
         package_url: URL to package.tgz file
         package_name: Name of the package for logging
     """
     logger.info(f"Installing {package_name} from {package_url}")
 
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        try:
-            # Use HAPI FHIR's $install operation
-            # POST [base]/$install with package URL parameter
-            response = await client.post(
-                f"{FHIR_BASE}/$install",
-                json={
-                    "resourceType": "Parameters",
-                    "parameter": [
-                        {
-                            "name": "packageUrl",
-                            "valueString": package_url
-                        }
-                    ]
-                },
-                headers={"Content-Type": "application/fhir+json"}
-            )
-
-            if response.status_code in [200, 201]:
-                logger.info(f"✓ Successfully installed {package_name}")
-                logger.info(f"Response: {response.json()}")
-                return True
-            else:
-                logger.error(f"✗ Failed to install {package_name}")
-                logger.error(f"Status: {response.status_code}")
-                logger.error(f"Response: {response.text}")
-                return False
+    try:
+        # Use HAPI FHIR's $install operation
+        # POST [base]/$install with package URL parameter
+        response = await client.post(
+            "/$install",
+            json={
+                "resourceType": "Parameters",
+                "parameter": [
+                    {
+                        "name": "packageUrl",
+                        "valueString": package_url
+                    }
+                ]
+            },
+            headers={"Content-Type": "application/fhir+json"},
+            timeout=300.0
+        )
 
-        except Exception as e:
-            logger.error(f"✗ Error installing {package_name}: {e}")
+        if response.status_code in [200, 201]:
+            logger.info(f"✓ Successfully installed {package_name}")
+            logger.info(f"Response: {response.json()}")
+            return True
+        else:
+            logger.error(f"✗ Failed to install {package_name}")
+            logger.error(f"Status: {response.status_code}")
+            logger.error(f"Response: {response.text}")
             return False
 
+    except Exception as e:
+        logger.error(f"✗ Error installing {package_name}: {e}")
+        return False
+
 
-async def check_hapi_ready():
+async def check_hapi_ready(client: httpx.AsyncClient):
     """Check if HAPI FHIR server is ready."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{FHIR_BASE}/metadata", timeout=5.0)
-            return response.status_code == 200
-        except:
-            return False
+    try:
+        response = await client.get("/metadata", timeout=5.0)
+        return response.status_code == 200
+    except:
+        return False
 
 
-async def verify_installation(resource_type: str, expected_count: int = None):
+async def verify_installation(client: httpx.AsyncClient, resource_type: str, expected_count: int = None):
     """
     Verify package installation by checking if resources exist.
 
     Args:
+        client: Shared HAPI client (base URL FHIR_BASE)
         resource_type: Type of resource to check (e.g., "Questionnaire")
         expected_count: Optional expected minimum count
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{FHIR_BASE}/{resource_type}?_summary=count",
-                headers={"Accept": "application/fhir+json"}
-            )
+    try:
+        # Count only (no entries); strict handling so HAPI rejects rather than
+        # silently ignores a parameter it does not understand
+        response = await client.get(
+            f"/{resource_type}",
+            params={"_summary": "count"},
+            headers={"Accept": "application/fhir+json", "Prefer": "handling=strict"}
+        )
 
-            if response.status_code == 200:
-                data = response.json()
-                total = data.get("total", 0)
-                logger.info(f"Found {total} {resource_type} resources")
+        if response.status_code == 200:
+            data = response.json()
+            total = data.get("total", 0)
+            logger.info(f"Found {total} {resource_type} resources")
 
-                if expected_count and total < expected_count:
-                    logger.warning(f"Expected at least {expected_count} resources, found {total}")
-                    return False
-                return True
-            else:
-                logger.error(f"Failed to verify {resource_type}: {response.status_code}")
+            if expected_count and total < expected_count:
+                logger.warning(f"Expected at least {expected_count} resources, found {total}")
                 return False
-
-        except Exception as e:
-            logger.error(f"Error verifying {resource_type}: {e}")
+            return True
+        else:
+            logger.error(f"Failed to verify {resource_type}: {response.status_code}")
             return False
 
+    except Exception as e:
+        logger.error(f"Error verifying {resource_type}: {e}")
+        return False
+
 
 async def main():
     """Main installation routine."""
@@ -120,36 +123,44 @@ async def main():
     logger.info("MII Package Installer for HAPI FHIR")
     logger.info("=" * 60)
 
-    # Check if HAPI FHIR is ready
-    logger.info("Checking if HAPI FHIR is ready...")
-    if not await check_hapi_ready():
-        logger.error("HAPI FHIR server is not ready. Please start it first:")
-        logger.error("  docker-compose up -d hapi-fhir")
-        return
-
-    logger.info("✓ HAPI FHIR is ready\n")
-
-    # Install MII PRO package
-    for package_id, package_info in MII_PACKAGES.items():
-        logger.info(f"Installing {package_id}...")
-        success = await install_package_from_url(
-            package_info["url"],
-            package_info["name"]
-        )
+    # One pooled connection to HAPI for the whole run
+    async with httpx.AsyncClient(
+        base_url=FHIR_BASE,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    ) as client:
+        # Check if HAPI FHIR is ready
+        logger.info("Checking if HAPI FHIR is ready...")
+        if not await check_hapi_ready(client):
+            logger.error("HAPI FHIR server is not ready. Please start it first:")
+            logger.error("  docker-compose up -d hapi-fhir")
+            return
+
+        logger.info("✓ HAPI FHIR is ready\n")
+
+        # Install MII PRO package
+        for package_id, package_info in MII_PACKAGES.items():
+            logger.info(f"Installing {package_id}...")
+            success = await install_package_from_url(
+                client,
+                package_info["url"],
+                package_info["name"]
+            )
 
-        if success:
-            logger.info(f"✓ {package_id} installed successfully\n")
-        else:
-            logger.error(f"✗ Failed to install {package_id}\n")
-            continue
+            if success:
+                logger.info(f"✓ {package_id} installed successfully\n")
+            else:
+                logger.error(f"✗ Failed to install {package_id}\n")
+                continue
 
-    # Verify installation
-    logger.info("\nVerifying installation...")
-    await asyncio.sleep(5)  # Give HAPI time to process
+        # Verify installation
+        logger.info("\nVerifying installation...")
+        await asyncio.sleep(5)  # Give HAPI time to process
 
-    await verify_installation("Questionnaire")
-    await verify_installation("ValueSet")
-    await verify_installation("CodeSystem")
+        await asyncio.gather(
+            verify_installation(client, "Questionnaire"),
+            verify_installation(client, "ValueSet"),
+            verify_installation(client, "CodeSystem"),
+        )
 
     logger.info("\n" + "=" * 60)
     logger.info("Installation complete!")